@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# filename: batch_evaluation.py
+
+"""
+batch_evaluation.py
+~~~~~~~~~~~~~~~~~~~
+Vectorized evaluation of many Connect Four boards at once, with NumPy.
+
+A stack of K boards is a `(K, height, base)` int8 array in the layout of
+`ConnectFour.catcher` (row 0 is the bottom row; 0 for an empty spot, 1
+or 2 for a player's puck).  For every board, `evaluate_boards` works
+out in one pass the same winner/stale-mate status that `game_over`
+would set as `winner` (-1 for a game still going on), plus heuristic
+scores, from sliding-window sums along the rows, the columns and both
+diagonals.
+
+This module needs NumPy (`pip install numpy`); the rest of the package
+does not.
+"""
+
+import numpy as np
+
+
+class BatchEvaluation:
+
+    def __init__(self, status, open_threes, center_control, scores):
+        self.status = status                  # (K,): -1, 0, 1 or 2
+        self.open_threes = open_threes        # (K, 2): per player
+        self.center_control = center_control  # (K, 2): per player
+        self.scores = scores                  # (K,): player 1's point of view
+
+
+def boards_from_games(games):
+    # Stack the catchers of `games` (all of the same size) into one array.
+    return np.array([game.catcher for game in games], dtype=np.int8)
+
+def window_sums(codes, connect : int = 4):
+    # Yield, for each direction, the sum of `codes` (a (height, base, K)
+    # array) over every `connect`-long window.
+    height, base, _ = codes.shape
+    n = connect - 1
+    if base >= connect:  # rows
+        yield sum(codes[:, i:base - n + i] for i in range(connect))
+    if height >= connect:  # columns
+        yield sum(codes[i:height - n + i] for i in range(connect))
+    if height >= connect and base >= connect:
+        # positively-sloped diagonals: (row + i, col + i)
+        yield sum(codes[i:height - n + i, i:base - n + i]
+                  for i in range(connect))
+        # negatively-sloped diagonals: (row + n - i, col + i)
+        yield sum(codes[n - i:height - i, i:base - n + i]
+                  for i in range(connect))
+
+def evaluate_boards(boards, connect : int = 4, three_weight : int = 4,
+                    center_weight : int = 1):
+    # Evaluate a (K, height, base) stack of boards.  An "open three" is a
+    # window holding `connect - 1` of a player's pucks and none of the
+    # opponent's; center control counts a player's pucks in the center
+    # column(s).  The heuristic score is
+    #   three_weight * (open threes of 1 - of 2)
+    #   + center_weight * (center pucks of 1 - of 2),
+    # and is replaced by +/-1000 for a won board and 0 for a stale-mate.
+    #
+    # Each spot is coded as 1 for a player-1 puck and `connect + 1` for a
+    # player-2 puck, so that a single window sum tells how many pucks of
+    # each player the window holds: sum = ones + (connect + 1) * twos.
+    # The boards are laid out as (height, base, K) for the window sums,
+    # so that every slice is a run of whole, contiguous board stacks.
+    boards = np.asarray(boards, dtype=np.int8)
+    count, height, base = boards.shape
+    unit = connect + 1
+    dtype = np.uint8 if connect * unit < 256 else np.int32
+    stacked = np.ascontiguousarray(boards.transpose(1, 2, 0)).astype(dtype)
+    codes = stacked + (unit - 2) * (stacked >> 1)
+    # window sums meaning: player 1 wins, player 2 wins, open threes of 1/2
+    targets = (connect, connect * unit, connect - 1, (connect - 1) * unit)
+    totals = np.zeros((4, count), dtype=np.int32)
+    for sums in window_sums(codes, connect):
+        for i, target in enumerate(targets):
+            totals[i] += (sums == target).sum(axis=(0, 1), dtype=np.int32)
+    open_threes = totals[2:4].T
+    center = [base // 2] if base % 2 else [base // 2 - 1, base // 2]
+    middle = stacked[:, center]
+    center_control = np.stack([(middle == player).sum(axis=(0, 1),
+                                                      dtype=np.int32)
+                               for player in (1, 2)], axis=1)
+    status = np.full(count, -1, dtype=np.int8)
+    status[(stacked[height - 1] != 0).all(axis=0)] = 0
+    status[totals[1] > 0] = 2
+    status[totals[0] > 0] = 1
+    scores = (three_weight * (open_threes[:, 0] - open_threes[:, 1]) +
+              center_weight * (center_control[:, 0] - center_control[:, 1]))
+    scores[status == 0] = 0
+    scores[status == 1] = 1000
+    scores[status == 2] = -1000
+    return BatchEvaluation(status, open_threes, center_control, scores)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# filename: benchmarks.py
+
+"""
+benchmarks.py
+~~~~~~~~~~~~~
+Timings of the Connect Four hot paths, across board sizes: building a
+game (`__init__`, with the line index cached and not), `game_over`
+(incremental and full scan), `check_for_win` per direction,
+`try_to_place_puck`, the `path_generator_*` methods, and whole random
+games per second.
+
+Each benchmark is run in growing batches until a batch takes at least
+`min_time` seconds, and the best of `repeat` such batches is kept, as
+seconds per call.  Results can be written as JSON and compared against a
+saved baseline: a benchmark is flagged as a regression when it got
+slower by more than `tolerance` (a fraction).
+
+To run the suite, execute the following in a shell terminal (in the
+directory above this package):
+python3 -m connect_four.benchmarks --json baseline.json
+python3 -m connect_four.benchmarks --compare baseline.json
+("--quick" runs the small sizes only, with short timings.)
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from .connect_four import ConnectFour, get_line_index
+from .simulator import RandomPolicy, play_game
+
+
+SIZES = [(6, 7), (12, 14), (25, 25), (50, 50), (100, 100)]
+QUICK_SIZES = [(6, 7), (12, 14)]
+
+
+# Board set-up
+# -----------------------------------------------------------------------------
+
+def mid_game(height : int, base : int, fill : float = 0.5, seed : int = 0):
+    # A game with about `fill` of the catcher filled by random moves, none
+    # of which wins, so that the win checks have to look at everything.
+    rng = random.Random(seed)
+    game = ConnectFour(height, base)
+    target = int(fill * height * base)
+    attempts = 0
+    while game.filled_count < target and attempts < 10 * height * base:
+        attempts += 1
+        game.switch_player()
+        col = rng.randrange(base) + 1
+        if game.catcher[height - 1][col - 1] != 0:
+            continue
+        game.try_to_place_puck(col)
+        if game.game_over():
+            row, col0 = game.last_spot
+            game.catcher[row][col0] = 0
+            game.filled_count -= 1
+            game.move_history.pop()
+            game.winner = -1
+    # make sure `last_spot` is one of the placed pucks
+    if game.move_history:
+        col0 = game.move_history[-1] - 1
+        row = max(row for row in range(height) if game.catcher[row][col0])
+        game.last_spot = (row, col0)
+    return game
+
+
+# Benchmarks: each returns a function of no arguments to be timed
+# -----------------------------------------------------------------------------
+
+def bench_init(height, base):
+    get_line_index(height, base)
+    return lambda: ConnectFour(height, base)
+
+def bench_init_cold(height, base):
+    def run():
+        get_line_index.cache_clear()
+        ConnectFour(height, base)
+    return run
+
+def bench_game_over(height, base):
+    game = mid_game(height, base)
+    return game.game_over
+
+def bench_game_over_full_scan(height, base):
+    game = mid_game(height, base)
+    return game.game_over_full_scan
+
+def _bench_check_for_win(direction):
+    def bench(height, base):
+        game = mid_game(height, base)
+        return lambda: game.check_for_win(direction)
+    return bench
+
+def bench_try_to_place_puck(height, base):
+    # Fills the catcher column by column, starting over once it is full;
+    # the reset is spread over the height * base pucks placed in between.
+    game = ConnectFour(height, base)
+    game.active_player = 1
+    state = {'col': 1}
+    def run():
+        col = state['col']
+        game.try_to_place_puck(col)
+        if game.catcher[height - 1][col - 1] != 0:
+            if col == base:
+                game.reset_for_new_game()
+                game.active_player = 1
+                col = 0
+            state['col'] = col + 1
+    return run
+
+def _bench_path_generator(name):
+    def bench(height, base):
+        game = ConnectFour(height, base)
+        return getattr(game, name)
+    return bench
+
+def bench_random_game(height, base):
+    game = ConnectFour(height, base)
+    policies = {1: RandomPolicy(), 2: RandomPolicy()}
+    state = {'seed': 0}
+    def run():
+        state['seed'] += 1
+        play_game(game, policies, state['seed'])
+    return run
+
+
+BENCHMARKS = {
+    'init' : bench_init,
+    'init_cold' : bench_init_cold,
+    'game_over' : bench_game_over,
+    'game_over_full_scan' : bench_game_over_full_scan,
+    'check_for_win[cols]' : _bench_check_for_win('cols'),
+    'check_for_win[rows]' : _bench_check_for_win('rows'),
+    'check_for_win[ndiags]' : _bench_check_for_win('ndiags'),
+    'check_for_win[pdiags]' : _bench_check_for_win('pdiags'),
+    'try_to_place_puck' : bench_try_to_place_puck,
+    'path_generator_cols' : _bench_path_generator('path_generator_cols'),
+    'path_generator_rows' : _bench_path_generator('path_generator_rows'),
+    'path_generator_ndiags' : _bench_path_generator('path_generator_ndiags'),
+    'path_generator_pdiags' : _bench_path_generator('path_generator_pdiags'),
+    'random_game' : bench_random_game,
+}
+
+
+# Running and comparing
+# -----------------------------------------------------------------------------
+
+def time_call(func, min_time : float = 0.2, repeat : int = 3) -> float:
+    # Seconds per call of `func`: the best of `repeat` batches, each of
+    # enough calls to take at least `min_time` seconds.
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+def run_benchmarks(sizes = SIZES, names = None, min_time : float = 0.2,
+                   repeat : int = 3, progress = None) -> dict:
+    # Run the benchmarks `names` (default: all) on every size.  Returns a
+    # JSON-ready dict; its 'results' maps 'name/HxB' to the timings.
+    results = {}
+    for height, base in sizes:
+        for name in names or BENCHMARKS:
+            func = BENCHMARKS[name](height, base)
+            seconds = time_call(func, min_time, repeat)
+            key = f'{name}/{height}x{base}'
+            results[key] = { 'seconds' : seconds,
+                             'per_sec' : 1 / seconds if seconds > 0 else 0.0 }
+            if progress is not None:
+                progress(key, results[key])
+    get_line_index.cache_clear()
+    return { 'python' : platform.python_version(),
+             'platform' : platform.platform(),
+             'min_time' : min_time,
+             'repeat' : repeat,
+             'results' : results }
+
+def compare(results : dict, baseline : dict, tolerance : float = 0.25):
+    # Compare two `run_benchmarks` outputs.  Returns a list of
+    # (key, baseline seconds, new seconds, ratio) for every benchmark run
+    # in both, with regressions (ratio > 1 + tolerance) first.
+    rows = []
+    for key, timing in results['results'].items():
+        if key in baseline['results']:
+            old = baseline['results'][key]['seconds']
+            new = timing['seconds']
+            rows.append((key, old, new, new / old if old > 0 else 1.0))
+    return sorted(rows, key=lambda row: row[3] <= 1 + tolerance)
+
+def regressions(results : dict, baseline : dict, tolerance : float = 0.25):
+    return [row for row in compare(results, baseline, tolerance)
+            if row[3] > 1 + tolerance]
+
+def format_seconds(seconds : float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Connect ' + \
+                                     'Four hot paths.')
+    parser.add_argument('--quick', action='store_true',
+                        help='small boards and short timings only')
+    parser.add_argument('--sizes', nargs='+', metavar='HxB',
+                        help='board sizes, e.g. 6x7 100x100')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS,
+                        metavar='NAME', help='benchmarks to run')
+    parser.add_argument('--min-time', type=float, default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', metavar='PATH',
+                        help='write the results to this file')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare against a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='slow-down counted as a regression ' + \
+                             '(default: 0.25, i.e. 25%%)')
+    args = parser.parse_args()
+    if args.sizes:
+        sizes = [tuple(int(n) for n in size.lower().split('x'))
+                 for size in args.sizes]
+    else:
+        sizes = QUICK_SIZES if args.quick else SIZES
+    min_time = args.min_time
+    if min_time is None:
+        min_time = 0.02 if args.quick else 0.2
+
+    def progress(key, timing):
+        print(f'{key:36} {format_seconds(timing["seconds"]):>10}  ' + \
+              f'({timing["per_sec"]:,.0f}/sec)')
+
+    results = run_benchmarks(sizes, args.only, min_time, args.repeat,
+                             progress)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f'\nCompared with {args.compare}:')
+        for key, old, new, ratio in compare(results, baseline, args.tolerance):
+            flag = 'REGRESSION' if ratio > 1 + args.tolerance else ''
+            print(f'{key:36} {format_seconds(old):>10} -> ' + \
+                  f'{format_seconds(new):>10}  x{ratio:.2f}  {flag}')
+        if regressions(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
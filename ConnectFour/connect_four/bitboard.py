@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# filename: bitboard.py
+
+"""
+bitboard.py
+~~~~~~~~~~~
+An alternate board backend for Connect Four, built on two integer
+bitboards (one per player) plus a per-column height array.
+
+Bit layout: each column of the catcher gets `height + 1` consecutive
+bits, the bottom spot of column `col` being bit `col * (height + 1)`.
+The extra (always empty) bit on top of each column is a sentinel that
+keeps the shift-and-AND streak checks from wrapping from the top of
+one column into the bottom of the next.
+
+      col:  0   1   2  ...
+          [ 6  13  20 ]   <- sentinel row (never set)
+          [ 5  12  19 ]
+          [ ...       ]
+          [ 0   7  14 ]   <- row 0 (bottom)
+
+Dropping a puck is O(1), a four-in-a-row check is a handful of big-
+integer shifts and ANDs, and `make_move`/`unmake_move` let searches
+walk the game tree without copying the board.  The `catcher` list-of-
+lists view is still available (built lazily and cached between moves)
+so existing callers and `show_catcher_graphic` keep working.
+"""
+
+from .connect_four import ConnectFour
+
+
+def has_connect(board : int, stride : int, connect : int = 4) -> bool:
+    # Shift-and-AND streak detection of `connect` pucks in a line on the
+    # bitboard `board` (columns `stride` bits apart).  The shifts step one
+    # spot up a column (1), across a row (stride), and along the two
+    # diagonals (stride - 1 and stride + 1).
+    for shift in (1, stride, stride - 1, stride + 1):
+        if connect == 4:
+            pairs = board & (board >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+            continue
+        # `runs` marks the start of every run of `length` pucks; the
+        # length (nearly) doubles at each step
+        runs, length = board, 1
+        while runs and length < connect:
+            step = min(length, connect - length)
+            runs &= runs >> (step * shift)
+            length += step
+        if runs:
+            return True
+    return False
+
+
+class BitboardConnectFour(ConnectFour):
+
+    def __init__(self, height : int = 6, base: int = 7, connect : int = 4):
+        # The parent constructor assigns `self.catcher`, which (through the
+        # property setter below) loads the empty catcher into the bitboards.
+        super().__init__(height, base, connect)
+
+    @property
+    def catcher(self):
+        # A list-of-lists view of the bitboards, in the same layout as
+        # `ConnectFour.catcher` (row 0 is the bottom row).  The view is
+        # rebuilt only after the board changes; mutating it does not
+        # change the game (assign a whole new catcher for that).
+        if self._catcher_view is None:
+            self._catcher_view = self.build_catcher_view()
+        return self._catcher_view
+
+    @catcher.setter
+    def catcher(self, rows):
+        self.load_catcher(rows)
+
+    def build_catcher_view(self):
+        stride = self.height + 1
+        board_1, board_2 = self.bitboards
+        rows = []
+        for row in range(self.height):
+            values = []
+            for col in range(self.base):
+                bit = 1 << (col * stride + row)
+                if board_1 & bit:
+                    values.append(1)
+                elif board_2 & bit:
+                    values.append(2)
+                else:
+                    values.append(0)
+            rows.append(values)
+        return rows
+
+    def load_catcher(self, rows):
+        # (Re)build the bitboards from a list-of-lists catcher, assumed to
+        # obey gravity (no holes below a puck within a column).
+        stride = self.height + 1
+        self.stride = stride
+        self.bottom_mask = sum(1 << (col * stride) for col in range(self.base))
+        self.bitboards = [0, 0]
+        self.col_heights = [0] * self.base
+        self.moves = []  # stack of (col, player) for `unmake_move`
+        self.move_history = []
+        for row in range(self.height):
+            for col in range(self.base):
+                value = rows[row][col]
+                if value in {1, 2}:
+                    self.bitboards[value - 1] |= 1 << (col * stride + row)
+                    self.col_heights[col] = row + 1
+        self.filled_count = sum(self.col_heights)
+        self._catcher_view = None
+
+    def can_play(self, col : int) -> bool:
+        # `col` is the 0-based column index (as in `catcher[row][col]`)
+        return self.col_heights[col] < self.height
+
+    def legal_cols(self):
+        return [col for col in range(self.base)
+                if self.col_heights[col] < self.height]
+
+    def make_move(self, col : int, player : int = None):
+        # Drop a puck for `player` (default: the active player) into the
+        # 0-based column `col`.  The caller must make sure `can_play(col)`.
+        if player is None:
+            player = self.active_player
+        row = self.col_heights[col]
+        self.bitboards[player - 1] |= 1 << (col * self.stride + row)
+        self.col_heights[col] = row + 1
+        self.filled_count += 1
+        self.moves.append((col, player))
+        self._catcher_view = None
+        return row
+
+    def unmake_move(self):
+        # Take back the most recent `make_move`.
+        col, player = self.moves.pop()
+        row = self.col_heights[col] - 1
+        self.bitboards[player - 1] &= ~(1 << (col * self.stride + row))
+        self.col_heights[col] = row
+        self.filled_count -= 1
+        self.winner = -1
+        self._catcher_view = None
+        return col, player
+
+    def try_to_place_puck(self, col):
+        # `col` is the 1-based column number entered by the player; a
+        # column off the board would be a negative shift or a bad index
+        if not 1 <= col <= self.base:
+            print('Invalid input. ' + \
+                  'Please enter a number in the proper range.\n')
+            return False
+        if self.col_heights[col-1] >= self.height:
+            print('That column is full. Please pick a different column.\n')
+            return False
+        self.make_move(col - 1)
+        self.move_history.append(col)
+        return True
+
+    def game_over(self) -> bool:
+        if self.full_scan:
+            return self.game_over_full_scan()
+        for player in (1, 2):
+            if self.has_four(self.bitboards[player - 1]):
+                self.winner = player
+                return True
+        return self.check_for_full_catcher()
+
+    def check_for_full_catcher(self) -> bool:
+        if self.filled_count < self.height * self.base:
+            return False
+        self.winner = 0  # stale-mate
+        return True
+
+    def has_four(self, board : int) -> bool:
+        return has_connect(board, self.stride, self.connect)
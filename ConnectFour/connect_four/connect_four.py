@@ -12,6 +12,10 @@ onals as well as in the columns.  The first player to get four of
 thon's own pucks in a line (horizontal, vertical, or diagonal) wins.
 A full catcher with no four-puck streaks results in a stale-mate.
 
+It draws with the shared `renderer` package, so install that first
+(once, from the top of the repository):
+pip install -e Renderer
+
 To start, execute the following in a shell terminal:
 python3 connect_four.py
 """
@@ -19,12 +23,15 @@ python3 connect_four.py
 # TODO: clean input for columns
 # TODO: write tests in test_connect_four
 
-import os
+import functools
+from array import array
+
+from renderer import renderer
 
 
 class ConnectFour:
 
-    def __init__(self, height : int = 6, base: int = 7):
+    def __init__(self, height : int = 6, base: int = 7, connect : int = 4):
         height, base = ConnectFour.clean_height_base_input(height, base)
         # TODO: clean input (needs to be positive integer, can't be zero)
         # Note regarding the catcher:
@@ -32,13 +39,26 @@ class ConnectFour:
         # the 0 col is the left row, the (base-1) col is the right col
         self.base = base      # = number of columns
         self.height = height  # = number of rows
-        self.catcher = [[0 for _ in range(base)] for _ in range(height)]
+        self.connect = connect  # pucks in a line needed to win
+        self.catcher = self.empty_catcher()
         self.active_player = 0
         self.winner = -1  # {-1:N/A, 0:stale-mate, 1:player-1, 2:player-2}
-        self.paths = { 'cols'   : self.path_generator_cols(),
-                       'rows'   : self.path_generator_rows(),
-                       'ndiags' : self.path_generator_ndiags(),
-                       'pdiags' : self.path_generator_pdiags() }
+        self.last_spot = None  # (row, col) of the most recently placed puck
+        self.filled_count = 0  # number of pucks in the catcher
+        self.move_history = []  # column numbers of the pucks placed, in order
+        # By default `game_over` only checks the lines through `last_spot`;
+        # set `full_scan` to re-scan every path instead (verification mode).
+        self.full_scan = False
+        # Players (1 and/or 2) played by the computer: maps the player to an
+        # object with a `choose_col(game)` method (e.g. solver.ComputerPlayer)
+        self.computer_players = {}
+        # If set, an object with a `record(game)` method (e.g. a
+        # records.GameRecordWriter) that is given every finished game
+        self.recorder = None
+        # draws the screen; a renderer.NullRenderer for headless runs
+        self.renderer = renderer.DiffRenderer()
+        # lines through the catcher, shared by all games of the same size
+        self.index_lines()
 
     def reset_for_new_game(self, base = None, height = None):
         # leave base and height the same
@@ -48,9 +68,21 @@ class ConnectFour:
             height = self.height
         self.base = base
         self.height = height
-        self.catcher = [[0 for _ in range(base)] for _ in range(height)]
+        self.index_lines()
+        self.catcher = self.empty_catcher()
         self.active_player = 0
         self.winner = -1  # {-1:N/A, 0:stale-mate, 1:player-1, 2:player-2}
+        self.last_spot = None
+        self.filled_count = 0
+        self.move_history = []
+        self.renderer.invalidate()
+
+    def empty_catcher(self):
+        return [[0 for _ in range(self.base)] for _ in range(self.height)]
+
+    def index_lines(self):
+        self.line_index = get_line_index(self.height, self.base, self.connect)
+        self.paths = self.line_index.paths
 
     def show_state(self):
         print(f'self.base = {self.base}')
@@ -75,7 +107,12 @@ class ConnectFour:
         while not self.game_over():
             self.switch_player()
             self.redraw_screen()
-            self.query_player_for_valid_col()
+            if self.active_player in self.computer_players:
+                self.query_computer_for_col()
+            else:
+                self.query_player_for_valid_col()
+        if self.recorder is not None:
+            self.recorder.record(self)
         self.redraw_screen()
         self.show_game_conclusion()
 
@@ -83,6 +120,21 @@ class ConnectFour:
         # calculate whether there's a four-in-a-row streak
         # if there is, return true
         # set `self.winner` to winning mode or leave at -1 if game not over
+        # Only the lines through the last-placed puck can hold a new streak,
+        # so (unless in `full_scan` mode, or the catcher was set up by hand
+        # and there is no last spot) only those lines are checked.
+        if self.full_scan or self.last_spot is None:
+            return self.game_over_full_scan()
+        # 1. Check for a winner
+        if self.check_for_win_at(*self.last_spot):
+            return True
+        # 2. Check for a state-mate (catcher full), given no winner was found
+        if self.filled_count == self.height * self.base:
+            self.winner = 0  # stale-mate
+            return True
+        return False
+
+    def game_over_full_scan(self) -> bool:
         # 1. Check for a winner
         for direction in self.paths:
             if self.check_for_win(direction):
@@ -92,6 +144,33 @@ class ConnectFour:
             return True
         return False
 
+    def check_for_win_at(self, row : int, col : int) -> bool:
+        # Count same-player pucks outward from the spot (row, col) along
+        # each of the lines (paths) through it.
+        player = self.catcher[row][col]
+        if player not in {1, 2}:
+            return False
+        catcher = self.catcher
+        line_index = self.line_index
+        rows, cols = line_index.line_rows, line_index.line_cols
+        for line, position in line_index.lines_through(row, col):
+            start = line_index.line_starts[line]
+            end = line_index.line_starts[line + 1]
+            counter = 1
+            i = start + position - 1
+            while i >= start and catcher[rows[i]][cols[i]] == player:
+                counter += 1
+                i -= 1
+            i = start + position + 1
+            while i < end and catcher[rows[i]][cols[i]] == player:
+                counter += 1
+                i += 1
+            if counter >= self.connect:
+                # connect four!
+                self.winner = player
+                return True
+        return False
+
     def check_for_win(self, direction : str) -> bool:
         # direction determines which "paths" to traverse
         # (in the diagonal paths, the paths have different length)
@@ -114,7 +193,7 @@ class ConnectFour:
                 else:
                     player_with_streak = 0
                     streak_counter = 0
-                if counter == 4:
+                if counter == self.connect:
                     # connect four!
                     self.winner = player_with_streak
                     return True
@@ -131,39 +210,61 @@ class ConnectFour:
         return True
 
     def switch_player(self):
-        print(self.active_player)
         if self.active_player == 2 or self.active_player == 0:
             self.active_player = 1
         elif self.active_player == 1:
             self.active_player = 2
-        print(self.active_player)
 
     def redraw_screen(self):
-        # Clear screen
-        os.system('cls' if os.name == 'nt' else 'clear')
-        # Draw
+        self.renderer.draw(self.draw_screen)
+
+    def draw_screen(self):
         print('\n  CONNECT FOUR\n')
         self.show_catcher_graphic()
 
     def query_player_for_valid_col(self):
         # query active player for a valid column to drop a puck
         valid = False
-        print('\nPlease enter a column number ' + \
-              f'(from 1 to {self.base}) to drop your puck into that column.')
-        print('(You can also enter "quit" to exit the game.)\n')
+        self.show_col_instructions()
         while valid == False:
-            col = input(f'Player {self.active_player}, which column? ')
+            col = input(self.col_prompt())
             if col == 'quit' or col == 'QUIT':
                 ConnectFour.announce_exit()
                 quit()
-            if col.isdigit() and int(col) in range(1, self.base + 1):
-                col = int(col)
+            col = self.parse_col(col)
+            if col is not None:
                 valid = self.try_to_place_puck(col)
-            else:
-                print('Invalid input. ' + \
-                      'Please enter a number in the proper range.\n')
         return col
 
+    def show_col_instructions(self):
+        print('\nPlease enter a column number ' + \
+              f'(from 1 to {self.base}) to drop your puck into that column.')
+        print('(You can also enter "quit" to exit the game.)\n')
+
+    def col_prompt(self) -> str:
+        return f'Player {self.active_player}, which column? '
+
+    def parse_col(self, col : str):
+        # return the column number entered as `col`, or None if invalid
+        if col.isdigit() and int(col) in range(1, self.base + 1):
+            return int(col)
+        print('Invalid input. ' + \
+              'Please enter a number in the proper range.\n')
+        return None
+
+    def query_computer_for_col(self):
+        # ask the computer playing the active player for its column
+        computer = self.computer_players[self.active_player]
+        col = computer.choose_col(self)
+        print(f'\nPlayer {self.active_player} (computer) drops a puck ' + \
+              f'into column {col}.')
+        self.try_to_place_puck(col)
+        return col
+
+    def can_play(self, col : int) -> bool:
+        # `col` is the 0-based column index (as in `catcher[row][col]`)
+        return self.catcher[self.height - 1][col] == 0
+
     def try_to_place_puck(self, col):
         # the 0 row is the bottom row, the 3 row is the top row
         # the player has selected column `col`
@@ -171,9 +272,13 @@ class ConnectFour:
         valid = False
         row = 0
         for row in range(self.height):
-            if valid == False and self.catcher[row][col-1] == 0:
+            if self.catcher[row][col-1] == 0:
                 self.catcher[row][col-1] = self.active_player
+                self.last_spot = (row, col-1)
+                self.filled_count += 1
+                self.move_history.append(col)
                 valid = True
+                break
         if valid == False:
             print('That column is full. Please pick a different column.\n')
         return valid
@@ -193,94 +298,16 @@ class ConnectFour:
             print('\n~~ Connect Four! ~~  Player 2 is the winner!\n')
 
     def path_generator_cols(self):
-        # Collecting all the "cols": downward column paths
-        paths = []
-        for col in range(0, self.base):
-            path = []
-            for row in reversed(range(0, self.height)):
-                spot = (row, col)
-                path.append(spot)
-            paths.append(path)
-        return paths
+        return generate_col_paths(self.height, self.base)
 
     def path_generator_rows(self):
-        # Collecting all the "rows": leftward row paths
-        paths = []
-        for row in range(0, self.height):
-            path = []
-            for col in range(0, self.base):
-                spot = (row, col)
-                path.append(spot)
-            paths.append(path)
-        return paths
+        return generate_row_paths(self.height, self.base)
 
     def path_generator_ndiags(self):
-        # Collecting all the "ndiags":
-        #  the negatively-sloped left-to-right diagonal paths
-        paths = []
-        # Paths starting from the left side (and top, for last path):
-        col_start = 0
-        row_start_min = 4 - 1  # (need space for four pucks)
-        row_start_max = self.height - 1
-        for row_start in range(row_start_min, row_start_max + 1):
-            path = []
-            row = row_start
-            col = col_start
-            while row >= 0 and col < self.base:
-                spot = (row, col)
-                path.append(spot)
-                row -= 1
-                col += 1
-            paths.append(path)
-        # Paths starting from the top (except the first, see above):
-        row_start = self.height - 1
-        col_start_min = 1
-        col_start_max = self.base - 1 - 3  # (need space for four pucks)
-        for col_start in range(col_start_min, col_start_max + 1):
-            path = []
-            row = row_start
-            col = col_start
-            while row >= 0 and col < self.base:
-                spot = (row, col)
-                path.append(spot)
-                row -= 1
-                col += 1
-            paths.append(path)
-        return paths
+        return generate_ndiag_paths(self.height, self.base, self.connect)
 
     def path_generator_pdiags(self):
-        # Collecting all the "pdiags":
-        #  the positively-sloped left-to-right diagonal paths
-        paths = []
-        # Paths starting from the left side (and bottom, for last path):
-        col_start = 0
-        row_start_max = self.height - 1 - 3 # (need space for four pucks)
-        row_start_min = 0
-        for row_start in reversed(range(row_start_min, row_start_max + 1)):
-            path = []
-            row = row_start
-            col = col_start
-            while row < self.height and col < self.base:
-                spot = (row, col)
-                path.append(spot)
-                row += 1
-                col += 1
-            paths.append(path)
-        # Paths starting from the bottom (except the first, see above):
-        row_start = 0
-        col_start_min = 1
-        col_start_max = self.base - 1 - 3  # (need space for four pucks)
-        for col_start in range(col_start_min, col_start_max + 1):
-            path = []
-            row = row_start
-            col = col_start
-            while row < self.height and col < self.base:
-                spot = (row, col)
-                path.append(spot)
-                row += 1
-                col += 1
-            paths.append(path)
-        return paths
+        return generate_pdiag_paths(self.height, self.base, self.connect)
 
     @staticmethod
     def clean_height_base_input(height : int, base : int):
@@ -304,8 +331,14 @@ class ConnectFour:
 
     @staticmethod
     def query_new_game():
-        again = input('\nWould you like to play a new game? ' + \
-                      '(Enter y for yes, n for no.) ')
+        again = input(ConnectFour.new_game_prompt)
+        return ConnectFour.parse_new_game_answer(again)
+
+    new_game_prompt = ('\nWould you like to play a new game? ' + \
+                       '(Enter y for yes, n for no.) ')
+
+    @staticmethod
+    def parse_new_game_answer(again : str) -> bool:
         again = str.upper(again)
         if again in {'Y', 'YE', 'YES'}:
             return True
@@ -319,6 +352,160 @@ class ConnectFour:
     def announce_exit():
         print('\nExiting the game.')
 
+    @staticmethod
+    def clear_screen():
+        renderer.clear_screen()
+
+
+class LineIndex:
+    # The lines ("paths") of a catcher of one size (and winning length
+    # `connect`), precomputed once per process and shared by every game of
+    # that size (see `get_line_index`):
+    # - `paths`: direction -> tuple of paths, each a tuple of (row, col)
+    #   spots, as used by `check_for_win`;
+    # - `line_rows`, `line_cols`: the spots of all lines, concatenated into
+    #   flat arrays, with line `n` at `line_starts[n]:line_starts[n+1]`;
+    # - a reverse index from each spot to the lines through it: for the
+    #   spot (row, col), `spot_lines` and `spot_positions` (the spot's
+    #   position within each line) at `spot_starts[s]:spot_starts[s+1]`,
+    #   where s = row * base + col.
+
+    def __init__(self, height : int, base : int, connect : int = 4):
+        self.height = height
+        self.base = base
+        self.connect = connect
+        self.paths = {
+            'cols' : tuple(map(tuple, generate_col_paths(height, base))),
+            'rows' : tuple(map(tuple, generate_row_paths(height, base))),
+            'ndiags' : tuple(map(tuple, generate_ndiag_paths(height, base,
+                                                             connect))),
+            'pdiags' : tuple(map(tuple, generate_pdiag_paths(height, base,
+                                                             connect))) }
+        self.line_rows = array('l')
+        self.line_cols = array('l')
+        self.line_starts = array('l', [0])
+        through = [[] for _ in range(height * base)]
+        for paths in self.paths.values():
+            for path in paths:
+                line = len(self.line_starts) - 1
+                for position, (row, col) in enumerate(path):
+                    self.line_rows.append(row)
+                    self.line_cols.append(col)
+                    through[row * base + col].append((line, position))
+                self.line_starts.append(len(self.line_rows))
+        self.spot_lines = array('l')
+        self.spot_positions = array('l')
+        self.spot_starts = array('l', [0])
+        for lines in through:
+            for line, position in lines:
+                self.spot_lines.append(line)
+                self.spot_positions.append(position)
+            self.spot_starts.append(len(self.spot_lines))
+
+    def lines_through(self, row : int, col : int):
+        # (line, position in line) for each line through the spot
+        spot = row * self.base + col
+        start, end = self.spot_starts[spot], self.spot_starts[spot + 1]
+        return zip(self.spot_lines[start:end], self.spot_positions[start:end])
+
+
+@functools.lru_cache(maxsize=64)
+def get_line_index(height : int, base : int, connect : int = 4) -> LineIndex:
+    return LineIndex(height, base, connect)
+
+
+def generate_col_paths(height : int, base : int):
+    # Collecting all the "cols": downward column paths
+    paths = []
+    for col in range(0, base):
+        path = []
+        for row in reversed(range(0, height)):
+            spot = (row, col)
+            path.append(spot)
+        paths.append(path)
+    return paths
+
+def generate_row_paths(height : int, base : int):
+    # Collecting all the "rows": leftward row paths
+    paths = []
+    for row in range(0, height):
+        path = []
+        for col in range(0, base):
+            spot = (row, col)
+            path.append(spot)
+        paths.append(path)
+    return paths
+
+def generate_ndiag_paths(height : int, base : int, connect : int = 4):
+    # Collecting all the "ndiags":
+    #  the negatively-sloped left-to-right diagonal paths
+    #  (only those long enough for `connect` pucks)
+    paths = []
+    # Paths starting from the left side (and top, for last path):
+    col_start = 0
+    row_start_min = connect - 1  # (need space for `connect` pucks)
+    row_start_max = height - 1
+    for row_start in range(row_start_min, row_start_max + 1):
+        path = []
+        row = row_start
+        col = col_start
+        while row >= 0 and col < base:
+            spot = (row, col)
+            path.append(spot)
+            row -= 1
+            col += 1
+        paths.append(path)
+    # Paths starting from the top (except the first, see above):
+    row_start = height - 1
+    col_start_min = 1
+    col_start_max = base - connect  # (need space for `connect` pucks)
+    for col_start in range(col_start_min, col_start_max + 1):
+        path = []
+        row = row_start
+        col = col_start
+        while row >= 0 and col < base:
+            spot = (row, col)
+            path.append(spot)
+            row -= 1
+            col += 1
+        paths.append(path)
+    return paths
+
+def generate_pdiag_paths(height : int, base : int, connect : int = 4):
+    # Collecting all the "pdiags":
+    #  the positively-sloped left-to-right diagonal paths
+    #  (only those long enough for `connect` pucks)
+    paths = []
+    # Paths starting from the left side (and bottom, for last path):
+    col_start = 0
+    row_start_max = height - connect # (need space for `connect` pucks)
+    row_start_min = 0
+    for row_start in reversed(range(row_start_min, row_start_max + 1)):
+        path = []
+        row = row_start
+        col = col_start
+        while row < height and col < base:
+            spot = (row, col)
+            path.append(spot)
+            row += 1
+            col += 1
+        paths.append(path)
+    # Paths starting from the bottom (except the first, see above):
+    row_start = 0
+    col_start_min = 1
+    col_start_max = base - connect  # (need space for `connect` pucks)
+    for col_start in range(col_start_min, col_start_max + 1):
+        path = []
+        row = row_start
+        col = col_start
+        while row < height and col < base:
+            spot = (row, col)
+            path.append(spot)
+            row += 1
+            col += 1
+        paths.append(path)
+    return paths
+
 
 def show_shape(arbitrary_list):
     shape(arbitrary_list)
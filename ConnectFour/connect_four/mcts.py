@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+# filename: mcts.py
+
+"""
+mcts.py
+~~~~~~~
+A Monte Carlo Tree Search (UCT) computer opponent for Connect Four, for
+boards too large for the exhaustive search in `solver.py` (e.g. 12x14).
+
+Each iteration walks down the tree choosing children by the UCT bound,
+expands the leaf (all of its children at once), plays a uniformly random
+game out from one new child, and sends the result back up the path.
+
+The tree is a node store of parallel arrays (visits, values, moves,
+first child, child count, ...) indexed by node number, not per-node
+objects; a node's children are numbered consecutively.  Positions are
+not stored at all: they are replayed move by move on the solver's two-
+integer bitboards on the way down.  Between turns the subtree of the
+position actually reached is kept (compacted into new arrays) and the
+rest is dropped.
+
+With `processes` > 1, root-parallel search also runs independent trees
+from the same position in a process pool, and the root statistics of
+all trees are summed to choose the move.
+
+To let the computer play player 2 in a terminal game:
+
+    cf = ConnectFour(12, 14)
+    cf.computer_players[2] = MCTSPlayer(time_limit=2.0, verbose=True)
+    cf.session()
+"""
+
+import math
+import multiprocessing
+import random
+import time
+from array import array
+
+from .bitboard import has_connect
+from .solver import Solver
+
+
+# `terminals` values: how the move into a node ended the game
+NOT_TERMINAL = 0
+WIN = 1   # the player who moved into the node won
+DRAW = 2
+
+
+class MCTSStats:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.playouts = 0
+        self.elapsed = 0.0     # seconds
+        self.nodes = 0         # nodes in the tree after the search
+        self.reused_nodes = 0  # nodes kept from the previous turn's tree
+
+    @property
+    def playouts_per_sec(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        return (f'{self.playouts} playouts in {self.elapsed:.2f} s '
+                f'({self.playouts_per_sec:,.0f} playouts/sec), '
+                f'{self.nodes} nodes ({self.reused_nodes} reused)')
+
+
+class MCTS:
+
+    def __init__(self, height : int = 6, base : int = 7,
+                 exploration : float = 1.4, seed : int = None,
+                 max_nodes : int = 1 << 20, connect : int = 4):
+        self.height = height
+        self.base = base
+        self.connect = connect
+        self.exploration = exploration
+        self.max_nodes = max_nodes  # no more expansions once this is reached
+        self.rng = random.Random(seed)
+        # used only for its bitboard masks and position helpers
+        self.board = Solver(height, base, tt_size=1)
+        self.bottom_masks = self.board.bottom_masks
+        self.column_masks = self.board.column_masks
+        self.top_masks = [1 << (col * self.board.stride + height - 1)
+                          for col in range(base)]
+        self.stats = MCTSStats()
+        self.clear()
+
+    def clear(self):
+        # The node store; node 0 is the root.
+        self.visits = array('l', [0])
+        self.values = array('d', [0.0])  # for the player who moved into it
+        self.moves = array('l', [-1])    # 0-based column moved into the node
+        self.terminals = array('b', [NOT_TERMINAL])
+        self.first_child = array('l', [0])
+        self.child_counts = array('l', [0])
+        self.root_pucks = None  # (pucks_1, pucks_2) at the root
+        self.root_history = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.visits)
+
+    # Positions
+    # -------------------------------------------------------------------------
+
+    def has_four(self, pucks : int) -> bool:
+        # (`connect` in a line)
+        return has_connect(pucks, self.board.stride, self.connect)
+
+    def set_root(self, pucks_1 : int, pucks_2 : int, history = None):
+        # Move the root to the given position, keeping the subtree of the
+        # current tree that leads to it when `history` (the 1-based columns
+        # played so far, as `ConnectFour.move_history`) extends the
+        # history of the current root.  Returns the number of nodes kept.
+        node = None
+        old = self.root_history
+        if history is not None and old is not None and \
+           list(history[:len(old)]) == old:
+            node = 0
+            for col in history[len(old):]:
+                node = self.find_child(node, col - 1)
+                if node is None:
+                    break
+        if node is None:
+            self.clear()
+        elif node != 0:
+            self.keep_subtree(node)
+        self.root_pucks = (pucks_1, pucks_2)
+        self.root_history = None if history is None else list(history)
+        return self.node_count if node is not None else 0
+
+    def find_child(self, node : int, col : int):
+        first = self.first_child[node]
+        for child in range(first, first + self.child_counts[node]):
+            if self.moves[child] == col:
+                return child
+        return None
+
+    def keep_subtree(self, node : int):
+        # Rebuild the node store with only the subtree under `node`, which
+        # becomes the root.  Nodes are renumbered breadth first, so each
+        # node's children stay consecutive.
+        visits, values, moves = array('l'), array('d'), array('l')
+        terminals, first_child, child_counts = array('b'), array('l'), array('l')
+        queue = [node]
+        for old in queue:  # `queue` grows while it is walked
+            visits.append(self.visits[old])
+            values.append(self.values[old])
+            moves.append(self.moves[old])
+            terminals.append(self.terminals[old])
+            count = self.child_counts[old]
+            first_child.append(len(queue) if count else 0)
+            child_counts.append(count)
+            first = self.first_child[old]
+            queue.extend(range(first, first + count))
+        moves[0] = -1
+        self.visits, self.values, self.moves = visits, values, moves
+        self.terminals, self.first_child = terminals, first_child
+        self.child_counts = child_counts
+
+    # Search
+    # -------------------------------------------------------------------------
+
+    def search(self, iterations : int = None, time_limit : float = None):
+        # Run MCTS iterations from the root until `iterations` have been
+        # run or `time_limit` seconds have passed (at least one of the
+        # two must be given); adds to `stats`.  Returns the iterations run.
+        if iterations is None and time_limit is None:
+            raise ValueError('Give an iteration or a time budget.')
+        pucks_1, pucks_2 = self.root_pucks
+        mask = pucks_1 | pucks_2
+        current = pucks_2 if mask.bit_count() % 2 else pucks_1
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        done = 0
+        while iterations is None or done < iterations:
+            # check the clock every 16 iterations
+            if deadline is not None and done % 16 == 0 and \
+               time.perf_counter() >= deadline:
+                break
+            self.iterate(current, mask)
+            done += 1
+        self.stats.playouts += done
+        self.stats.elapsed += time.perf_counter() - start
+        self.stats.nodes = self.node_count
+        return done
+
+    def iterate(self, current : int, mask : int):
+        # One iteration from the root position (current, mask): select,
+        # expand, play out, and back up.
+        visits, values, moves = self.visits, self.values, self.moves
+        terminals = self.terminals
+        first_child, child_counts = self.first_child, self.child_counts
+        log = math.log
+        sqrt = math.sqrt
+        c = self.exploration
+        node = 0
+        path = [0]
+        # 1. selection
+        while child_counts[node] and not terminals[node]:
+            first = first_child[node]
+            log_n = log(visits[node])
+            best, best_bound = first, -1.0
+            for child in range(first, first + child_counts[node]):
+                n = visits[child]
+                if n == 0:
+                    best = child
+                    break
+                bound = values[child] / n + c * sqrt(log_n / n)
+                if bound > best_bound:
+                    best, best_bound = child, bound
+            node = best
+            col = moves[node]
+            move = (mask + self.bottom_masks[col]) & self.column_masks[col]
+            current, mask = current ^ mask, mask | move
+            path.append(node)
+        # 2. expansion
+        if not terminals[node] and visits[node] > 0 and \
+           self.node_count < self.max_nodes:
+            self.expand(node, current, mask)
+            node = first_child[node] + self.rng.randrange(child_counts[node])
+            col = moves[node]
+            move = (mask + self.bottom_masks[col]) & self.column_masks[col]
+            current, mask = current ^ mask, mask | move
+            path.append(node)
+        # 3. playout, scored for the player who moved into `node`
+        if terminals[node] == WIN:
+            reward = 1.0
+        elif terminals[node] == DRAW:
+            reward = 0.5
+        elif node == 0 and self.is_terminal_root(current, mask):
+            return
+        else:
+            reward = 1.0 - self.playout(current, mask)
+        # 4. backup
+        for node in reversed(path):
+            visits[node] += 1
+            values[node] += reward
+            reward = 1.0 - reward
+
+    def is_terminal_root(self, current : int, mask : int) -> bool:
+        return self.has_four(current ^ mask) or \
+               mask == self.board.board_mask
+
+    def expand(self, node : int, current : int, mask : int):
+        # Add all the children of `node` (whose position is current, mask).
+        first = self.node_count
+        count = 0
+        full = self.board.board_mask
+        for col in self.board.order:
+            if mask & self.top_masks[col]:
+                continue
+            move = (mask + self.bottom_masks[col]) & self.column_masks[col]
+            if self.has_four(current | move):
+                terminal = WIN
+            elif mask | move == full:
+                terminal = DRAW
+            else:
+                terminal = NOT_TERMINAL
+            self.visits.append(0)
+            self.values.append(0.0)
+            self.moves.append(col)
+            self.terminals.append(terminal)
+            self.first_child.append(0)
+            self.child_counts.append(0)
+            count += 1
+        self.first_child[node] = first
+        self.child_counts[node] = count
+
+    def playout(self, current : int, mask : int) -> float:
+        # Play uniformly random moves from (current, mask) to the end of
+        # the game; return 1 if the player to move wins, 0.5 for a draw
+        # and 0 for a loss.
+        randrange = self.rng.randrange
+        base = self.base
+        bottom_masks, column_masks = self.bottom_masks, self.column_masks
+        top_masks = self.top_masks
+        has_four = self.has_four
+        full = self.board.board_mask
+        reward = 1.0  # for the player to move at the start of the playout
+        while mask != full:
+            col = randrange(base)
+            while mask & top_masks[col]:
+                col = randrange(base)
+            move = (mask + bottom_masks[col]) & column_masks[col]
+            if has_four(current | move):
+                return reward
+            current, mask = current ^ mask, mask | move
+            reward = 1.0 - reward
+        return 0.5
+
+    def root_stats(self):
+        # [(col, visits, value)] of the root's children (0-based cols).
+        first = self.first_child[0]
+        return [(self.moves[child], self.visits[child], self.values[child])
+                for child in range(first, first + self.child_counts[0])]
+
+
+def best_col(root_stats) -> int:
+    # The most visited column (ties to the better average value).
+    return max(root_stats, key=lambda s: (s[1], s[2] / s[1] if s[1] else 0))[0]
+
+def merge_root_stats(all_stats):
+    totals = {}
+    for stats in all_stats:
+        for col, visits, value in stats:
+            old_visits, old_value = totals.get(col, (0, 0.0))
+            totals[col] = (old_visits + visits, old_value + value)
+    return [(col, visits, value) for col, (visits, value) in totals.items()]
+
+def _search_from(args):
+    # Worker for root-parallel search: a fresh tree on the given position.
+    height, base, connect, pucks_1, pucks_2, iterations, time_limit, \
+        exploration, seed = args
+    mcts = MCTS(height, base, exploration, seed, connect=connect)
+    mcts.set_root(pucks_1, pucks_2)
+    mcts.search(iterations, time_limit)
+    return mcts.root_stats(), mcts.stats.playouts
+
+
+class MCTSPlayer:
+    # A computer opponent for `ConnectFour.player_turn_loop`, like
+    # `solver.ComputerPlayer`: assign one to `cf.computer_players[player]`.
+    # Each move gets `iterations` playouts (per tree) or `time_limit`
+    # seconds, whichever comes first.
+
+    def __init__(self, time_limit : float = 1.0, iterations : int = None,
+                 processes : int = 1, exploration : float = 1.4,
+                 seed : int = None, verbose : bool = False):
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.processes = processes
+        self.exploration = exploration
+        self.seed = seed
+        self.verbose = verbose
+        self.trees = {}  # one tree per (height, base, connect), reused
+                         # between turns
+        self.pool = None
+        self.stats = MCTSStats()  # of the last move
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __getstate__(self):
+        # (for process pools, e.g. the simulator's) trees and pools stay here
+        state = self.__dict__.copy()
+        state['trees'] = {}
+        state['pool'] = None
+        return state
+
+    def tree_for(self, game) -> MCTS:
+        size = (game.height, game.base, game.connect)
+        if size not in self.trees:
+            self.trees[size] = MCTS(game.height, game.base, self.exploration,
+                                    self.seed, connect=game.connect)
+        return self.trees[size]
+
+    def choose_col(self, game) -> int:
+        tree = self.tree_for(game)
+        board = tree.board
+        current, mask, _, _, _ = board.position_from_game(game)
+        if mask.bit_count() % 2:
+            pucks_1, pucks_2 = current ^ mask, current
+        else:
+            pucks_1, pucks_2 = current, current ^ mask
+        tree.stats.reset()
+        tree.stats.reused_nodes = tree.set_root(pucks_1, pucks_2,
+                                                game.move_history)
+        if self.processes > 1:
+            start = time.perf_counter()
+            if self.pool is None:
+                self.pool = multiprocessing.Pool(self.processes - 1)
+            seed = tree.rng.getrandbits(32)
+            jobs = [(game.height, game.base, game.connect, pucks_1, pucks_2,
+                     self.iterations, self.time_limit, self.exploration,
+                     seed + i) for i in range(self.processes - 1)]
+            pending = self.pool.map_async(_search_from, jobs)
+            tree.search(self.iterations, self.time_limit)
+            results = pending.get()
+            stats = merge_root_stats([tree.root_stats()] +
+                                     [result[0] for result in results])
+            tree.stats.playouts += sum(result[1] for result in results)
+            tree.stats.elapsed = time.perf_counter() - start
+        else:
+            tree.search(self.iterations, self.time_limit)
+            stats = tree.root_stats()
+        self.stats = tree.stats
+        col = best_col(stats) + 1
+        if self.verbose:
+            visits, value = next((v, w) for c, v, w in stats if c == col - 1)
+            print(f'  (MCTS: {self.stats.report()}; column {col} won ' + \
+                  f'{value / max(visits, 1):.0%} of {visits} playouts)')
+        return col
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# filename: opening_book.py
+
+"""
+opening_book.py
+~~~~~~~~~~~~~~~
+A precomputed opening book for Connect Four.  The generator searches
+every position reachable within a configurable number of plies (for a
+given `height`/`base`) with the solver and writes the results to a
+compact binary file of fixed-size records, sorted by position key.
+
+Position keys are exact (not hashed): for each column, the bits of
+player 1's pucks plus the bits of all pucks, in the bitboard layout of
+`bitboard.py`.  Since the pucks of a column fill it from the bottom up,
+this sum is different for every position.  A position and its mirror
+image have the same best move (mirrored) and score, so only the smaller
+of the two keys is stored, which halves the file.
+
+Lookups binary-search the file through `mmap`, so opening a book costs
+the same whatever its size: nothing is loaded up front.
+
+File layout (little-endian header, then the records):
+
+    magic b'C4BK', version, height, base, depth, key size (bytes), count
+    count x [ key (big-endian, key-size bytes), col, score, depth, flags ]
+
+To build a book, execute the following in a shell terminal (in the
+directory above this package):
+python3 -m connect_four.opening_book book.c4bk --depth 6 --time-limit 1
+"""
+
+import argparse
+import mmap
+import struct
+
+from .solver import SearchResult, Solver
+
+
+MAGIC = b'C4BK'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBB3xQ')
+ENTRY = struct.Struct('BbBB')  # col (0-based), score, search depth, flags
+SOLVED = 0x01                  # flags: the score is the game-theoretic value
+
+
+def key_size(height : int, base : int) -> int:
+    return (base * (height + 1) + 7) // 8
+
+def check_book_size(height : int, base : int, depth : int):
+    # The header holds these (and the key size) in one byte each.
+    if height > 255 or base > 255:
+        raise ValueError('Opening books hold catchers of at most 255 ' + \
+                         'rows and 255 columns.')
+    if depth > 255:
+        raise ValueError('Opening books hold positions of at most 255 pucks.')
+    if key_size(height, base) > 255:
+        raise ValueError('Opening books hold position keys of at most ' + \
+                         '255 bytes (base * (height + 1) <= 2040).')
+
+def position_key(pucks_1 : int, mask : int) -> int:
+    return pucks_1 + mask
+
+def mirror_bits(bits : int, height : int, base : int) -> int:
+    # Reflect a bitboard left to right (column `col` <-> `base - 1 - col`).
+    stride = height + 1
+    column = (1 << stride) - 1
+    mirrored = 0
+    for col in range(base):
+        mirrored |= ((bits >> (col * stride)) & column) << \
+                    ((base - 1 - col) * stride)
+    return mirrored
+
+def canonical_key(pucks_1 : int, mask : int, height : int, base : int):
+    # Return (key, mirrored): the smaller of the position's key and its
+    # mirror image's key, and whether the mirror image's key was taken.
+    key = position_key(pucks_1, mask)
+    mirror_key = position_key(mirror_bits(pucks_1, height, base),
+                              mirror_bits(mask, height, base))
+    if mirror_key < key:
+        return mirror_key, True
+    return key, False
+
+
+# Building
+# -----------------------------------------------------------------------------
+
+def build_opening_book(path : str, height : int = 6, base : int = 7,
+                       depth : int = 4, time_limit : float = 1.0,
+                       max_search_depth : int = None, progress = None):
+    # Search every (non-finished) position with at most `depth` pucks and
+    # write the book to `path`.  `time_limit` and `max_search_depth` bound
+    # the search of each position.  `progress`, if given, is called with
+    # (positions done, ply) after each position.  Returns the number of
+    # records written.
+    depth = min(depth, height * base - 1)
+    check_book_size(height, base, depth)
+    solver = Solver(height, base)
+    records = {}
+    level = {canonical_key(0, 0, height, base)[0]: (0, 0)}
+    for ply in range(depth + 1):
+        next_level = {}
+        for key, (pucks_1, pucks_2) in level.items():
+            position = solver.position_from_pucks(pucks_1, pucks_2)
+            result = solver.solve_position(*position, time_limit=time_limit,
+                                           max_depth=max_search_depth)
+            col = result.col - 1
+            if canonical_key(pucks_1, pucks_1 | pucks_2, height, base)[1]:
+                col = base - 1 - col  # store the canonical orientation's col
+            flags = SOLVED if result.solved else 0
+            records[key] = (col, result.score, min(result.depth, 255), flags)
+            if progress is not None:
+                progress(len(records), ply)
+            if ply == depth:
+                continue
+            current, mask, _, _, side = position
+            for col in range(base):
+                move = (mask + solver.bottom_masks[col]) & \
+                       solver.column_masks[col]
+                if not move or \
+                   solver.winning_spots(current, mask) & move:
+                    continue  # full column, or the game ends here
+                if side == 0:
+                    child = (pucks_1 | move, pucks_2)
+                else:
+                    child = (pucks_1, pucks_2 | move)
+                child_key, _ = canonical_key(child[0], mask | move,
+                                             height, base)
+                next_level.setdefault(child_key, child)
+        level = next_level
+    write_opening_book(path, records, height, base, depth)
+    return len(records)
+
+def write_opening_book(path : str, records : dict, height : int, base : int,
+                       depth : int):
+    # `records` maps canonical keys to (col, score, depth, flags), with
+    # `col` the best (0-based) column in the canonical orientation.
+    check_book_size(height, base, depth)
+    size = key_size(height, base)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, height, base, depth, size,
+                            len(records)))
+        for key in sorted(records):
+            f.write(key.to_bytes(size, 'big'))
+            f.write(ENTRY.pack(*records[key]))
+
+
+# Lookups
+# -----------------------------------------------------------------------------
+
+class OpeningBook:
+
+    def __init__(self, path : str):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.height, self.base, self.depth, self.key_size, \
+            self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a Connect Four opening book.')
+        self.record_size = self.key_size + ENTRY.size
+        if len(self.mm) != HEADER.size + self.count * self.record_size:
+            self.close()
+            raise ValueError(f'{path} is truncated or corrupted.')
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+    def find(self, key : int):
+        # Binary search for `key`; return (col, score, depth, flags) or None.
+        target = key.to_bytes(self.key_size, 'big')
+        mm, size, record_size = self.mm, self.key_size, self.record_size
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * record_size
+            if mm[offset:offset + size] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            offset = HEADER.size + low * record_size
+            if mm[offset:offset + size] == target:
+                return ENTRY.unpack_from(mm, offset + size)
+        return None
+
+    def lookup_pucks(self, pucks_1 : int, pucks_2 : int):
+        # Return a SearchResult (with a 1-based column) for the position,
+        # or None if it is not in the book.
+        key, mirrored = canonical_key(pucks_1, pucks_1 | pucks_2,
+                                      self.height, self.base)
+        entry = self.find(key)
+        if entry is None:
+            return None
+        col, score, depth, flags = entry
+        if mirrored:
+            col = self.base - 1 - col
+        return SearchResult(col + 1, score, depth, bool(flags & SOLVED))
+
+    def lookup(self, game):
+        # Book entry for `game`'s position (None if the board size differs
+        # or the position is not in the book).
+        if (game.height, game.base) != (self.height, self.base):
+            return None
+        stride = self.height + 1
+        pucks = [0, 0]
+        for row in range(self.height):
+            for col in range(self.base):
+                value = game.catcher[row][col]
+                if value in {1, 2}:
+                    pucks[value - 1] |= 1 << (col * stride + row)
+        return self.lookup_pucks(pucks[0], pucks[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a Connect Four ' + \
+                                     'opening book.')
+    parser.add_argument('path')
+    parser.add_argument('--height', type=int, default=6)
+    parser.add_argument('--base', type=int, default=7)
+    parser.add_argument('--depth', type=int, default=4,
+                        help='book positions with up to this many pucks')
+    parser.add_argument('--time-limit', type=float, default=1.0,
+                        help='search seconds per position')
+    args = parser.parse_args()
+    def progress(done, ply):
+        print(f'\r  {done} positions (ply {ply})', end='', flush=True)
+    count = build_opening_book(args.path, args.height, args.base, args.depth,
+                               args.time_limit, progress=progress)
+    print(f'\nWrote {count} positions to {args.path}.')
+
+
+if __name__ == '__main__':
+    main()
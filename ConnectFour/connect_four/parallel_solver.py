@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# filename: parallel_solver.py
+
+"""
+parallel_solver.py
+~~~~~~~~~~~~~~~~~~
+A parallel mode for the solver in `solver.py`, for deep analysis on many-
+core machines.  Each iteration of the iterative deepening splits the
+root moves across a pool of worker processes (root splitting), and all
+the workers share one transposition table in `multiprocessing.shared_
+memory`, so what one worker learns about a transposition helps the
+others.
+
+The shared table has the same `probe`/`store` interface as
+`solver.TranspositionTable` and is lock-free: each slot is two 64-bit
+words, the packed entry and the entry XOR-ed with its key.  A reader
+only accepts a slot whose two words agree with the key it looks for, so
+a slot torn by two processes writing at once reads as a miss instead of
+a wrong entry.
+
+The root moves are searched with the same null-window (win/draw/loss)
+search and in the same order as `Solver.search_root`, and the best move
+is the first one in that order with the best score.  Once a root move is
+proven to win, the workers searching moves later in the order give up.
+With `processes=1` the search is exactly the sequential
+`Solver.solve` (a deterministic fallback).
+
+To compare the speed-up over the sequential solver, execute the
+following in a shell terminal (in the directory above this package):
+python3 -m connect_four.parallel_solver --moves 4453 --processes 1 2 4 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+from .connect_four import ConnectFour
+from .solver import EXACT, WIN_SCORE, SearchResult, SearchTimeout, Solver
+
+
+# Packed slot layout (data word): depth + 1 (0 marks an empty slot),
+# flag, move + 1, generation, and score + SCORE_OFFSET.
+DEPTH_BITS, FLAG_BITS, MOVE_BITS, GENERATION_BITS = 8, 2, 8, 8
+FLAG_SHIFT = DEPTH_BITS
+MOVE_SHIFT = FLAG_SHIFT + FLAG_BITS
+GENERATION_SHIFT = MOVE_SHIFT + MOVE_BITS
+SCORE_SHIFT = GENERATION_SHIFT + GENERATION_BITS
+SCORE_OFFSET = WIN_SCORE + 16
+KEY_MASK = (1 << 64) - 1
+
+
+class SharedTranspositionTable:
+    # A `TranspositionTable` in shared memory, for the solvers of several
+    # processes.  The creating process owns the memory (and unlinks it on
+    # `close`); the others `attach` to it by name.
+
+    def __init__(self, size : int = 1 << 20, name : str = None):
+        size = 1 << max(0, size - 1).bit_length()  # round up to a power of two
+        self.size = size
+        self.index_mask = size - 1
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True,
+                                                     size=16 * size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        # slot i: words[2 * i] = key ^ data, words[2 * i + 1] = data
+        self.words = self.memory.buf.cast('Q')
+        self.generation = 0
+        if self.owner:
+            self.clear()
+
+    @classmethod
+    def attach(cls, name : str, size : int):
+        return cls(size, name)
+
+    def close(self):
+        self.words.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+
+    def probe(self, key : int):
+        # Return (depth, flag, score, move) for `key`, or None.
+        key &= KEY_MASK
+        index = key & self.index_mask
+        data = self.words[2 * index + 1]
+        if data == 0 or self.words[2 * index] ^ data != key:
+            return None
+        return unpack_entry(data)[:4]
+
+    def store(self, key : int, depth : int, flag : int, score : int, move : int):
+        # Same replacement policy as `TranspositionTable.store`.
+        key &= KEY_MASK
+        index = key & self.index_mask
+        data = self.words[2 * index + 1]
+        if data:
+            old_depth, _, _, _, old_generation = unpack_entry(data)
+            if self.words[2 * index] ^ data != key and old_depth > depth and \
+               old_generation == self.generation % (1 << GENERATION_BITS):
+                return
+        data = pack_entry(depth, flag, score, move, self.generation)
+        self.words[2 * index + 1] = data
+        self.words[2 * index] = key ^ data
+
+
+def pack_entry(depth, flag, score, move, generation) -> int:
+    return ((min(depth, (1 << DEPTH_BITS) - 2) + 1) |
+            flag << FLAG_SHIFT |
+            (move + 1) << MOVE_SHIFT |
+            (generation % (1 << GENERATION_BITS)) << GENERATION_SHIFT |
+            (score + SCORE_OFFSET) << SCORE_SHIFT)
+
+def unpack_entry(data : int):
+    # (depth, flag, score, move, generation)
+    return ((data & ((1 << DEPTH_BITS) - 1)) - 1,
+            (data >> FLAG_SHIFT) & ((1 << FLAG_BITS) - 1),
+            (data >> SCORE_SHIFT) - SCORE_OFFSET,
+            ((data >> MOVE_SHIFT) & ((1 << MOVE_BITS) - 1)) - 1,
+            (data >> GENERATION_SHIFT) & ((1 << GENERATION_BITS) - 1))
+
+
+# Workers
+# -----------------------------------------------------------------------------
+
+class WorkerSolver(Solver):
+    # A solver for one root move, that also stops once a root move earlier
+    # in the order has been proven to win (`cutoff` is the shared index
+    # of the earliest winning root move found so far).  A task is short,
+    # so the clock and the cutoff are checked more often than in
+    # `Solver`.
+
+    time_check_mask = 511
+
+    def __init__(self, height, base, seed, table_name, tt_size, cutoff):
+        super().__init__(height, base, tt_size=1, seed=seed)
+        self.tt = SharedTranspositionTable.attach(table_name, tt_size)
+        self.cutoff = cutoff
+        self.root_index = 0
+
+    def out_of_time(self) -> bool:
+        if self.cutoff.value < self.root_index:
+            return True
+        return time.monotonic() > self.deadline
+
+
+_worker = {}
+
+def _init_worker(height, base, seed, table_name, tt_size, cutoff):
+    _worker['solver'] = WorkerSolver(height, base, seed, table_name, tt_size,
+                                     cutoff)
+
+def _search_root_move(task):
+    # Search one root move; returns (index, score or None if stopped,
+    # nodes, TT probes, TT hits).
+    (index, current, mask, moves, depth, key, side, move, generation,
+     deadline) = task
+    solver = _worker['solver']
+    solver.tt.generation = generation
+    solver.root_index = index
+    solver.stats.reset()
+    # The deadline is absolute (`time.monotonic()`), the same for every
+    # task of the search, so a task that waited in the queue doesn't get
+    # a fresh budget.  The cutoff is also checked on the timer, so always
+    # have a deadline.
+    solver.deadline = deadline if deadline is not None else float('inf')
+    score = None
+    if solver.cutoff.value >= index and not solver.out_of_time():
+        try:
+            score = -solver.negamax(current ^ mask, mask | move, moves + 1,
+                                    depth - 1, -1, 1,
+                                    key ^ solver.zobrist_moves[side][move.bit_length() - 1],
+                                    side ^ 1)
+            score = (score > 0) - (score < 0)
+        except SearchTimeout:
+            pass
+    stats = solver.stats
+    return index, score, stats.nodes, stats.tt_probes, stats.tt_hits
+
+
+class ParallelSolver:
+
+    def __init__(self, height : int = 6, base : int = 7,
+                 tt_size : int = 1 << 20, seed : int = 0,
+                 processes : int = None):
+        self.height = height
+        self.base = base
+        self.processes = processes or os.cpu_count() or 1
+        if self.processes == 1:
+            self.solver = Solver(height, base, tt_size, seed)
+            self.pool = None
+            return
+        self.solver = Solver(height, base, tt_size=1, seed=seed)
+        self.solver.tt = SharedTranspositionTable(tt_size)
+        self.cutoff = multiprocessing.Value('i', 0, lock=False)
+        self.pool = multiprocessing.Pool(
+            self.processes, initializer=_init_worker,
+            initargs=(height, base, seed, self.solver.tt.name,
+                      self.solver.tt.size, self.cutoff))
+
+    @property
+    def stats(self):
+        return self.solver.stats
+
+    @property
+    def tt(self):
+        return self.solver.tt
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+            self.solver.tt.close()
+
+    def solve(self, game, time_limit : float = None, max_depth : int = None):
+        # Same as `Solver.solve`.  The deadline is set once, here, and
+        # every task of the search stops at it.
+        deadline = None if time_limit is None else \
+                   time.monotonic() + time_limit
+        if game.connect != 4:
+            raise ValueError('The solver only plays connect four.')
+        return self.solve_position(*self.solver.position_from_game(game),
+                                   time_limit=time_limit, max_depth=max_depth,
+                                   deadline=deadline)
+
+    def solve_position(self, current, mask, moves, key, side,
+                       time_limit : float = None, max_depth : int = None,
+                       deadline : float = None):
+        # Same as `Solver.solve_position`, with the root moves of each
+        # iteration searched in parallel.  `deadline`: an absolute
+        # `time.monotonic()` time to stop at (by default, `time_limit`
+        # from now).
+        if deadline is None and time_limit is not None:
+            deadline = time.monotonic() + time_limit
+        solver = self.solver
+        if self.pool is None:
+            return solver.solve_position(current, mask, moves, key, side,
+                                         time_limit, max_depth)
+        if moves >= solver.size or \
+           not (mask + solver.bottom_mask) & solver.board_mask:
+            raise ValueError('There are no moves left to search.')
+        solver.stats.reset()
+        solver.tt.new_search()
+        start = time.perf_counter()
+        remaining = solver.size - moves
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+        result = None
+        for depth in range(1, max_depth + 1):
+            outcome = self.search_root(current, mask, moves, depth, key, side,
+                                       deadline)
+            if outcome is None:
+                break  # out of time
+            score, col = outcome
+            solver.stats.depth = depth
+            solved = score != 0 or depth >= remaining
+            result = SearchResult(col + 1, score, depth, solved)
+            if solved:
+                break
+        solver.stats.elapsed = time.perf_counter() - start
+        if result is None:
+            col = solver.ordered_moves(current, mask,
+                                       (mask + solver.bottom_mask) &
+                                       solver.board_mask, key)[0][0]
+            result = SearchResult(col + 1, 0, 0, False)
+        return result
+
+    def search_root(self, current, mask, moves, depth, key, side, deadline):
+        # `Solver.search_root`, with the candidate moves searched by the
+        # pool.  Returns (score, col), or None if time ran out.
+        solver = self.solver
+        possible = (mask + solver.bottom_mask) & solver.board_mask
+        wins = solver.winning_spots(current, mask) & possible
+        if wins:
+            col = next(col for col in solver.order
+                       if wins & solver.column_masks[col])
+            return 1, col
+        opponent_wins = solver.winning_spots(current ^ mask, mask)
+        safe = possible & ~(opponent_wins >> 1)
+        forced = possible & opponent_wins
+        if forced:
+            safe &= forced
+        candidates = solver.ordered_moves(current, mask, safe or possible, key)
+        self.cutoff.value = len(candidates)
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+        tasks = [(index, current, mask, moves, depth, key, side, move,
+                  solver.tt.generation, deadline)
+                 for index, (col, move) in enumerate(candidates)]
+        scores = [None] * len(candidates)
+        stats = solver.stats
+        for index, score, nodes, probes, hits in \
+                self.pool.imap_unordered(_search_root_move, tasks):
+            scores[index] = score
+            stats.nodes += nodes
+            stats.tt_probes += probes
+            stats.tt_hits += hits
+            if score == 1 and index < self.cutoff.value:
+                self.cutoff.value = index  # stop the later root moves
+        # the first move (in order) with the best score, as the sequential
+        # search would pick; moves after a proven win may be unsearched
+        best_score, best_col = -2, candidates[0][0]
+        for index, ((col, _), score) in enumerate(zip(candidates, scores)):
+            if score is None:
+                if index > self.cutoff.value:
+                    break  # stopped after the winning move
+                return None  # out of time
+            if score > best_score:
+                best_score, best_col = score, col
+                if score > 0:
+                    break
+        if not safe:
+            best_score = -1  # every move loses
+        solver.tt.store(key, depth, EXACT, best_score, best_col)
+        return best_score, best_col
+
+
+def speedup_table(game, process_counts, time_limit : float = None,
+                  max_depth : int = None, tt_size : int = 1 << 20):
+    # Solve `game` sequentially and with each number of processes; return
+    # [(processes, SearchResult, seconds, nodes, speed-up)].
+    rows = []
+    baseline = None
+    for processes in process_counts:
+        with ParallelSolver(game.height, game.base, tt_size,
+                            processes=processes) as solver:
+            start = time.perf_counter()
+            result = solver.solve(game, time_limit, max_depth)
+            seconds = time.perf_counter() - start
+            nodes = solver.stats.nodes
+        if baseline is None:
+            baseline = seconds
+        rows.append((processes, result, seconds, nodes, baseline / seconds))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the parallel ' + \
+                                     'solver with the sequential one.')
+    parser.add_argument('--moves', default='',
+                        help='1-based columns played so far, e.g. 4453')
+    parser.add_argument('--height', type=int, default=6)
+    parser.add_argument('--base', type=int, default=7)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=[1, os.cpu_count() or 1])
+    parser.add_argument('--time-limit', type=float, default=None)
+    parser.add_argument('--max-depth', type=int, default=None)
+    args = parser.parse_args()
+    game = ConnectFour(args.height, args.base)
+    for col in args.moves:
+        game.switch_player()
+        game.try_to_place_puck(int(col))
+    game.switch_player()
+    for processes, result, seconds, nodes, speedup in \
+            speedup_table(game, args.processes, args.time_limit,
+                          args.max_depth):
+        print(f'{processes:3} processes: column {result.col}, ' + \
+              f'{result.outcome} (depth {result.depth}), ' + \
+              f'{seconds:.2f} s, {nodes:,} nodes, speed-up x{speedup:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# filename: records.py
+
+"""
+records.py
+~~~~~~~~~~
+A compact binary record format for finished Connect Four games, with an
+append-only log writer and a streaming reader that replays games move by
+move through `try_to_place_puck` and `game_over`.
+
+A log file starts with the magic bytes b'C4GR' and a version byte, and
+then holds one record per game:
+
+    height, base, result (the final `winner`), number of moves n
+        (little-endian: 1, 1, 1 and 2 bytes)
+    ceil(n / 2) bytes of moves, one nibble per 0-based column index,
+        low nibble first
+
+so boards are limited to 16 columns.  A typical 6x7 game takes about 20
+bytes.  Next to the log, `<log>.idx` holds the byte offset of every
+record as 8-byte little-endian integers, so the reader can seek to game
+N directly; it is rebuilt from the log if missing or stale.
+"""
+
+import os
+import struct
+from array import array
+
+from .connect_four import ConnectFour
+
+
+MAGIC = b'C4GR'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sB')
+RECORD_HEADER = struct.Struct('<BBBH')  # height, base, result, moves
+
+
+def pack_moves(moves) -> bytes:
+    # `moves` are 0-based column indexes (0-15)
+    packed = bytearray((len(moves) + 1) // 2)
+    for i, col in enumerate(moves):
+        packed[i // 2] |= col << (4 * (i % 2))
+    return bytes(packed)
+
+def unpack_moves(packed : bytes, count : int) -> list:
+    return [(packed[i // 2] >> (4 * (i % 2))) & 0x0F for i in range(count)]
+
+
+def check_recordable(height : int, base : int, connect : int = 4):
+    # Raise ValueError unless games of this size (and line length) fit in
+    # a record.
+    if connect != 4:
+        raise ValueError('Game records hold connect-four games only.')
+    if base > 16:
+        raise ValueError('Game records hold at most 16 columns ' + \
+                         '(one nibble per move).')
+    if height > 255:
+        raise ValueError('Game records hold at most 255 rows.')
+
+
+class GameRecord:
+
+    def __init__(self, height : int, base : int, winner : int, moves : list):
+        self.height = height
+        self.base = base
+        self.winner = winner  # as `ConnectFour.winner`: 0, 1 or 2
+        self.moves = moves    # 0-based column indexes, in order
+
+    def __repr__(self):
+        return (f'GameRecord(height={self.height}, base={self.base}, '
+                f'winner={self.winner}, moves={self.moves})')
+
+    def replay(self, game = None):
+        # Replay the game on `game` (default: a new ConnectFour of the
+        # record's size), yielding the game after each puck is placed.
+        if game is None:
+            game = ConnectFour(self.height, self.base)
+        else:
+            game.reset_for_new_game(base=self.base, height=self.height)
+        for col in self.moves:
+            if game.game_over():
+                raise ValueError('The recorded game continues after its end.')
+            game.switch_player()
+            if not game.try_to_place_puck(col + 1):
+                raise ValueError(f'The recorded move {col + 1} is not valid.')
+            yield game
+
+    def verify(self, game = None) -> bool:
+        # Replay the whole game and check that it ends with the recorded
+        # result.
+        game = ConnectFour(self.height, self.base) if game is None else game
+        for game in self.replay(game):
+            pass
+        return game.game_over() and game.winner == self.winner
+
+
+class GameRecordWriter:
+    # Appends records to the log at `path` (creating it if needed) and
+    # their offsets to the index next to it.
+
+    def __init__(self, path : str):
+        self.path = path
+        GameRecordReader.rebuild_index_if_stale(path)
+        # cut off a record left partly written (e.g. by an interrupted
+        # append), so that the new records follow the last whole one
+        end = GameRecordReader.records_end(path)
+        self.file = open(path, 'ab')
+        if end is not None and end < self.file.tell():
+            self.file.truncate(end)
+            self.file.seek(end)
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.index = open(path + '.idx', 'ab')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+        self.index.close()
+
+    def write(self, height : int, base : int, winner : int, moves):
+        check_recordable(height, base)
+        self.index.write(struct.pack('<Q', self.file.tell()))
+        self.file.write(RECORD_HEADER.pack(height, base, winner, len(moves)))
+        self.file.write(pack_moves(moves))
+
+    def record(self, game):
+        # Record a finished game (as `ConnectFour.recorder`).
+        check_recordable(game.height, game.base, game.connect)
+        self.write(game.height, game.base, game.winner,
+                   [col - 1 for col in game.move_history])
+
+
+class GameRecordReader:
+
+    def __init__(self, path : str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a Connect Four game log.')
+        self.offsets = None  # loaded from the index on first seek
+
+    def __iter__(self):
+        # Stream the records from the start of the log, one at a time.
+        with open(self.path, 'rb') as f:
+            f.seek(FILE_HEADER.size)
+            while True:
+                record = GameRecordReader.read_record(f)
+                if record is None:
+                    return
+                yield record
+
+    def __len__(self):
+        return len(self.load_offsets())
+
+    def __getitem__(self, n : int) -> GameRecord:
+        # Seek straight to game `n` (0-based) through the offset index.
+        offsets = self.load_offsets()
+        with open(self.path, 'rb') as f:
+            f.seek(offsets[n])
+            return GameRecordReader.read_record(f)
+
+    def iter_from(self, n : int):
+        # Stream the records from game `n` on.
+        offsets = self.load_offsets()
+        if n >= len(offsets):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(offsets[n])
+            while True:
+                record = GameRecordReader.read_record(f)
+                if record is None:
+                    return
+                yield record
+
+    def load_offsets(self):
+        if self.offsets is None:
+            GameRecordReader.rebuild_index_if_stale(self.path)
+            self.offsets = array('Q')
+            with open(self.path + '.idx', 'rb') as f:
+                self.offsets.frombytes(f.read())
+        return self.offsets
+
+    @staticmethod
+    def read_record(f):
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return None
+        height, base, winner, count = RECORD_HEADER.unpack(header)
+        packed = f.read((count + 1) // 2)
+        if len(packed) < (count + 1) // 2:
+            return None  # a record cut short at the end of the log
+        return GameRecord(height, base, winner, unpack_moves(packed, count))
+
+    @staticmethod
+    def scan_offsets(path : str):
+        # Offsets of all records, found by reading only the record headers
+        # (leaving out a record cut short at the end of the log).
+        offsets = array('Q')
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            offset = FILE_HEADER.size
+            while offset + RECORD_HEADER.size <= size:
+                f.seek(offset)
+                count = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))[3]
+                end = offset + RECORD_HEADER.size + (count + 1) // 2
+                if end > size:
+                    break
+                offsets.append(offset)
+                offset = end
+        return offsets
+
+    @staticmethod
+    def records_end(path : str):
+        # The offset just past the last whole record of the log, from its
+        # (up-to-date) index; None if there is no log yet.
+        if not os.path.exists(path):
+            return None
+        index_path = path + '.idx'
+        count = os.path.getsize(index_path) // 8
+        if count == 0:
+            return min(FILE_HEADER.size, os.path.getsize(path))
+        with open(index_path, 'rb') as f:
+            f.seek((count - 1) * 8)
+            last = struct.unpack('<Q', f.read(8))[0]
+        with open(path, 'rb') as f:
+            f.seek(last)
+            moves = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))[3]
+        return last + RECORD_HEADER.size + (moves + 1) // 2
+
+    @staticmethod
+    def rebuild_index_if_stale(path : str):
+        # (Re)write `<path>.idx` unless it already lists every record.
+        if not os.path.exists(path):
+            if os.path.exists(path + '.idx'):
+                os.remove(path + '.idx')
+            return
+        index_path = path + '.idx'
+        if os.path.exists(index_path):
+            count = os.path.getsize(index_path) // 8
+            if count == 0 and os.path.getsize(path) <= FILE_HEADER.size:
+                return
+            if count > 0:
+                with open(index_path, 'rb') as f:
+                    f.seek((count - 1) * 8)
+                    last = struct.unpack('<Q', f.read(8))[0]
+                with open(path, 'rb') as f:
+                    f.seek(last)
+                    header = f.read(RECORD_HEADER.size)
+                if len(header) == RECORD_HEADER.size:
+                    moves = RECORD_HEADER.unpack(header)[3]
+                    end = last + RECORD_HEADER.size + (moves + 1) // 2
+                    if end == os.path.getsize(path):
+                        return
+        with open(index_path, 'wb') as f:
+            GameRecordReader.scan_offsets(path).tofile(f)
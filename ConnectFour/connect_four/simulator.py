@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# filename: simulator.py
+
+"""
+simulator.py
+~~~~~~~~~~~~
+A headless batch simulator for Connect Four.  It plays N games between
+two pluggable policies (objects with a `choose_col(game)` method that
+returns a 1-based column, like `solver.ComputerPlayer`), spread over a
+`multiprocessing` process pool.  Per-game results stream back as each
+chunk of games finishes, and the run ends with aggregate win/draw rates
+and games/sec.
+
+Every game goes through the usual `reset_for_new_game`, `switch_player`,
+`try_to_place_puck` and `game_over` methods, so it exercises the same
+win logic as an interactive game.
+
+To run a batch, execute the following in a shell terminal (in the
+directory above this package):
+python3 -m connect_four.simulator --games 10000 --player-1 greedy --player-2 random
+python3 -m connect_four.simulator --backend sparse --base 10000 --connect 5
+"""
+
+import argparse
+import functools
+import multiprocessing
+import random
+import time
+
+from .bitboard import BitboardConnectFour
+from .connect_four import ConnectFour
+from .mcts import MCTSPlayer
+from .records import GameRecordWriter, check_recordable
+from .solver import ComputerPlayer, Solver
+from .sparse import SparseConnectFour
+
+
+# Policies
+# -----------------------------------------------------------------------------
+
+class RandomPolicy:
+    # Drop into a uniformly random non-full column.  A few random columns
+    # are tried first, so that wide boards are not scanned on every move.
+
+    def __init__(self, seed : int = None):
+        self.rng = random.Random(seed)
+
+    def seed(self, seed : int):
+        self.rng.seed(seed)
+
+    def choose_col(self, game) -> int:
+        for _ in range(8):
+            col = self.rng.randrange(game.base)
+            if game.can_play(col):
+                return col + 1
+        return self.rng.choice([col + 1 for col in range(game.base)
+                                if game.can_play(col)])
+
+
+class GreedyPolicy:
+    # Win right away if possible, otherwise block the opponent's immediate
+    # win, otherwise play a random column that does not hand the opponent
+    # a win directly above it.
+
+    def __init__(self, seed : int = None):
+        self.rng = random.Random(seed)
+        self.solvers = {}  # used only for their bitboard helpers
+
+    def seed(self, seed : int):
+        self.rng.seed(seed)
+
+    def choose_col(self, game) -> int:
+        if game.connect != 4:
+            raise ValueError('The greedy policy only plays connect four.')
+        size = (game.height, game.base)
+        if size not in self.solvers:
+            self.solvers[size] = Solver(game.height, game.base, tt_size=1)
+        solver = self.solvers[size]
+        current, mask, _, _, _ = solver.position_from_game(game)
+        possible = (mask + solver.bottom_mask) & solver.board_mask
+        opponent_wins = solver.winning_spots(current ^ mask, mask)
+        for spots in (solver.winning_spots(current, mask) & possible,
+                      opponent_wins & possible,
+                      possible & ~(opponent_wins >> 1),
+                      possible):
+            cols = [col + 1 for col in range(game.base)
+                    if spots & solver.column_masks[col]]
+            if cols:
+                return self.rng.choice(cols)
+
+
+class SearchPolicy:
+    # The solver's computer player, searching to a fixed depth per move
+    # (so that games are reproducible from their seed).  Giving it a
+    # `time_limit` instead makes its moves depend on the machine's speed.
+
+    def __init__(self, time_limit : float = None, max_depth : int = 6,
+                 tt_size : int = 1 << 16):
+        self.player = ComputerPlayer(time_limit, max_depth, tt_size)
+
+    def seed(self, seed : int):
+        # No randomness, but the transposition tables are emptied, so a
+        # game doesn't depend on the games played before it in the same
+        # process (which differ with the chunking of the games).
+        for solver in self.player.solvers.values():
+            solver.tt.clear()
+
+    def choose_col(self, game) -> int:
+        return self.player.choose_col(game)
+
+
+class MCTSPolicy:
+    # The Monte Carlo tree search player, with a fixed number of playouts
+    # per move (so that games are reproducible from their seed).
+
+    def __init__(self, iterations : int = 200):
+        self.iterations = iterations
+        self.player = MCTSPlayer(time_limit=None, iterations=iterations)
+
+    def seed(self, seed : int):
+        self.player = MCTSPlayer(time_limit=None, iterations=self.iterations,
+                                 seed=seed)
+
+    def choose_col(self, game) -> int:
+        return self.player.choose_col(game)
+
+
+BACKENDS = { 'list' : ConnectFour,
+             'bitboard' : BitboardConnectFour,
+             'sparse' : SparseConnectFour }
+
+POLICIES = { 'random' : RandomPolicy,
+             'greedy' : GreedyPolicy,
+             'search' : SearchPolicy,
+             'mcts' : MCTSPolicy }
+
+
+# Playing games
+# -----------------------------------------------------------------------------
+
+def play_game(game, policies : dict, seed : int = None):
+    # Play one game to the end on `game` (a ConnectFour, or a subclass)
+    # between `policies[1]` and `policies[2]`.
+    # Returns (winner, number of pucks dropped).
+    game.reset_for_new_game()
+    # (each player's policy gets its own seed, so that two random players
+    # do not mirror each other's columns)
+    for player, policy in policies.items():
+        if seed is not None:
+            policy.seed(2 * seed + player - 1)
+    moves = 0
+    while not game.game_over():
+        game.switch_player()
+        col = policies[game.active_player].choose_col(game)
+        if not game.try_to_place_puck(col):
+            raise ValueError(f'Player {game.active_player} chose the full ' + \
+                             f'column {col}.')
+        moves += 1
+    return game.winner, moves
+
+
+class SimulationSummary:
+
+    def __init__(self):
+        self.games = 0
+        self.wins = {1: 0, 2: 0}
+        self.draws = 0
+        self.moves = 0
+        self.elapsed = 0.0  # seconds
+
+    def add(self, winner : int, moves : int):
+        self.games += 1
+        self.moves += moves
+        if winner == 0:
+            self.draws += 1
+        else:
+            self.wins[winner] += 1
+
+    def win_rate(self, player : int) -> float:
+        return self.wins[player] / self.games if self.games else 0.0
+
+    @property
+    def draw_rate(self) -> float:
+        return self.draws / self.games if self.games else 0.0
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        return (f'{self.games} games in {self.elapsed:.2f} s '
+                f'({self.games_per_sec:,.0f} games/sec): '
+                f'player 1 wins {self.win_rate(1):.1%}, '
+                f'player 2 wins {self.win_rate(2):.1%}, '
+                f'draws {self.draw_rate:.1%}, '
+                f'{self.moves / max(self.games, 1):.1f} pucks/game')
+
+
+# Each worker process builds its game and policies once, in the pool
+# initializer, and then plays chunks of games with them.
+_worker = {}
+
+def _init_worker(game_class, height, base, policies, with_moves=False):
+    _worker['game'] = game_class(height, base)
+    _worker['policies'] = policies
+    _worker['with_moves'] = with_moves
+
+def _play_chunk(chunk):
+    first_seed, count = chunk
+    game, policies = _worker['game'], _worker['policies']
+    results = []
+    for seed in range(first_seed, first_seed + count):
+        winner, moves = play_game(game, policies, seed)
+        if _worker['with_moves']:
+            results.append((seed, winner, moves, list(game.move_history)))
+        else:
+            results.append((seed, winner, moves))
+    return results
+
+
+def iter_games(n_games : int, policies : dict, height : int = 6,
+               base : int = 7, processes : int = None,
+               chunk_size : int = 100, seed : int = 0,
+               game_class = ConnectFour, with_moves : bool = False):
+    # Yield (seed, winner, moves) for each of `n_games` games, in the order
+    # they finish (with `with_moves`, also the game's `move_history`).
+    # Game i is played with seed `seed + i`, so results do not depend on
+    # how games are split over processes.  With `processes=1` all games
+    # are played in this process.
+    chunks = [(first, min(chunk_size, seed + n_games - first))
+              for first in range(seed, seed + n_games, chunk_size)]
+    if processes == 1:
+        _init_worker(game_class, height, base, policies, with_moves)
+        for chunk in chunks:
+            yield from _play_chunk(chunk)
+        return
+    with multiprocessing.Pool(processes, initializer=_init_worker,
+                              initargs=(game_class, height, base,
+                                        policies, with_moves)) as pool:
+        for results in pool.imap_unordered(_play_chunk, chunks):
+            yield from results
+
+
+def simulate(n_games : int, policies : dict, height : int = 6,
+             base : int = 7, processes : int = None, chunk_size : int = 100,
+             seed : int = 0, game_class = ConnectFour, on_result = None,
+             recorder = None):
+    # Play `n_games` games and return a SimulationSummary.  `on_result`,
+    # if given, is called with each (seed, winner, moves) as it arrives;
+    # `recorder` (a records.GameRecordWriter), if given, is sent every game
+    # (checked before any game is played: the log holds connect-four games
+    # of at most 16 columns only).
+    if recorder is not None:
+        check_recordable(height, base, game_class(height, base).connect)
+    summary = SimulationSummary()
+    start = time.perf_counter()
+    for result in iter_games(n_games, policies, height, base, processes,
+                             chunk_size, seed, game_class,
+                             with_moves=recorder is not None):
+        summary.add(result[1], result[2])
+        if recorder is not None:
+            recorder.write(height, base, result[1],
+                           [col - 1 for col in result[3]])
+            result = result[:3]
+        if on_result is not None:
+            on_result(result)
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless Connect Four ' + \
+                                     'self-play simulator.')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--height', type=int, default=6)
+    parser.add_argument('--base', type=int, default=7)
+    parser.add_argument('--connect', type=int, default=4,
+                        help='pucks in a line needed to win')
+    parser.add_argument('--backend', choices=BACKENDS, default='list',
+                        help='board backend (sparse for huge boards)')
+    parser.add_argument('--player-1', choices=POLICIES, default='random')
+    parser.add_argument('--player-2', choices=POLICIES, default='random')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', metavar='PATH',
+                        help='append the games to this game log')
+    args = parser.parse_args()
+    if args.record is not None:
+        try:
+            check_recordable(args.height, args.base, args.connect)
+        except ValueError as error:
+            parser.error(f'--record: {error}')
+    policies = { 1 : POLICIES[args.player_1](),
+                 2 : POLICIES[args.player_2]() }
+    recorder = None if args.record is None else GameRecordWriter(args.record)
+    game_class = functools.partial(BACKENDS[args.backend],
+                                   connect=args.connect)
+    summary = simulate(args.games, policies, args.height, args.base,
+                       args.processes, args.chunk_size, args.seed,
+                       game_class, recorder=recorder)
+    if recorder is not None:
+        recorder.close()
+    print(summary.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# filename: solver.py
+
+"""
+solver.py
+~~~~~~~~~
+A Connect Four solver and computer opponent: negamax search with alpha-
+beta pruning, center-first (and threat-first) move ordering, iterative
+deepening under a wall-clock budget, and a bounded transposition table
+keyed by incrementally updated Zobrist hashes.
+
+The search runs on its own two-integer position (the pucks of the
+player to move, and a mask of all pucks), using the same column layout
+as `bitboard.py`: `height + 1` bits per column, bottom spot first.
+
+To let the computer play player 2 in a terminal game:
+
+    cf = ConnectFour()
+    cf.computer_players[2] = ComputerPlayer(time_limit=2.0, verbose=True)
+    cf.session()
+"""
+
+import random
+import time
+
+
+WIN_SCORE = 1 << 20  # a win on move `n` (counting all pucks) scores WIN_SCORE - n
+
+# Transposition table entry flags
+EXACT = 0
+LOWER = 1  # the stored score is a lower bound (the search failed high)
+UPPER = 2  # the stored score is an upper bound (the search failed low)
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchStats:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.elapsed = 0.0  # seconds
+        self.depth = 0      # deepest fully completed iteration
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def report(self) -> str:
+        return (f'depth {self.depth}, {self.nodes} nodes in '
+                f'{self.elapsed:.2f} s ({self.nodes_per_sec:,.0f} nodes/sec), '
+                f'TT hit rate {self.tt_hit_rate:.1%}')
+
+
+class SearchResult:
+
+    def __init__(self, col : int, score : int, depth : int, solved : bool):
+        self.col = col        # 1-based column number, as in try_to_place_puck
+        self.score = score    # +1 win, -1 loss, 0 draw (or beyond the horizon)
+                              # for the player to move
+        self.depth = depth
+        self.solved = solved  # True if `score` is the game-theoretic value
+
+    @property
+    def outcome(self) -> str:
+        if self.score > 0:
+            return 'win'
+        if self.score < 0:
+            return 'loss'
+        if self.solved:
+            return 'draw'
+        return 'unknown'
+
+    def __repr__(self):
+        return (f'SearchResult(col={self.col}, score={self.score}, '
+                f'depth={self.depth}, solved={self.solved})')
+
+
+class TranspositionTable:
+    # A fixed number of slots (a power of two), indexed by the low bits of
+    # the Zobrist key and stored in parallel lists.  Replacement policy:
+    # an entry from the current search is only overwritten by an entry
+    # of the same position or one searched at least as deeply; entries
+    # left over from earlier searches (older generations) are always
+    # replaced.
+
+    def __init__(self, size : int = 1 << 20):
+        size = 1 << max(0, size - 1).bit_length()  # round up to a power of two
+        self.size = size
+        self.index_mask = size - 1
+        self.keys = [0] * size
+        self.depths = [-1] * size  # -1 marks an empty slot
+        self.flags = [EXACT] * size
+        self.scores = [0] * size
+        self.moves = [-1] * size
+        self.generations = [0] * size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.__init__(self.size)
+
+    def probe(self, key : int):
+        # Return (depth, flag, score, move) for `key`, or None.
+        index = key & self.index_mask
+        if self.keys[index] == key and self.depths[index] >= 0:
+            return (self.depths[index], self.flags[index],
+                    self.scores[index], self.moves[index])
+        return None
+
+    def store(self, key : int, depth : int, flag : int, score : int, move : int):
+        index = key & self.index_mask
+        if self.keys[index] != key and self.depths[index] > depth and \
+           self.generations[index] == self.generation:
+            return
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.flags[index] = flag
+        self.scores[index] = score
+        self.moves[index] = move
+        self.generations[index] = self.generation
+
+
+class Solver:
+
+    def __init__(self, height : int = 6, base : int = 7,
+                 tt_size : int = 1 << 20, seed : int = 0):
+        self.height = height
+        self.base = base
+        self.size = height * base
+        self.stride = height + 1
+        self.bottom_masks = [1 << (col * self.stride) for col in range(base)]
+        self.column_masks = [((1 << height) - 1) << (col * self.stride)
+                             for col in range(base)]
+        self.bottom_mask = sum(self.bottom_masks)
+        self.board_mask = sum(self.column_masks)
+        # center-first move ordering, e.g. [3, 2, 4, 1, 5, 0, 6] for 7 cols
+        self.order = sorted(range(base), key=lambda col: abs(2*col - base + 1))
+        self.order_rank = {col: rank for rank, col in enumerate(self.order)}
+        rng = random.Random(seed)
+        self.zobrist = [[rng.getrandbits(64) for _ in range(base * self.stride)]
+                        for _ in range(2)]
+        # XOR-ed into the key while player 2 is to move; the move tables
+        # fold it into every puck's number, so a move also flips the side
+        self.zobrist_side = rng.getrandbits(64)
+        self.zobrist_moves = [[number ^ self.zobrist_side for number in numbers]
+                              for numbers in self.zobrist]
+        self.tt = TranspositionTable(tt_size)
+        self.stats = SearchStats()
+        self.deadline = None
+
+    # Positions
+    # -------------------------------------------------------------------------
+
+    def position_from_game(self, game):
+        # Return (current, mask, moves, key, side) for `game`, where
+        # `current` holds the pucks of the player to move and `side` is
+        # that player's index (0 for player 1, 1 for player 2).
+        pucks = [0, 0]
+        for row in range(self.height):
+            for col in range(self.base):
+                value = game.catcher[row][col]
+                if value in {1, 2}:
+                    pucks[value - 1] |= 1 << (col * self.stride + row)
+        if game.active_player in {1, 2}:
+            side = game.active_player - 1
+        else:
+            side = None
+        return self.position_from_pucks(pucks[0], pucks[1], side)
+
+    def position_from_pucks(self, pucks_1 : int, pucks_2 : int, side : int = None):
+        # Same as `position_from_game`, from the two players' bitboards.
+        # By default player 1 is to move when the puck count is even.
+        mask = pucks_1 | pucks_2
+        moves = mask.bit_count()
+        if side is None:
+            side = moves % 2
+        key = 0
+        for side_index, pucks in enumerate((pucks_1, pucks_2)):
+            zobrist = self.zobrist[side_index]
+            while pucks:
+                bit = pucks & -pucks
+                key ^= zobrist[bit.bit_length() - 1]
+                pucks ^= bit
+        if side:
+            key ^= self.zobrist_side
+        current = pucks_2 if side else pucks_1
+        return current, mask, moves, key, side
+
+    def winning_spots(self, position : int, mask : int) -> int:
+        # Empty spots that would complete four in a row for `position`.
+        # vertical
+        spots = (position << 1) & (position << 2) & (position << 3)
+        # horizontal and the two diagonals
+        for shift in (self.stride, self.stride - 1, self.stride + 1):
+            pair = (position << shift) & (position << 2 * shift)
+            spots |= pair & (position << 3 * shift)
+            spots |= pair & (position >> shift)
+            pair = (position >> shift) & (position >> 2 * shift)
+            spots |= pair & (position << shift)
+            spots |= pair & (position >> 3 * shift)
+        return spots & (self.board_mask ^ mask)
+
+    # Search
+    # -------------------------------------------------------------------------
+
+    def solve(self, game, time_limit : float = None, max_depth : int = None):
+        # Search `game` for the player to move, deepening one ply at a
+        # time until the position is solved, `max_depth` is reached or
+        # `time_limit` seconds have passed.  Returns a SearchResult.
+        #
+        # Each iteration is a null-window search around a draw: it proves
+        # the outcome (win/draw/loss) of every root move within `depth`
+        # plies, treating the horizon as a draw, which is far cheaper than
+        # searching for exact scores or heuristic values.
+        #
+        # This is not a full solver for the opening.  On the 6x7 board
+        # it proves the outcome of most positions with 16 or more pucks
+        # within a few seconds.  Earlier positions are out of reach: 10 s
+        # gets through about 14 plies from the empty board and about 15
+        # to 18 from 12 to 14 pucks.  There it returns the best move
+        # within the horizon it reached, with `result.solved` False
+        # unless that move was proven.
+        if game.connect != 4:
+            raise ValueError('The solver only plays connect four.')
+        return self.solve_position(*self.position_from_game(game),
+                                   time_limit=time_limit, max_depth=max_depth)
+
+    def solve_position(self, current, mask, moves, key, side,
+                       time_limit : float = None, max_depth : int = None):
+        # Same as `solve`, for a position from `position_from_pucks`.
+        if moves >= self.size or not (mask + self.bottom_mask) & self.board_mask:
+            raise ValueError('There are no moves left to search.')
+        self.stats.reset()
+        self.tt.new_search()
+        start = time.perf_counter()
+        self.deadline = None if time_limit is None else start + time_limit
+        remaining = self.size - moves
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+        result = None
+        try:
+            for depth in range(1, max_depth + 1):
+                score, col = self.search_root(current, mask, moves, depth,
+                                              key, side)
+                self.stats.depth = depth
+                solved = score != 0 or depth >= remaining
+                result = SearchResult(col + 1, score, depth, solved)
+                if solved:
+                    break
+        except SearchTimeout:
+            pass
+        self.stats.elapsed = time.perf_counter() - start
+        if result is None:
+            # Out of time before the first iteration finished
+            col = self.ordered_moves(current, mask,
+                                     (mask + self.bottom_mask) & self.board_mask,
+                                     key)[0][0]
+            result = SearchResult(col + 1, 0, 0, False)
+        return result
+
+    def search_root(self, current, mask, moves, depth, key, side):
+        # Return (score, col): +1 for a proven win, -1 for a proven loss
+        # and 0 for a draw or an outcome beyond the horizon.
+        possible = (mask + self.bottom_mask) & self.board_mask
+        wins = self.winning_spots(current, mask) & possible
+        if wins:
+            col = next(col for col in self.order if wins & self.column_masks[col])
+            return 1, col
+        opponent_wins = self.winning_spots(current ^ mask, mask)
+        safe = possible & ~(opponent_wins >> 1)
+        forced = possible & opponent_wins
+        if forced:
+            safe &= forced
+        candidates = self.ordered_moves(current, mask, safe or possible, key)
+        best_score, best_col = -2, candidates[0][0]
+        for col, move in candidates:
+            bit_index = move.bit_length() - 1
+            score = -self.negamax(current ^ mask, mask | move, moves + 1,
+                                  depth - 1, -1, 1,
+                                  key ^ self.zobrist_moves[side][bit_index], side ^ 1)
+            score = (score > 0) - (score < 0)
+            if score > best_score:
+                best_score, best_col = score, col
+                if score > 0:
+                    break
+        if not safe:
+            best_score = -1  # every move loses
+        self.tt.store(key, depth, EXACT, best_score, best_col)
+        return best_score, best_col
+
+    def ordered_moves(self, current, mask, possible, key):
+        # Return [(col, move_bit)] for the columns in `possible`: the TT
+        # move first, then the moves creating the most winning spots,
+        # with ties broken center-first.
+        entry = self.tt.probe(key)
+        hash_col = entry[3] if entry is not None else -1
+        candidates = []
+        for col in self.order:
+            move = possible & self.column_masks[col]
+            if move:
+                threats = self.winning_spots(current | move, mask | move).bit_count()
+                candidates.append((col != hash_col, -threats,
+                                   self.order_rank[col], col, move))
+        candidates.sort()
+        return [(col, move) for _, _, _, col, move in candidates]
+
+    # the clock is checked every `time_check_mask + 1` nodes while there
+    # is a deadline
+    time_check_mask = 4095
+
+    def out_of_time(self) -> bool:
+        return time.perf_counter() > self.deadline
+
+    def negamax(self, current, mask, moves, depth, alpha, beta, key, side):
+        stats = self.stats
+        stats.nodes += 1
+        if self.deadline is not None and \
+           stats.nodes & self.time_check_mask == 0 and \
+           self.out_of_time():
+            raise SearchTimeout()
+        if moves >= self.size:
+            return 0  # stale-mate
+        possible = (mask + self.bottom_mask) & self.board_mask
+        # 1. The player to move wins right away if they can
+        if self.winning_spots(current, mask) & possible:
+            return WIN_SCORE - moves - 1
+        # 2. Otherwise they must block every immediate threat, and must
+        #    not play directly below an opponent's winning spot
+        opponent_wins = self.winning_spots(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                return -(WIN_SCORE - moves - 2)  # two threats: lost
+            possible = forced
+        possible &= ~(opponent_wins >> 1)
+        if not possible:
+            return -(WIN_SCORE - moves - 2)
+        if moves + 2 >= self.size:
+            return 0  # one safe move each, then the catcher is full
+        # 3. Tighten the window to the best/worst still-reachable scores
+        best_reachable = WIN_SCORE - moves - 3
+        if beta > best_reachable:
+            beta = best_reachable
+            if alpha >= beta:
+                return beta
+        worst_reachable = -(WIN_SCORE - moves - 4)
+        if alpha < worst_reachable:
+            alpha = worst_reachable
+            if alpha >= beta:
+                return alpha
+        if depth <= 0:
+            return 0  # beyond the horizon
+        # 4. Transposition table
+        stats.tt_probes += 1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            stats.tt_hits += 1
+            entry_depth, flag, score, _ = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return score
+                if flag == LOWER and score > alpha:
+                    alpha = score
+                elif flag == UPPER and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+        # 5. Search the children
+        alpha_orig = alpha
+        best_score, best_col = -WIN_SCORE - 1, -1
+        zobrist = self.zobrist_moves[side]
+        for col, move in self.ordered_moves(current, mask, possible, key):
+            score = -self.negamax(current ^ mask, mask | move, moves + 1,
+                                  depth - 1, -beta, -alpha,
+                                  key ^ zobrist[move.bit_length() - 1], side ^ 1)
+            if score > best_score:
+                best_score, best_col = score, col
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, best_score, best_col)
+        return best_score
+
+
+class ComputerPlayer:
+    # A computer opponent for `ConnectFour.player_turn_loop`: assign one
+    # to `cf.computer_players[player]` and it is asked for that player's
+    # columns instead of `query_player_for_valid_col`.  If given a `book`
+    # (an `opening_book.OpeningBook`), positions found in it are played
+    # from the book without searching.
+
+    def __init__(self, time_limit : float = 1.0, max_depth : int = None,
+                 tt_size : int = 1 << 20, verbose : bool = False,
+                 book = None):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt_size = tt_size
+        self.verbose = verbose
+        self.book = book
+        self.solvers = {}  # one solver (and table) per (height, base)
+        self.last_result = None
+
+    def solver_for(self, game):
+        size = (game.height, game.base)
+        if size not in self.solvers:
+            self.solvers[size] = Solver(game.height, game.base, self.tt_size)
+        return self.solvers[size]
+
+    def choose_col(self, game) -> int:
+        if self.book is not None:
+            self.last_result = self.book.lookup(game)
+            if self.last_result is not None:
+                if self.verbose:
+                    print(f'  (from the opening book; ' + \
+                          f'outcome: {self.last_result.outcome})')
+                return self.last_result.col
+        solver = self.solver_for(game)
+        self.last_result = solver.solve(game, self.time_limit, self.max_depth)
+        if self.verbose:
+            print(f'  (searched {solver.stats.report()}; '
+                  f'outcome: {self.last_result.outcome})')
+        return self.last_result.col
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# filename: sparse.py
+
+"""
+sparse.py
+~~~~~~~~~
+A sparse board backend for Connect Four (and connect-N), for huge
+catchers such as 10,000 columns for load tests.
+
+Only the pucks actually played are stored: a stack of pucks per non-
+empty column, plus a hash (dict) from each occupied (row, col) spot to
+its player.  A win is found by counting same-player pucks outward from
+the last-placed puck, so both memory and the time per move grow with
+the number of pucks played (and `connect`), not with `height * base`.
+No line index is built (unless `full_scan` mode asks for the paths).
+
+`catcher` is still available, as a read-only view that looks up the
+spots on demand (`catcher[row][col]`), so existing callers and
+`show_catcher_graphic` keep working; assign a whole new list-of-lists
+catcher to load a position.
+"""
+
+from .connect_four import ConnectFour, get_line_index
+
+
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))  # (row, col) steps
+
+
+class SparseRow:
+    # One row of `SparseConnectFour.catcher`.
+
+    def __init__(self, game, row : int):
+        self.game = game
+        self.row = row
+
+    def __getitem__(self, col : int) -> int:
+        if col < 0:
+            col += self.game.base
+        if not 0 <= col < self.game.base:
+            raise IndexError('catcher column out of range')
+        return self.game.spots.get((self.row, col), 0)
+
+    def __len__(self):
+        return self.game.base
+
+    def __iter__(self):
+        return (self[col] for col in range(self.game.base))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class SparseCatcher:
+    # A read-only, list-of-lists-like view of the pucks of a sparse game.
+
+    def __init__(self, game):
+        self.game = game
+
+    def __getitem__(self, row : int) -> SparseRow:
+        if row < 0:
+            row += self.game.height
+        if not 0 <= row < self.game.height:
+            raise IndexError('catcher row out of range')
+        return SparseRow(self.game, row)
+
+    def __len__(self):
+        return self.game.height
+
+    def __iter__(self):
+        return (self[row] for row in range(self.game.height))
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
+
+class SparseConnectFour(ConnectFour):
+
+    def __init__(self, height : int = 6, base: int = 7, connect : int = 4):
+        super().__init__(height, base, connect)
+
+    @property
+    def catcher(self):
+        return SparseCatcher(self)
+
+    @catcher.setter
+    def catcher(self, rows):
+        self.load_catcher(rows)
+
+    def empty_catcher(self):
+        return None
+
+    def index_lines(self):
+        # built only if needed (see `paths`)
+        self.line_index = None
+
+    @property
+    def paths(self):
+        # the dense line index, for `full_scan` mode only
+        if self.line_index is None:
+            self.line_index = get_line_index(self.height, self.base,
+                                             self.connect)
+        return self.line_index.paths
+
+    def load_catcher(self, rows):
+        # Load a list-of-lists catcher (None for an empty one), assumed to
+        # obey gravity (no holes below a puck within a column).
+        self.stacks = {}  # col -> players of its pucks, bottom first
+        self.spots = {}   # (row, col) -> player
+        if rows is not None:
+            for row, values in enumerate(rows):
+                for col, value in enumerate(values):
+                    if value in {1, 2}:
+                        self.stacks.setdefault(col, []).append(value)
+                        self.spots[(row, col)] = value
+        self.filled_count = len(self.spots)
+        self.last_spot = None
+        self.move_history = []
+
+    def can_play(self, col : int) -> bool:
+        # `col` is the 0-based column index (as in `catcher[row][col]`)
+        return len(self.stacks.get(col, ())) < self.height
+
+    def try_to_place_puck(self, col):
+        # `col` is the 1-based column number entered by the player; the
+        # stacks are made on demand, so check it is on the board first
+        if not 1 <= col <= self.base:
+            print('Invalid input. ' + \
+                  'Please enter a number in the proper range.\n')
+            return False
+        stack = self.stacks.setdefault(col - 1, [])
+        if len(stack) >= self.height:
+            print('That column is full. Please pick a different column.\n')
+            return False
+        row = len(stack)
+        stack.append(self.active_player)
+        self.spots[(row, col - 1)] = self.active_player
+        self.last_spot = (row, col - 1)
+        self.filled_count += 1
+        self.move_history.append(col)
+        return True
+
+    def game_over(self) -> bool:
+        if self.full_scan:
+            return self.game_over_full_scan()
+        if self.last_spot is None:
+            # set up by hand: check the lines through every puck
+            for spot in self.spots:
+                if self.check_for_win_at(*spot):
+                    return True
+        elif self.check_for_win_at(*self.last_spot):
+            return True
+        return self.check_for_full_catcher()
+
+    def check_for_win_at(self, row : int, col : int) -> bool:
+        # Count same-player pucks outward from the spot (row, col), both
+        # ways along each direction.
+        spots = self.spots
+        player = spots.get((row, col), 0)
+        if player not in {1, 2}:
+            return False
+        for row_step, col_step in DIRECTIONS:
+            counter = 1
+            r, c = row + row_step, col + col_step
+            while spots.get((r, c)) == player:
+                counter += 1
+                r, c = r + row_step, c + col_step
+            r, c = row - row_step, col - col_step
+            while spots.get((r, c)) == player:
+                counter += 1
+                r, c = r - row_step, c - col_step
+            if counter >= self.connect:
+                # connect four!
+                self.winner = player
+                return True
+        return False
+
+    def check_for_full_catcher(self) -> bool:
+        if self.filled_count < self.height * self.base:
+            return False
+        self.winner = 0  # stale-mate
+        return True
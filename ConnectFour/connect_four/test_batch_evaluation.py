@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# filename: test_batch_evaluation.py
+
+"""
+test_batch_evaluation.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file
+batch_evaluation.py.  (Skipped if NumPy is not installed.)
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from .batch_evaluation import boards_from_games, evaluate_boards
+from .connect_four import ConnectFour
+
+
+def random_games(count, seed, height=6, base=7):
+    # games stopped after a random number of moves (possibly finished)
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        cf = ConnectFour(height, base)
+        for _ in range(rng.randint(0, height * base)):
+            if cf.game_over():
+                break
+            cf.switch_player()
+            cf.try_to_place_puck(rng.choice(
+                [c for c in range(1, base + 1)
+                 if cf.catcher[height - 1][c - 1] == 0]))
+        games.append(cf)
+    return games
+
+
+def test_status_matches_game_over():
+    for height, base in [(6, 7), (4, 4), (7, 10)]:
+        games = random_games(300, height * base, height, base)
+        result = evaluate_boards(boards_from_games(games))
+        for game, status in zip(games, result.status):
+            game.winner = -1
+            game.game_over_full_scan()
+            assert status == game.winner
+
+def test_open_threes_and_center():
+    cf = ConnectFour()
+    cf.catcher[0][1:4] = [1, 1, 1]
+    cf.catcher[1][3] = 2
+    result = evaluate_boards(boards_from_games([cf]))
+    # windows cols 0-3 and 1-4 on the bottom row
+    assert result.open_threes[0].tolist() == [2, 0]
+    assert result.center_control[0].tolist() == [1, 1]
+    assert result.scores[0] == 4 * 2
+    assert result.status[0] == -1
+
+def test_connect_n():
+    boards = np.zeros((1, 6, 7), dtype=np.int8)
+    boards[0, 0, :5] = 2
+    assert evaluate_boards(boards, connect=6).status[0] == -1
+    assert evaluate_boards(boards, connect=5).status[0] == 2
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# filename: test_benchmarks.py
+
+"""
+test_benchmarks.py
+~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file benchmarks.py
+(with a quick run of the whole suite on small boards).
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import json
+
+from .benchmarks import (BENCHMARKS, compare, mid_game, regressions,
+                         run_benchmarks)
+
+
+def test_mid_game_has_no_winner():
+    for height, base in [(6, 7), (25, 25)]:
+        game = mid_game(height, base)
+        assert game.filled_count >= height * base // 3
+        assert not game.game_over_full_scan()
+        assert not game.game_over()
+        assert game.winner == -1
+
+def test_quick_run(tmp_path):
+    results = run_benchmarks([(6, 7), (9, 9)], min_time=0.001, repeat=1)
+    assert len(results['results']) == 2 * len(BENCHMARKS)
+    assert all(timing['seconds'] > 0
+               for timing in results['results'].values())
+    path = tmp_path / 'baseline.json'
+    path.write_text(json.dumps(results))
+    assert json.loads(path.read_text()) == results
+
+def test_compare_flags_regressions():
+    baseline = {'results': {'a/6x7': {'seconds': 1.0},
+                            'b/6x7': {'seconds': 1.0},
+                            'c/6x7': {'seconds': 1.0}}}
+    results = {'results': {'a/6x7': {'seconds': 1.1},
+                           'b/6x7': {'seconds': 2.0},
+                           'd/6x7': {'seconds': 1.0}}}
+    rows = compare(results, baseline, tolerance=0.25)
+    assert [row[0] for row in rows] == ['b/6x7', 'a/6x7']
+    assert [row[0] for row in regressions(results, baseline, 0.25)] == \
+           ['b/6x7']
+    assert regressions(results, baseline, 1.5) == []
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# filename: test_bitboard.py
+
+"""
+test_bitboard.py
+~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file bitboard.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import random
+
+from .bitboard import BitboardConnectFour
+from .connect_four import ConnectFour
+
+
+def play_random_game(games, seed, height=6, base=7):
+    # Play the same random game on every board in `games`, checking that
+    # they all agree after every move.
+    rng = random.Random(seed)
+    for game in games:
+        game.reset_for_new_game(base=base, height=height)
+    while not any([game.game_over() for game in games]):
+        cols = [col for col in range(1, base + 1)
+                if games[0].catcher[height - 1][col - 1] == 0]
+        col = rng.choice(cols)
+        for game in games:
+            game.active_player = 1 if game.active_player != 1 else 2
+            assert game.try_to_place_puck(col)
+        assert all(game.catcher == games[0].catcher for game in games)
+    return [game.winner for game in games]
+
+
+# Catcher view
+# -----------------------------------------------------------------------------
+
+def test_catcher_view_empty():
+    bb = BitboardConnectFour()
+    assert bb.catcher == [[0] * 7 for _ in range(6)]
+
+def test_catcher_view_after_drops():
+    bb = BitboardConnectFour(height=4, base=4)
+    bb.active_player = 1
+    bb.try_to_place_puck(2)
+    bb.active_player = 2
+    bb.try_to_place_puck(2)
+    assert bb.catcher == [ [0, 1, 0, 0], [0, 2, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0] ]
+
+def test_catcher_assignment_loads_bitboards():
+    bb = BitboardConnectFour(height=4, base=4)
+    bb.catcher = [ [1, 1, 1, 1], [2, 2, 2, 0], [0, 0, 0, 0], [0, 0, 0, 0] ]
+    assert bb.col_heights == [2, 2, 2, 1]
+    assert bb.game_over()
+    assert bb.winner == 1
+
+def test_column_full():
+    bb = BitboardConnectFour(height=2, base=3)
+    bb.active_player = 1
+    assert bb.try_to_place_puck(1)
+    assert bb.try_to_place_puck(1)
+    assert not bb.try_to_place_puck(1)
+
+def test_columns_off_the_board_are_rejected(capsys):
+    bb = BitboardConnectFour(height=4, base=5)
+    bb.active_player = 1
+    for col in (0, -1, 6, 100):
+        assert not bb.try_to_place_puck(col)
+    assert 'proper range' in capsys.readouterr().out
+    assert (bb.filled_count, bb.bitboards, bb.move_history) == (0, [0, 0], [])
+    assert bb.try_to_place_puck(5)
+
+
+# make/unmake
+# -----------------------------------------------------------------------------
+
+def test_make_unmake_restores_board():
+    bb = BitboardConnectFour()
+    for col, player in [(3, 1), (3, 2), (4, 1), (0, 2)]:
+        bb.make_move(col, player)
+    before = (list(bb.bitboards), list(bb.col_heights), bb.filled_count)
+    bb.make_move(5, 1)
+    bb.unmake_move()
+    assert (bb.bitboards, bb.col_heights, bb.filled_count) == before
+
+
+# Streak detection
+# -----------------------------------------------------------------------------
+
+def test_vertical_win():
+    bb = BitboardConnectFour()
+    for _ in range(4):
+        bb.make_move(2, 2)
+    assert bb.game_over()
+    assert bb.winner == 2
+
+def test_no_wrap_between_columns():
+    # three at the top of column 0 plus one at the bottom of column 1
+    bb = BitboardConnectFour(height=4, base=4)
+    bb.catcher = [ [2, 1, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0], [1, 0, 0, 0] ]
+    assert not bb.game_over()
+
+def test_diagonal_wins():
+    bb = BitboardConnectFour(height=4, base=4)
+    bb.catcher = [ [1, 2, 2, 2], [0, 1, 2, 2], [0, 0, 1, 2], [0, 0, 0, 1] ]
+    assert bb.game_over() and bb.winner == 1
+    bb.catcher = [ [1, 1, 1, 2], [1, 1, 2, 0], [1, 2, 0, 0], [2, 0, 0, 0] ]
+    assert bb.game_over() and bb.winner == 2
+
+def test_stale_mate():
+    bb = BitboardConnectFour(height=2, base=2)
+    for col, player in [(0, 1), (0, 2), (1, 2), (1, 1)]:
+        bb.make_move(col, player)
+    assert bb.game_over()
+    assert bb.winner == 0
+
+def test_matches_list_catcher_on_random_games():
+    for seed in range(50):
+        winners = play_random_game([ConnectFour(), BitboardConnectFour()], seed)
+        assert winners[0] == winners[1]
@@ -12,11 +12,131 @@ pytest
 *And be sure there is an __init__.py file in the same directory.
 """
 
-from .connect_four import ConnectFour
+import io
+import random
+
+from .connect_four import ConnectFour, get_line_index
+from renderer.renderer import DiffRenderer, move_to
 
 
 def test_catcher():
     cf = ConnectFour()
+    assert cf.catcher == [ [0, 0, 0, 0, 0, 0, 0] for _ in range(6) ]
+    cf = ConnectFour(height=4, base=4)
     assert cf.catcher == [ [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0], [0, 0, 0, 0] ]
 
 
+
+
+# Win detection: incremental (last spot) vs. full scan
+# -----------------------------------------------------------------------------
+
+def test_vertical_win_incremental():
+    cf = ConnectFour()
+    cf.active_player = 1
+    for _ in range(4):
+        cf.try_to_place_puck(3)
+    assert cf.last_spot == (3, 2)
+    assert cf.game_over()
+    assert cf.winner == 1
+
+def test_full_catcher_counter():
+    cf = ConnectFour(height=2, base=2)
+    for col, player in [(1, 1), (1, 2), (2, 2), (2, 1)]:
+        cf.active_player = player
+        cf.try_to_place_puck(col)
+    assert cf.filled_count == 4
+    assert cf.game_over()
+    assert cf.winner == 0
+
+def test_incremental_matches_full_scan():
+    for seed in range(100):
+        rng = random.Random(seed)
+        height, base = rng.choice([(6, 7), (4, 4), (5, 9), (8, 3)])
+        fast = ConnectFour(height, base)
+        slow = ConnectFour(height, base)
+        slow.full_scan = True
+        while True:
+            fast_over, slow_over = fast.game_over(), slow.game_over()
+            assert fast_over == slow_over
+            assert fast.winner == slow.winner
+            if fast_over:
+                break
+            col = rng.choice([c for c in range(1, base + 1)
+                              if fast.catcher[height - 1][c - 1] == 0])
+            for cf in (fast, slow):
+                cf.active_player = 1 if cf.active_player != 1 else 2
+                cf.try_to_place_puck(col)
+
+
+# Shared line index
+# -----------------------------------------------------------------------------
+
+def test_line_index_shared_between_games():
+    assert ConnectFour().line_index is ConnectFour().line_index
+    assert ConnectFour().paths is ConnectFour().paths
+
+def test_reset_rebuilds_paths_on_resize():
+    cf = ConnectFour()
+    cf.reset_for_new_game(base=9, height=8)
+    assert cf.paths == ConnectFour(8, 9).paths
+    cf.active_player = 2
+    for col in (6, 7, 8, 9):
+        cf.try_to_place_puck(col)
+    assert cf.game_over_full_scan()
+    assert cf.winner == 2
+
+def test_reverse_index_lists_lines_through_spot():
+    line_index = get_line_index(5, 6)
+    for row in range(5):
+        for col in range(6):
+            for line, position in line_index.lines_through(row, col):
+                i = line_index.line_starts[line] + position
+                assert (line_index.line_rows[i], line_index.line_cols[i]) == \
+                       (row, col)
+    # a corner spot lies on its row, column and one diagonal; a central
+    # spot on all four directions
+    assert len(list(line_index.lines_through(0, 0))) == 3
+    assert len(list(line_index.lines_through(2, 2))) == 4
+
+
+# Screen
+# -----------------------------------------------------------------------------
+
+def test_redraw_sends_only_the_new_puck():
+    cf = ConnectFour()
+    stream = io.StringIO()
+    cf.renderer = DiffRenderer(stream, ansi=True)
+    cf.redraw_screen()
+    assert 'CONNECT FOUR' in stream.getvalue()
+    stream.truncate(0)
+    stream.seek(0)
+    cf.active_player = 1
+    cf.try_to_place_puck(4)
+    cf.redraw_screen()
+    # bottom catcher row (line 8 of the frame), fourth column
+    assert stream.getvalue().startswith(move_to(8, 12) + '1' + '\x1b[')
+
+
+# Connect N
+# -----------------------------------------------------------------------------
+
+def test_diagonal_paths_fit_connect():
+    for connect in (3, 4, 5):
+        cf = ConnectFour(6, 7, connect)
+        for direction in ('ndiags', 'pdiags'):
+            lengths = [len(path) for path in cf.paths[direction]]
+            assert min(lengths) == connect
+            assert lengths.count(connect) == 2
+
+def test_connect_five_row():
+    cf = ConnectFour(connect=5)
+    cf.active_player = 1
+    for col in range(1, 5):
+        cf.try_to_place_puck(col)
+    assert not cf.game_over()
+    cf.try_to_place_puck(5)
+    assert cf.game_over() and cf.winner == 1
+    cf.full_scan = True
+    cf.winner = -1
+    assert cf.game_over() and cf.winner == 1
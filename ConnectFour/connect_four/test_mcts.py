@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# filename: test_mcts.py
+
+"""
+test_mcts.py
+~~~~~~~~~~~~
+A script to test the functionality of the code in the file mcts.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+from .connect_four import ConnectFour
+from .mcts import MCTSPlayer
+from .simulator import MCTSPolicy, RandomPolicy, simulate
+
+
+def play(cf, cols):
+    for col in cols:
+        cf.switch_player()
+        cf.try_to_place_puck(col)
+    cf.switch_player()
+
+def check_tree(mcts):
+    # every expanded node's visits are its children's visits, plus one for
+    # the playout (or terminal) that first reached it
+    for node in range(mcts.node_count):
+        count = mcts.child_counts[node]
+        if count:
+            first = mcts.first_child[node]
+            children = range(first, first + count)
+            assert sum(mcts.visits[c] for c in children) <= mcts.visits[node]
+            assert len({mcts.moves[c] for c in children}) == count
+
+
+def test_takes_the_winning_move():
+    cf = ConnectFour()
+    play(cf, [1, 2, 1, 2, 1, 2])
+    player = MCTSPlayer(time_limit=None, iterations=500, seed=0)
+    assert player.choose_col(cf) == 1
+
+def test_blocks_the_opponents_win():
+    cf = ConnectFour()
+    play(cf, [1, 2, 1, 2, 1])
+    player = MCTSPlayer(time_limit=None, iterations=2000, seed=0)
+    assert player.choose_col(cf) == 1
+
+def test_iteration_budget_and_stats():
+    cf = ConnectFour(12, 14)
+    play(cf, [])
+    player = MCTSPlayer(time_limit=None, iterations=300, seed=0)
+    player.choose_col(cf)
+    assert player.stats.playouts == 300
+    assert player.stats.playouts_per_sec > 0
+    check_tree(player.trees[(12, 14, 4)])
+
+def test_more_than_127_columns():
+    # (the node store's move and child-count arrays hold any column)
+    cf = ConnectFour(3, 200)
+    play(cf, [])
+    player = MCTSPlayer(time_limit=None, iterations=300, seed=0)
+    assert player.choose_col(cf) in range(1, 201)
+    tree = player.trees[(3, 200, 4)]
+    assert tree.child_counts[0] == 200
+    assert max(tree.moves) == 199
+    check_tree(tree)
+
+def test_time_budget():
+    cf = ConnectFour(12, 14)
+    play(cf, [])
+    player = MCTSPlayer(time_limit=0.2, seed=0)
+    player.choose_col(cf)
+    assert 0.15 < player.stats.elapsed < 0.5
+
+def test_subtree_is_kept_between_turns():
+    cf = ConnectFour()
+    play(cf, [])
+    player = MCTSPlayer(time_limit=None, iterations=2000, seed=0)
+    col = player.choose_col(cf)
+    tree = player.trees[(6, 7, 4)]
+    child = tree.find_child(0, col - 1)
+    grandchild = tree.find_child(child, 3)
+    kept = tree.visits[grandchild]
+    play(cf, [col, 4])
+    player.choose_col(cf)
+    assert player.stats.reused_nodes > 1
+    assert tree.visits[0] == kept + 2000
+    check_tree(tree)
+
+def test_tree_is_dropped_for_another_game():
+    player = MCTSPlayer(time_limit=None, iterations=100, seed=0)
+    cf = ConnectFour()
+    play(cf, [4, 4])
+    player.choose_col(cf)
+    cf.reset_for_new_game()
+    play(cf, [3])
+    player.choose_col(cf)
+    assert player.stats.reused_nodes == 0
+
+def test_root_parallel():
+    cf = ConnectFour(8, 9)
+    play(cf, [5])
+    with MCTSPlayer(time_limit=None, iterations=200, processes=2,
+                    seed=0) as player:
+        assert 1 <= player.choose_col(cf) <= 9
+        assert player.stats.playouts == 400
+
+def test_beats_random_play():
+    summary = simulate(10, {1: MCTSPolicy(200), 2: RandomPolicy()},
+                       processes=1)
+    assert summary.wins[1] >= 9
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# filename: test_opening_book.py
+
+"""
+test_opening_book.py
+~~~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file opening_book.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import os
+
+import pytest
+
+from .connect_four import ConnectFour
+from .opening_book import (ENTRY, HEADER, OpeningBook, build_opening_book,
+                           canonical_key, mirror_bits, write_opening_book)
+from .solver import ComputerPlayer, Solver
+
+
+def drop(cf, cols):
+    for col in cols:
+        cf.active_player = 1 if cf.active_player != 1 else 2
+        cf.try_to_place_puck(col)
+    cf.active_player = 1 if cf.active_player != 1 else 2
+    return cf
+
+@pytest.fixture(scope='module')
+def book_path(tmp_path_factory):
+    # every position of a 4x4 catcher with up to 2 pucks, fully solved
+    path = str(tmp_path_factory.mktemp('book') / 'book.c4bk')
+    build_opening_book(path, height=4, base=4, depth=2, time_limit=None)
+    return path
+
+
+# Keys
+# -----------------------------------------------------------------------------
+
+def test_mirror_bits():
+    # bottom spot of column 0 <-> bottom spot of column 3 (stride 5)
+    assert mirror_bits(1, 4, 4) == 1 << 15
+    assert mirror_bits(mirror_bits(0b1011, 4, 4), 4, 4) == 0b1011
+
+def test_canonical_key_folds_mirror_images():
+    left = canonical_key(1, 1, 4, 4)
+    right = canonical_key(1 << 15, 1 << 15, 4, 4)
+    assert left[0] == right[0]
+    assert left[1] != right[1]
+
+
+# Book file
+# -----------------------------------------------------------------------------
+
+def test_book_file_size(book_path):
+    with OpeningBook(book_path) as book:
+        assert os.path.getsize(book_path) == \
+               HEADER.size + len(book) * (book.key_size + ENTRY.size)
+        # 1 + 4 + 16 positions, of which 1 + 2 + 8 differ up to mirroring
+        assert len(book) == 11
+
+def test_book_matches_solver(book_path):
+    with OpeningBook(book_path) as book:
+        for cols in ([], [1], [4], [3, 2], [2, 3], [1, 4]):
+            cf = drop(ConnectFour(height=4, base=4), cols)
+            entry = book.lookup(cf)
+            result = Solver(height=4, base=4, tt_size=1 << 12).solve(cf)
+            assert entry is not None
+            assert entry.solved and entry.score == result.score
+            # the book's move must be as good as the solver's
+            drop(cf, [entry.col])
+            cf.active_player = 3 - cf.active_player
+            if not cf.game_over():
+                cf.active_player = 3 - cf.active_player
+                reply = Solver(height=4, base=4, tt_size=1 << 12).solve(cf)
+                assert -reply.score == result.score
+
+def test_missing_position(book_path):
+    with OpeningBook(book_path) as book:
+        assert book.lookup(drop(ConnectFour(height=4, base=4),
+                                [1, 2, 3])) is None
+        assert book.lookup(ConnectFour()) is None  # different board size
+
+def test_computer_player_uses_book(book_path):
+    with OpeningBook(book_path) as book:
+        player = ComputerPlayer(book=book)
+        player.choose_col(ConnectFour(height=4, base=4))
+        assert player.solvers == {}
+
+@pytest.mark.parametrize('height, base', [(256, 7), (6, 256), (254, 254)])
+def test_oversized_book_rejected(tmp_path, height, base):
+    path = str(tmp_path / 'book.c4bk')
+    with pytest.raises(ValueError):
+        write_opening_book(path, {}, height, base, 0)
+    with pytest.raises(ValueError):
+        build_opening_book(path, height, base, 0)
+    with pytest.raises(ValueError):
+        write_opening_book(path, {}, 6, 7, 256)  # deeper than a byte
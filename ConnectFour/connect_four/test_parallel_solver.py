@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# filename: test_parallel_solver.py
+
+"""
+test_parallel_solver.py
+~~~~~~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file
+parallel_solver.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import random
+import time
+
+import pytest
+
+from .connect_four import ConnectFour
+from .parallel_solver import (ParallelSolver, SharedTranspositionTable,
+                              pack_entry, unpack_entry)
+from .solver import LOWER, UPPER, Solver
+from .test_solver import drop
+
+
+def random_positions(count, height=4, base=5, seed=0):
+    rng = random.Random(seed)
+    while count:
+        cf = drop(ConnectFour(height, base),
+                  [rng.randint(1, base) for _ in range(rng.randint(6, 10))])
+        if cf.game_over() or all(cf.catcher[height - 1]):
+            continue
+        cf.winner = -1
+        count -= 1
+        yield cf
+
+
+# Shared transposition table
+# -----------------------------------------------------------------------------
+
+def test_entry_packing():
+    for entry in [(0, 0, 0, -1, 0), (41, UPPER, -(1 << 20) - 1, 6, 255),
+                  (12, LOWER, (1 << 20) - 30, 15, 7)]:
+        assert unpack_entry(pack_entry(*entry)) == entry
+
+def test_shared_table_probe_and_store():
+    tt = SharedTranspositionTable(1000)
+    try:
+        assert tt.size == 1024
+        key = (1 << 63) + 5
+        assert tt.probe(key) is None
+        tt.store(key, 7, LOWER, -3, 2)
+        assert tt.probe(key) == (7, LOWER, -3, 2)
+        other = SharedTranspositionTable.attach(tt.name, tt.size)
+        assert other.probe(key) == (7, LOWER, -3, 2)
+        other.store(key + 1024, 2, 0, 0, 0)  # same slot, shallower
+        assert tt.probe(key + 1024) is None
+        other.close()
+        # a torn slot (the words from two different stores) is a miss
+        tt.words[2 * (key & tt.index_mask) + 1] = pack_entry(9, 0, 1, 1, 0)
+        assert tt.probe(key) is None
+    finally:
+        tt.close()
+
+
+# Search
+# -----------------------------------------------------------------------------
+
+def test_matches_the_sequential_solver():
+    with ParallelSolver(4, 5, tt_size=1 << 12, processes=2) as parallel:
+        for cf in random_positions(10):
+            expected = Solver(4, 5, tt_size=1 << 12).solve(cf)
+            result = parallel.solve(cf)
+            assert result.solved
+            assert (result.col, result.score) == (expected.col, expected.score)
+            assert parallel.stats.nodes > 0 or result.depth <= 1
+
+def test_single_process_fallback_is_the_sequential_search():
+    with ParallelSolver(4, 5, tt_size=1 << 12, processes=1) as fallback:
+        assert fallback.pool is None
+        for cf in random_positions(5, seed=1):
+            expected = Solver(4, 5, tt_size=1 << 12).solve(cf)
+            result = fallback.solve(cf)
+            assert repr(result) == repr(expected)
+
+def test_time_limit_returns_a_move():
+    with ParallelSolver(processes=2, tt_size=1 << 16) as parallel:
+        result = parallel.solve(ConnectFour(), time_limit=0.3)
+        assert result.col in range(1, 8)
+        assert not result.solved
+
+@pytest.mark.parametrize('time_limit', [0.5, 1.0])
+def test_time_limit_is_kept(time_limit):
+    # every task stops at the one deadline, queued ones included
+    with ParallelSolver(processes=2, tt_size=1 << 16) as parallel:
+        start = time.monotonic()
+        parallel.solve(ConnectFour(), time_limit=time_limit)
+        assert time.monotonic() - start < time_limit + 0.2
+
+def test_refuses_connect_n():
+    with ParallelSolver(processes=1) as solver:
+        with pytest.raises(ValueError):
+            solver.solve(ConnectFour(connect=5))
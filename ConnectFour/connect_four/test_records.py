@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# filename: test_records.py
+
+"""
+test_records.py
+~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file records.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import functools
+import os
+import struct
+
+import pytest
+
+from .bitboard import BitboardConnectFour
+from .connect_four import ConnectFour
+from .records import (RECORD_HEADER, GameRecordReader, GameRecordWriter,
+                      pack_moves, unpack_moves)
+from .simulator import GreedyPolicy, RandomPolicy, simulate
+from .solver import ComputerPlayer
+
+
+def test_pack_moves():
+    moves = [3, 15, 0, 7, 6]
+    packed = pack_moves(moves)
+    assert len(packed) == 3
+    assert unpack_moves(packed, len(moves)) == moves
+
+def test_turn_loop_records_game(tmp_path):
+    path = str(tmp_path / 'games.c4gr')
+    cf = ConnectFour(height=4, base=5)
+    cf.computer_players[1] = ComputerPlayer(time_limit=0.05)
+    cf.computer_players[2] = ComputerPlayer(time_limit=0.05)
+    cf.redraw_screen = lambda: None
+    with GameRecordWriter(path) as writer:
+        cf.recorder = writer
+        cf.player_turn_loop()
+    (record,) = list(GameRecordReader(path))
+    assert (record.height, record.base, record.winner) == (4, 5, cf.winner)
+    assert record.moves == [col - 1 for col in cf.move_history]
+    assert record.verify()
+
+def test_simulated_games_replay(tmp_path):
+    path = str(tmp_path / 'games.c4gr')
+    with GameRecordWriter(path) as writer:
+        summary = simulate(100, {1: GreedyPolicy(), 2: RandomPolicy()},
+                           processes=1, recorder=writer)
+    reader = GameRecordReader(path)
+    assert len(reader) == 100
+    winners = [record.winner for record in reader]
+    assert winners.count(1) == summary.wins[1]
+    assert all(record.verify(BitboardConnectFour()) for record in reader)
+    # about 20 bytes per game, rather than a dump of the catcher
+    assert os.path.getsize(path) < 100 * 30
+
+def test_unrecordable_simulations_rejected_up_front(tmp_path):
+    path = str(tmp_path / 'games.c4gr')
+    policies = {1: RandomPolicy(), 2: RandomPolicy()}
+    with GameRecordWriter(path) as writer:
+        with pytest.raises(ValueError):
+            simulate(5, policies, processes=1, recorder=writer,
+                     game_class=functools.partial(ConnectFour, connect=5))
+        with pytest.raises(ValueError):
+            simulate(5, policies, base=17, processes=1, recorder=writer)
+    assert len(GameRecordReader(path)) == 0
+
+def test_seek_and_append(tmp_path):
+    path = str(tmp_path / 'games.c4gr')
+    with GameRecordWriter(path) as writer:
+        for n in range(10):
+            writer.write(6, 7, 0, [n % 7] * (n + 1))
+    with GameRecordWriter(path) as writer:  # appending to an existing log
+        writer.write(6, 7, 2, [1, 2, 3])
+    reader = GameRecordReader(path)
+    assert len(reader) == 11
+    assert reader[4].moves == [4] * 5
+    assert reader[10].moves == [1, 2, 3]
+    assert [record.moves[0] for record in reader.iter_from(8)] == [1, 2, 1]
+
+def test_missing_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / 'games.c4gr')
+    with GameRecordWriter(path) as writer:
+        for n in range(5):
+            writer.write(6, 7, 1, [n, n, n])
+    os.remove(path + '.idx')
+    assert GameRecordReader(path)[3].moves == [3, 3, 3]
+
+def test_partial_record_is_left_out(tmp_path):
+    # an append interrupted after the header and one byte of 20 moves
+    path = str(tmp_path / 'games.c4gr')
+    with GameRecordWriter(path) as writer:
+        writer.write(6, 7, 1, [0, 1, 2])
+    with open(path + '.idx', 'ab') as f:
+        f.write(struct.pack('<Q', os.path.getsize(path)))
+    with open(path, 'ab') as f:
+        f.write(RECORD_HEADER.pack(6, 7, 0, 20) + bytes(1))
+    reader = GameRecordReader(path)
+    assert len(reader) == 1
+    assert [record.moves for record in reader] == [[0, 1, 2]]
+    with GameRecordWriter(path) as writer:  # appends after the whole record
+        writer.write(6, 7, 2, [3])
+    reader = GameRecordReader(path)
+    assert [record.moves for record in reader] == [[0, 1, 2], [3]]
+    assert reader[1].moves == [3]
+
+def test_replay_is_lazy():
+    from .records import GameRecord
+    record = GameRecord(6, 7, 1, [0, 1, 0, 1, 0, 1, 0])
+    steps = record.replay()
+    game = next(steps)
+    assert game.filled_count == 1
+    assert record.verify()
+
+def test_wide_board_rejected(tmp_path):
+    with GameRecordWriter(str(tmp_path / 'games.c4gr')) as writer:
+        with pytest.raises(ValueError):
+            writer.write(6, 17, 0, [16])
+
+def test_tall_board_rejected(tmp_path):
+    with GameRecordWriter(str(tmp_path / 'games.c4gr')) as writer:
+        with pytest.raises(ValueError):
+            writer.write(256, 7, 0, [0])
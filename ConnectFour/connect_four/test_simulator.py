@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# filename: test_simulator.py
+
+"""
+test_simulator.py
+~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file simulator.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+from .bitboard import BitboardConnectFour
+from .connect_four import ConnectFour
+from .simulator import (GreedyPolicy, RandomPolicy, SearchPolicy, iter_games,
+                        play_game, simulate)
+
+
+def test_play_game_ends_with_a_result():
+    cf = ConnectFour()
+    winner, moves = play_game(cf, {1: RandomPolicy(), 2: RandomPolicy()}, 7)
+    assert winner in {0, 1, 2}
+    assert moves == cf.filled_count
+
+def test_play_game_is_reproducible_across_backends():
+    policies = {1: RandomPolicy(), 2: GreedyPolicy()}
+    for seed in range(20):
+        assert play_game(ConnectFour(), policies, seed) == \
+               play_game(BitboardConnectFour(), policies, seed)
+
+def test_summary_counts():
+    summary = simulate(50, {1: RandomPolicy(), 2: RandomPolicy()},
+                       height=5, base=6, processes=1, chunk_size=7)
+    assert summary.games == 50
+    assert summary.wins[1] + summary.wins[2] + summary.draws == 50
+    assert summary.games_per_sec > 0
+
+def test_pool_matches_single_process():
+    policies = {1: GreedyPolicy(), 2: RandomPolicy()}
+    single = sorted(iter_games(40, policies, processes=1, chunk_size=8))
+    pooled = sorted(iter_games(40, policies, processes=2, chunk_size=8))
+    assert single == pooled
+
+def test_search_games_are_reproducible():
+    policies = {1: SearchPolicy(max_depth=4), 2: RandomPolicy()}
+    one_chunk = sorted(iter_games(6, policies, processes=1, chunk_size=6))
+    chunked = sorted(iter_games(6, policies, processes=1, chunk_size=1))
+    assert one_chunk == chunked
+    assert sorted(iter_games(6, policies, processes=1, chunk_size=6)) == \
+           one_chunk
+
+def test_greedy_beats_random():
+    summary = simulate(200, {1: GreedyPolicy(), 2: RandomPolicy()},
+                       processes=1)
+    assert summary.win_rate(1) > 0.8
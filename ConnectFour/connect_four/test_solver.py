@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# filename: test_solver.py
+
+"""
+test_solver.py
+~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file solver.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import random
+
+from .connect_four import ConnectFour
+from .solver import ComputerPlayer, Solver, TranspositionTable
+
+
+def drop(cf, cols):
+    # drop pucks into the 1-based columns `cols`, alternating players
+    for col in cols:
+        cf.active_player = 1 if cf.active_player != 1 else 2
+        cf.try_to_place_puck(col)
+    cf.active_player = 1 if cf.active_player != 1 else 2
+    return cf
+
+def brute_force(cf) -> int:
+    # plain minimax outcome for the player to move: +1, 0 or -1
+    player = cf.active_player
+    best = -1
+    for col in range(1, cf.base + 1):
+        if cf.catcher[cf.height - 1][col - 1] != 0:
+            continue
+        row = next(r for r in range(cf.height) if cf.catcher[r][col - 1] == 0)
+        cf.catcher[row][col - 1] = player
+        if cf.check_for_win_at(row, col - 1):
+            score = 1
+        elif all(cf.catcher[cf.height - 1]):
+            score = 0
+        else:
+            cf.active_player = 3 - player
+            score = -brute_force(cf)
+            cf.active_player = player
+        cf.catcher[row][col - 1] = 0
+        cf.winner = -1
+        best = max(best, score)
+        if best == 1:
+            break
+    return best
+
+
+# Positions
+# -----------------------------------------------------------------------------
+
+def test_key_includes_the_side_to_move():
+    solver = Solver()
+    pucks_1, pucks_2 = 1 << 0, 1 << 7  # one puck each, in columns 1 and 2
+    key_1 = solver.position_from_pucks(pucks_1, pucks_2, 0)[3]
+    key_2 = solver.position_from_pucks(pucks_1, pucks_2, 1)[3]
+    assert key_1 != key_2
+    # a move's key update matches the key worked out from scratch
+    current, mask, _, key, side = \
+        solver.position_from_pucks(pucks_1, pucks_2)
+    move = 1 << 14  # column 3
+    assert key ^ solver.zobrist_moves[side][14] == \
+           solver.position_from_pucks(pucks_1 | move, pucks_2, 1)[3]
+
+
+# Search
+# -----------------------------------------------------------------------------
+
+def test_takes_immediate_win():
+    cf = drop(ConnectFour(), [1, 2, 1, 2, 1, 2])
+    result = Solver().solve(cf)
+    assert result.col == 1
+    assert result.outcome == 'win'
+
+def test_blocks_immediate_threat():
+    cf = drop(ConnectFour(), [1, 2, 1, 2, 1])
+    result = Solver().solve(cf, max_depth=4)
+    assert result.col == 1
+
+def test_small_board_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(15):
+        cf = ConnectFour(height=4, base=5)
+        cols = []
+        for _ in range(rng.randint(8, 11)):
+            cols.append(rng.randint(1, 5))
+        drop(cf, cols)
+        if cf.game_over() or all(cf.catcher[3]):
+            continue
+        cf.winner = -1
+        expected = brute_force(cf)
+        result = Solver(height=4, base=5, tt_size=1 << 12).solve(cf)
+        assert result.solved
+        assert result.score == expected
+
+def test_time_limit_returns_a_move():
+    cf = ConnectFour()
+    solver = Solver()
+    result = solver.solve(cf, time_limit=0.2)
+    assert result.col in range(1, 8)
+    assert solver.stats.nodes_per_sec > 0
+    assert 0.0 <= solver.stats.tt_hit_rate <= 1.0
+
+
+# Transposition table
+# -----------------------------------------------------------------------------
+
+def test_tt_size_is_bounded():
+    tt = TranspositionTable(1000)
+    assert tt.size == 1024
+    for key in range(10000):
+        tt.store(key, 1, 0, 0, 0)
+    assert len(tt.keys) == 1024
+
+def test_tt_replacement_prefers_depth():
+    tt = TranspositionTable(16)
+    tt.store(1, 5, 0, 7, 3)
+    tt.store(17, 2, 0, 9, 4)  # same slot, shallower: kept out
+    assert tt.probe(1) == (5, 0, 7, 3)
+    assert tt.probe(17) is None
+    tt.new_search()
+    tt.store(17, 2, 0, 9, 4)  # older generation: replaced
+    assert tt.probe(17) == (2, 0, 9, 4)
+
+
+# Computer player in the turn loop
+# -----------------------------------------------------------------------------
+
+def test_computer_players_finish_a_game():
+    cf = ConnectFour(height=4, base=5)
+    cf.computer_players[1] = ComputerPlayer(time_limit=0.1)
+    cf.computer_players[2] = ComputerPlayer(time_limit=0.1)
+    cf.redraw_screen = lambda: None
+    cf.player_turn_loop()
+    assert cf.winner in {0, 1, 2}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# filename: test_sparse.py
+
+"""
+test_sparse.py
+~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file sparse.py
+(and the connect-N mode of the other backends).
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import tracemalloc
+
+import pytest
+
+from .bitboard import BitboardConnectFour
+from .connect_four import ConnectFour
+from .simulator import RandomPolicy, play_game
+from .solver import ComputerPlayer
+from .sparse import SparseConnectFour
+
+
+BACKENDS = (ConnectFour, BitboardConnectFour, SparseConnectFour)
+
+
+def test_backends_agree_on_connect_n():
+    policies = {1: RandomPolicy(), 2: RandomPolicy()}
+    for connect in (3, 4, 5, 6):
+        for seed in range(20):
+            height, base = [(6, 7), (7, 9), (5, 12)][seed % 3]
+            results = [play_game(backend(height, base, connect), policies, seed)
+                       for backend in BACKENDS]
+            assert results[0] == results[1] == results[2]
+
+def test_full_scan_matches_outward_count():
+    policies = {1: RandomPolicy(), 2: RandomPolicy()}
+    for seed in range(20):
+        fast = SparseConnectFour(6, 7, 5)
+        slow = SparseConnectFour(6, 7, 5)
+        slow.full_scan = True
+        assert play_game(fast, policies, seed) == \
+               play_game(slow, policies, seed)
+
+def test_catcher_view_and_loading():
+    dense = ConnectFour(4, 5)
+    for col in (1, 2, 2, 5):
+        dense.switch_player()
+        dense.try_to_place_puck(col)
+    sparse = SparseConnectFour(4, 5)
+    sparse.catcher = dense.catcher
+    assert sparse.catcher == dense.catcher
+    assert sparse.catcher[1][1] == 1 and sparse.catcher[0][4] == 2
+    assert sparse.filled_count == 4
+    assert not sparse.game_over()
+
+def test_hand_loaded_win_is_found():
+    sparse = SparseConnectFour(4, 5, connect=3)
+    sparse.catcher = [[0, 2, 1, 0, 0],
+                      [0, 1, 2, 0, 0],
+                      [0, 0, 0, 0, 0],
+                      [0, 0, 0, 0, 0]]
+    assert not sparse.game_over()
+    sparse.active_player = 1
+    sparse.try_to_place_puck(1)
+    sparse.active_player = 2
+    sparse.try_to_place_puck(1)
+    sparse.active_player = 1
+    sparse.try_to_place_puck(1)  # 1s at (2, 0), (1, 1) and (0, 2)
+    assert sparse.game_over()
+    assert sparse.winner == 1
+
+def test_columns_off_the_board_are_rejected(capsys):
+    sparse = SparseConnectFour(4, 5)
+    sparse.switch_player()
+    for col in (0, -1, 6, 100):
+        assert not sparse.try_to_place_puck(col)
+    assert 'proper range' in capsys.readouterr().out
+    assert (sparse.filled_count, sparse.spots, sparse.stacks) == (0, {}, {})
+    assert sparse.try_to_place_puck(5)
+    assert sparse.spots == {(0, 4): 1}
+
+def test_huge_board_memory_scales_with_pucks():
+    tracemalloc.start()
+    try:
+        game = SparseConnectFour(height=10000, base=10000, connect=5)
+        winner, moves = play_game(game, {1: RandomPolicy(), 2: RandomPolicy()},
+                                  seed=3)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert winner in {1, 2}
+    assert moves == len(game.spots)
+    assert peak < 1000 * moves + (1 << 20)  # far below 10^8 spots
+
+def test_solver_refuses_connect_n():
+    game = ConnectFour(connect=5)
+    game.switch_player()
+    with pytest.raises(ValueError):
+        ComputerPlayer(time_limit=0.1).choose_col(game)
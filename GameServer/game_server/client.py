@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# filename: client.py
+
+"""
+client.py
+~~~~~~~~~
+A small client for `server.py`.  `GameClient` is the asyncio client used
+by the tests (and handy for scripting load tests): it sends lines and
+reads the server's text up to an expected prompt.  Run as a program, it
+is an interactive terminal client.
+
+To play, with a server running, execute the following in a shell
+terminal (in the directory above this package):
+python3 -m game_server.client --port 8765
+"""
+
+import argparse
+import asyncio
+import sys
+
+
+class GameClient:
+
+    def __init__(self, host : str = '127.0.0.1', port : int = 8765):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host,
+                                                                 self.port)
+        return self
+
+    async def send_line(self, line : str):
+        self.writer.write((line + '\n').encode())
+        await self.writer.drain()
+
+    async def read_until(self, text : str, timeout : float = 5.0) -> str:
+        # Read the server's output up to and including `text`.
+        data = await asyncio.wait_for(self.reader.readuntil(text.encode()),
+                                      timeout)
+        return data.decode()
+
+    async def read_all(self, timeout : float = 5.0) -> str:
+        # Read until the server closes the connection.
+        data = await asyncio.wait_for(self.reader.read(), timeout)
+        return data.decode()
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def interact(host : str, port : int):
+    client = await GameClient(host, port).connect()
+    loop = asyncio.get_running_loop()
+
+    async def forward_input():
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            await client.send_line(line.rstrip('\n'))
+
+    input_task = asyncio.create_task(forward_input())
+    while True:
+        data = await client.reader.read(4096)
+        if not data:
+            break
+        sys.stdout.write(data.decode())
+        sys.stdout.flush()
+    input_task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play on a game server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(interact(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
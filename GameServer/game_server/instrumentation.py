@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# filename: instrumentation.py
+
+"""
+instrumentation.py
+~~~~~~~~~~~~~~~~~~
+Call counts and latency histograms for the games' hot paths, exported as
+JSON or in the Prometheus text format (also over a small local HTTP
+endpoint), plus per-session cProfile capture.
+
+Instrumentation works by wrapping the instrumented methods on their
+classes when it is enabled, and putting the original methods back when
+it is disabled, so a disabled (or never enabled) instrumentation costs
+nothing at all.  The default targets are `ConnectFour.game_over` and
+`try_to_place_puck` (and the overrides of the other board backends), and
+`Hangman.update_state_letter`, `get_word_list`, `get_word_index` and
+`select_secret_word`.
+
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    ...  # play
+    print(instrumentation.registry.to_prometheus())
+    instrumentation.disable()
+
+To play a terminal game with the instrumentation on (and a profile of
+the session), execute the following in a shell terminal (in the
+directory above this package):
+python3 -m game_server.instrumentation connect_four --profile session.prof
+"""
+
+import argparse
+import bisect
+import contextlib
+import cProfile
+import functools
+import http.server
+import json
+import threading
+import time
+
+from .server import WORD_LIST_PATH, ConnectFour, Hangman
+
+
+# Upper bounds (seconds) of the latency histogram buckets; the last,
+# implicit bucket is +Inf.
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+           2.5, 5.0, 10.0)
+
+DEFAULT_TARGETS = ((ConnectFour, ('game_over', 'try_to_place_puck')),
+                   (Hangman, ('update_state_letter', 'get_word_list',
+                              'get_word_index', 'select_secret_word')))
+
+
+class Timer:
+    # Call count, total time and latency histogram of one method.
+
+    def __init__(self, bounds = BUCKETS):
+        self.bounds = bounds
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0.0  # seconds
+        self.buckets = [0] * (len(self.bounds) + 1)  # the last one is +Inf
+
+    def observe(self, seconds : float):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(self.bounds, seconds)] += 1
+
+    def cumulative_buckets(self):
+        # [(upper bound, calls at most that long)], Prometheus style
+        counts = []
+        running = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.buckets):
+            running += count
+            counts.append((bound, running))
+        return counts
+
+    def to_dict(self) -> dict:
+        return { 'count' : self.count,
+                 'sum' : self.total,
+                 'buckets' : { format_bound(bound) : count
+                               for bound, count in self.cumulative_buckets() } }
+
+
+class Registry:
+    # The timers, by (class name, method name).
+
+    def __init__(self):
+        self.timers = {}
+
+    def timer(self, class_name : str, method_name : str) -> Timer:
+        key = (class_name, method_name)
+        if key not in self.timers:
+            self.timers[key] = Timer()
+        return self.timers[key]
+
+    def reset(self):
+        for timer in self.timers.values():
+            timer.reset()
+
+    def to_dict(self) -> dict:
+        return { f'{class_name}.{method_name}' : timer.to_dict()
+                 for (class_name, method_name), timer
+                 in sorted(self.timers.items()) }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        name = 'game_method_seconds'
+        lines = [f'# HELP {name} Latency of the games\' instrumented methods.',
+                 f'# TYPE {name} histogram']
+        for (class_name, method_name), timer in sorted(self.timers.items()):
+            labels = f'class="{class_name}",method="{method_name}"'
+            for bound, count in timer.cumulative_buckets():
+                lines.append(f'{name}_bucket{{{labels},' + \
+                             f'le="{format_bound(bound)}"}} {count}')
+            lines.append(f'{name}_sum{{{labels}}} {timer.total!r}')
+            lines.append(f'{name}_count{{{labels}}} {timer.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_bound(bound : float) -> str:
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+def timed(func, timer : Timer):
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timer.observe(perf_counter() - start)
+    return wrapper
+
+
+class Instrumentation:
+
+    def __init__(self, registry : Registry = None, targets = DEFAULT_TARGETS):
+        # `targets`: (class, method names) pairs.  A subclass that
+        # overrides one of the methods (e.g. BitboardConnectFour.game_over)
+        # is instrumented too, under its own class name.
+        self.registry = Registry() if registry is None else registry
+        self.targets = targets
+        self.originals = []  # (class, name, original attribute)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.originals)
+
+    def enable(self):
+        if self.enabled:
+            return
+        for cls, names in self.targets:
+            for klass in [cls] + all_subclasses(cls):
+                for name in names:
+                    if name in klass.__dict__:
+                        self.wrap(klass, name)
+
+    def wrap(self, klass, name : str):
+        original = klass.__dict__[name]
+        timer = self.registry.timer(klass.__name__, name)
+        if isinstance(original, staticmethod):
+            wrapped = staticmethod(timed(original.__func__, timer))
+        elif isinstance(original, classmethod):
+            wrapped = classmethod(timed(original.__func__, timer))
+        else:
+            wrapped = timed(original, timer)
+        setattr(klass, name, wrapped)
+        self.originals.append((klass, name, original))
+
+    def disable(self):
+        while self.originals:
+            klass, name, original = self.originals.pop()
+            setattr(klass, name, original)
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+
+def all_subclasses(cls):
+    subclasses = []
+    for subclass in cls.__subclasses__():
+        subclasses.append(subclass)
+        subclasses.extend(all_subclasses(subclass))
+    return subclasses
+
+
+# Exporting
+# -----------------------------------------------------------------------------
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    # GET /metrics (Prometheus text format) or /metrics.json
+    registry = None  # set on the server's subclass, see `start_http_server`
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            body = self.registry.to_prometheus()
+            content_type = 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body = self.registry.to_json()
+            content_type = 'application/json'
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # keep scrapes out of the game's output
+
+
+def start_http_server(registry : Registry, port : int = 9108,
+                      host : str = '127.0.0.1'):
+    # Serve `registry` from a daemon thread; returns the HTTP server (its
+    # `server_address` has the port, if 0 was given) to `shutdown()`.
+    handler = type('Handler', (MetricsHandler,), {'registry': registry})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# Profiling
+# -----------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def profiled(path : str = None):
+    # Profile the block with cProfile; the stats are saved to `path` (for
+    # pstats or snakeviz) if given.  Yields the cProfile.Profile.
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path is not None:
+            profiler.dump_stats(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play a terminal game ' + \
+                                     'with instrumentation on.')
+    parser.add_argument('game', choices=('connect_four', 'hangman'))
+    parser.add_argument('--profile', metavar='PATH',
+                        help='save a cProfile of the session here')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='serve the metrics over HTTP on this port')
+    args = parser.parse_args()
+    instrumentation = Instrumentation()
+    if args.metrics_port is not None:
+        start_http_server(instrumentation.registry, args.metrics_port)
+    game = ConnectFour() if args.game == 'connect_four' else Hangman()
+    with instrumentation, profiled(args.profile):
+        if args.game == 'hangman':
+            Hangman.announce_game()
+            game.game_loop(Hangman.get_word_index(WORD_LIST_PATH))
+            Hangman.announce_exit()
+        else:
+            game.session()
+    print(instrumentation.registry.to_json())
+
+
+if __name__ == '__main__':
+    main()
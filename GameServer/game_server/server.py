@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# filename: server.py
+
+"""
+server.py
+~~~~~~~~~
+An asyncio TCP server that hosts many concurrent games of Connect Four
+and Hangman in a single event loop.  Each connection gets its own game
+object; the game's usual drawing and query methods are reused, with
+their output captured and sent down the connection instead of going to
+this process's terminal, and with the connection's lines as input.
+
+The protocol is plain lines of text, so `nc localhost 8765` (or
+`client.py`) is enough to play.  The server first asks for a game
+("1"/"connect four" or "2"/"hangman"), then the session goes like the
+terminal game, prompts and all.  A session that stays silent for
+`idle_timeout` seconds is closed and its game is dropped.
+
+The games are imported as packages, so install them first (from the
+top of the repository):
+pip install -e Renderer -e ConnectFour -e Hangman
+
+To start the server, execute the following in a shell terminal (in the
+directory above this package):
+python3 -m game_server.server --port 8765
+"""
+
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import io
+import itertools
+import os
+
+from connect_four.connect_four import ConnectFour
+from hangman.difficulty import DIFFICULTIES, DifficultyIndex
+from hangman.hangman import Hangman
+from hangman.word_index import WORD_LIST_PATH
+from renderer.renderer import DiffRenderer, capture
+
+
+class SessionClosed(Exception):
+    pass
+
+
+class Session:
+    # The I/O of one connection: `show` runs a game's (printing) method
+    # and sends what it printed; `redraw` sends only what changed on the
+    # game screen; `ask` sends a prompt and waits for the answer line.
+
+    def __init__(self, reader, writer, idle_timeout : float,
+                 profiler : cProfile.Profile = None):
+        self.reader = reader
+        self.writer = writer
+        self.idle_timeout = idle_timeout
+        self.renderer = DiffRenderer(ansi=True)
+        # if given, profiles this session's game code (and nothing else)
+        self.profiler = profiler
+
+    async def send(self, text : str):
+        self.writer.write(text.replace('\n', '\r\n').encode())
+        await self.writer.drain()
+
+    async def show(self, method, *args):
+        # Nothing awaits while stdout is redirected, so other sessions in
+        # the event loop cannot print into this session's buffer.
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            result = self.run(method, *args)
+        await self.send(buffer.getvalue())
+        return result
+
+    async def redraw(self, draw_method):
+        await self.send(self.renderer.update(self.run(capture, draw_method)))
+
+    def run(self, method, *args):
+        if self.profiler is None:
+            return method(*args)
+        self.profiler.enable()
+        try:
+            return method(*args)
+        finally:
+            self.profiler.disable()
+
+    async def ask(self, prompt : str) -> str:
+        await self.send(prompt)
+        try:
+            line = await asyncio.wait_for(self.reader.readline(),
+                                          self.idle_timeout)
+        except asyncio.TimeoutError:
+            await self.send('\nClosing this idle session.\n')
+            raise SessionClosed()
+        if not line:
+            raise SessionClosed()  # the client hung up
+        return line.decode(errors='replace').strip()
+
+
+async def play_connect_four(session : Session, height : int = 6,
+                            base : int = 7):
+    # ConnectFour.session, with the terminal I/O going through `session`
+    cf = ConnectFour(height, base)
+    await session.show(ConnectFour.announce_game)
+    play_again = await session.show(ConnectFour.parse_new_game_answer,
+                                    await session.ask(ConnectFour.new_game_prompt))
+    while play_again:
+        cf.reset_for_new_game()
+        session.renderer.invalidate()
+        while not cf.game_over():
+            cf.switch_player()
+            await session.redraw(cf.draw_screen)
+            await session.show(cf.show_col_instructions)
+            valid = False
+            while not valid:
+                col = await session.ask(cf.col_prompt())
+                if col == 'quit' or col == 'QUIT':
+                    return
+                col = await session.show(cf.parse_col, col)
+                if col is not None:
+                    valid = await session.show(cf.try_to_place_puck, col)
+        await session.redraw(cf.draw_screen)
+        await session.show(cf.show_game_conclusion)
+        play_again = await session.show(ConnectFour.parse_new_game_answer,
+                                        await session.ask(ConnectFour.new_game_prompt))
+
+async def play_hangman(session : Session, word_list : list,
+                       pause : float = 1.0, difficulty = None, guesser = None):
+    # Hangman.session, with the terminal I/O going through `session`, and
+    # a non-blocking `pause` (seconds) after each letter's result.  With a
+    # `guesser` (a hangman.guesser.HangmanGuesser), the game is evil
+    # Hangman (see hangman/evil.py).
+    if guesser is None:
+        hm = Hangman(difficulty=difficulty)
+    else:
+        from hangman.evil import EvilHangman
+        hm = EvilHangman(guesser, difficulty)
+    await session.show(Hangman.announce_game)
+    play_again = await session.show(Hangman.parse_new_game_answer,
+                                    await session.ask(Hangman.new_game_prompt))
+    while play_again:
+        word = Hangman.select_secret_word(word_list, hm.difficulty)
+        hm.update_state_word(Hangman.clean_input_word(word))
+        session.renderer.invalidate()
+        while not hm.state.is_over:
+            await session.redraw(hm.draw_game_screen)
+            letter = None
+            while letter is None:
+                await session.send('\nEnter a letter or "quit" to exit.\n')
+                letter = await session.ask(Hangman.letter_prompt)
+                if letter == 'quit' or letter == 'QUIT':
+                    return
+                letter = await session.show(hm.validate_letter, letter)
+            await session.show(hm.print_letter_result, letter)
+            await asyncio.sleep(pause)
+            hm.update_state_letter(letter)
+        await session.redraw(hm.draw_game_screen)
+        await session.show(hm.show_game_conclusion)
+        play_again = await session.show(Hangman.parse_new_game_answer,
+                                        await session.ask(Hangman.new_game_prompt))
+
+
+class GameServer:
+
+    def __init__(self, host : str = '127.0.0.1', port : int = 8765,
+                 idle_timeout : float = 300.0, word_list : list = None,
+                 hangman_pause : float = 1.0, profile_dir : str = None,
+                 hangman_difficulty = None, evil_hangman : bool = False):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.hangman_pause = hangman_pause
+        # secret words' difficulty (see Hangman.select_secret_word)
+        self.hangman_difficulty = hangman_difficulty
+        # play evil Hangman (needs NumPy), with one shared guesser (its
+        # dictionary and candidate cache)
+        self.evil_hangman = evil_hangman
+        self.guesser = None
+        # if set, each session's game code is profiled into
+        # `<profile_dir>/session-<n>.prof`
+        self.profile_dir = profile_dir
+        self.session_numbers = itertools.count(1)
+        # one word list for all Hangman sessions (opened on first use, as
+        # a memory-mapped word index)
+        self.word_list = word_list
+        self.sessions = set()
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection,
+                                                 self.host, self.port)
+        # with port 0 the system picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def get_guesser(self):
+        if not self.evil_hangman:
+            return None
+        if self.guesser is None:
+            from hangman.guesser import HangmanGuesser
+            self.guesser = HangmanGuesser(self.get_word_list())
+        return self.guesser
+
+    def get_word_list(self):
+        if self.word_list is None:
+            self.word_list = Hangman.get_word_index(WORD_LIST_PATH)
+        return self.word_list
+
+    async def handle_connection(self, reader, writer):
+        profiler = None if self.profile_dir is None else cProfile.Profile()
+        session = Session(reader, writer, self.idle_timeout, profiler)
+        number = next(self.session_numbers)
+        self.sessions.add(session)
+        try:
+            choice = await session.ask('\nWhich game would you like to ' + \
+                                       'play?\n  1. Connect Four\n' + \
+                                       '  2. Hangman\n> ')
+            choice = choice.upper()
+            if choice in {'1', 'CONNECT FOUR', 'CONNECT_FOUR'}:
+                await play_connect_four(session)
+            elif choice in {'2', 'HANGMAN'}:
+                await play_hangman(session, self.get_word_list(),
+                                   self.hangman_pause,
+                                   self.hangman_difficulty,
+                                   self.get_guesser())
+            else:
+                await session.send('Unknown game.\n')
+            await session.show(ConnectFour.announce_exit)
+        except (SessionClosed, ConnectionError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            if profiler is not None:
+                profiler.dump_stats(os.path.join(self.profile_dir,
+                                                 f'session-{number}.prof'))
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve Connect Four ' + \
+                                     'and Hangman over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--idle-timeout', type=float, default=300.0,
+                        help='seconds before a silent session is closed')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='instrument the games and serve their ' + \
+                             'metrics over HTTP on this port')
+    parser.add_argument('--profile-dir', default=None,
+                        help='save a cProfile of every session here')
+    parser.add_argument('--hangman-difficulty', default=None,
+                        choices=tuple(DIFFICULTIES),
+                        help='draw Hangman words of this difficulty')
+    parser.add_argument('--evil-hangman', action='store_true',
+                        help='play evil Hangman, which dodges the ' + \
+                             'guesses (needs NumPy)')
+    args = parser.parse_args()
+    server = GameServer(args.host, args.port, args.idle_timeout,
+                        profile_dir=args.profile_dir,
+                        hangman_difficulty=args.hangman_difficulty,
+                        evil_hangman=args.evil_hangman)
+    if args.hangman_difficulty is not None:
+        # build the difficulty index before the first game asks for it
+        DifficultyIndex.for_words(server.get_word_list()).warm_up()
+    if args.metrics_port is not None:
+        # (imported here: the instrumentation module imports this one)
+        from .instrumentation import Instrumentation, start_http_server
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+        start_http_server(instrumentation.registry, args.metrics_port)
+        print(f'Serving metrics on http://127.0.0.1:{args.metrics_port}' + \
+              '/metrics')
+    print(f'Serving games on {args.host}:{args.port} (Ctrl-C to stop).')
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# filename: test_instrumentation.py
+
+"""
+test_instrumentation.py
+~~~~~~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file
+instrumentation.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import json
+import os
+import pstats
+import urllib.request
+
+from .instrumentation import Instrumentation, profiled, start_http_server
+from .server import ConnectFour, Hangman
+from .test_server import play_connect_four, run_with_server
+from connect_four.bitboard import BitboardConnectFour
+
+
+def play(game, cols):
+    for col in cols:
+        game.switch_player()
+        game.try_to_place_puck(col)
+        game.game_over()
+
+
+def test_counts_calls_and_restores_methods():
+    original = ConnectFour.game_over
+    with Instrumentation() as instrumentation:
+        assert ConnectFour.game_over is not original
+        play(ConnectFour(), [1, 2, 1, 2])
+        play(BitboardConnectFour(), [3, 3])
+        hm = Hangman('WORD')
+        hm.update_state_letter('W')
+        assert Hangman.select_secret_word(['ONLY']) == 'ONLY'
+    assert ConnectFour.game_over is original
+    timers = instrumentation.registry.timers
+    assert timers[('ConnectFour', 'game_over')].count == 4
+    assert timers[('ConnectFour', 'try_to_place_puck')].count == 4
+    assert timers[('BitboardConnectFour', 'game_over')].count == 2
+    assert timers[('Hangman', 'update_state_letter')].count == 1
+    assert timers[('Hangman', 'select_secret_word')].count == 1
+    play(ConnectFour(), [1])  # disabled: not counted
+    assert timers[('ConnectFour', 'game_over')].count == 4
+
+def test_exports():
+    with Instrumentation() as instrumentation:
+        play(ConnectFour(), [4, 4, 4])
+    data = json.loads(instrumentation.registry.to_json())
+    game_over = data['ConnectFour.game_over']
+    assert game_over['count'] == 3
+    assert game_over['buckets']['+Inf'] == 3
+    text = instrumentation.registry.to_prometheus()
+    assert '# TYPE game_method_seconds histogram' in text
+    assert 'game_method_seconds_count{class="ConnectFour",' + \
+           'method="game_over"} 3' in text
+    assert 'game_method_seconds_bucket{class="ConnectFour",' + \
+           'method="game_over",le="+Inf"} 3' in text
+
+def test_http_endpoint():
+    with Instrumentation() as instrumentation:
+        play(ConnectFour(), [1])
+    server = start_http_server(instrumentation.registry, port=0)
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        with urllib.request.urlopen(url + '/metrics') as response:
+            assert b'game_method_seconds_count' in response.read()
+        with urllib.request.urlopen(url + '/metrics.json') as response:
+            assert 'ConnectFour.game_over' in json.load(response)
+    finally:
+        server.shutdown()
+
+def test_profiled(tmp_path):
+    path = str(tmp_path / 'session.prof')
+    with profiled(path):
+        play(ConnectFour(), [1, 2, 3])
+    stats = pstats.Stats(path)
+    assert any(name == 'try_to_place_puck' for _, _, name in stats.stats)
+
+def test_server_profiles_each_session(tmp_path):
+    run_with_server(lambda server: play_connect_four(server, [1, 2, 1, 2,
+                                                              1, 2, 1]),
+                    profile_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == ['session-1.prof']
+    stats = pstats.Stats(str(tmp_path / 'session-1.prof'))
+    assert any(name == 'try_to_place_puck' for _, _, name in stats.stats)
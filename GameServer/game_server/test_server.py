@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# filename: test_server.py
+
+"""
+test_server.py
+~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file server.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import asyncio
+
+import pytest
+
+from .client import GameClient
+from .server import GameServer
+
+
+def run_with_server(scenario, **server_options):
+    # start a server on a free port, run `scenario(server)`, stop the server
+    async def main():
+        server = GameServer(port=0, hangman_pause=0, **server_options)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+async def play_connect_four(server, cols):
+    client = await GameClient(port=server.port).connect()
+    await client.read_until('> ')
+    await client.send_line('1')
+    await client.read_until('(Enter y for yes, n for no.) ')
+    await client.send_line('y')
+    for col in cols:
+        await client.read_until('which column? ')
+        await client.send_line(str(col))
+    output = await client.read_until('(Enter y for yes, n for no.) ')
+    await client.send_line('n')
+    await client.read_all()
+    await client.close()
+    return output
+
+
+# Connect Four
+# -----------------------------------------------------------------------------
+
+def test_connect_four_game():
+    output = run_with_server(
+        lambda server: play_connect_four(server, [1, 2, 1, 2, 1, 2, 1]))
+    assert 'Player 1 is the winner!' in output
+
+def test_connect_four_invalid_input():
+    async def scenario(server):
+        client = await GameClient(port=server.port).connect()
+        await client.read_until('> ')
+        await client.send_line('connect four')
+        await client.read_until('(Enter y for yes, n for no.) ')
+        await client.send_line('yes')
+        await client.read_until('which column? ')
+        await client.send_line('9')
+        output = await client.read_until('which column? ')
+        await client.send_line('quit')
+        output += await client.read_all()
+        await client.close()
+        return output
+    output = run_with_server(scenario)
+    assert 'Invalid input.' in output
+    assert 'Exiting the game.' in output
+
+def test_many_concurrent_sessions():
+    async def scenario(server):
+        games = [play_connect_four(server, [2, 3, 2, 3, 2, 3, 2])
+                 for _ in range(200)]
+        return await asyncio.gather(*games)
+    outputs = run_with_server(scenario)
+    assert all('Player 1 is the winner!' in output for output in outputs)
+
+
+# Hangman
+# -----------------------------------------------------------------------------
+
+def test_hangman_game():
+    async def scenario(server):
+        client = await GameClient(port=server.port).connect()
+        await client.read_until('> ')
+        await client.send_line('2')
+        await client.read_until('(Enter y for yes, or n for no.)  ')
+        await client.send_line('y')
+        output = ''
+        for letter in 'hxelo':
+            output += await client.read_until("What's your guess? ")
+            await client.send_line(letter)
+        output += await client.read_until('(Enter y for yes, or n for no.)  ')
+        await client.send_line('n')
+        await client.close()
+        return output
+    output = run_with_server(scenario, word_list=['HELLO'])
+    assert 'Incorrect! - X is *not* in the word!' in output
+    assert 'You won!' in output
+
+def test_evil_hangman_game():
+    pytest.importorskip('numpy')
+    async def scenario(server):
+        client = await GameClient(port=server.port).connect()
+        await client.read_until('> ')
+        await client.send_line('2')
+        await client.read_until('(Enter y for yes, or n for no.)  ')
+        await client.send_line('y')
+        output = ''
+        for letter in 'eloysb':
+            output += await client.read_until("What's your guess? ")
+            await client.send_line(letter)
+        output += await client.read_until('(Enter y for yes, or n for no.)  ')
+        await client.send_line('n')
+        await client.close()
+        return output
+    # after E and L, O and Y each fit fewer words than a strike does
+    output = run_with_server(scenario, word_list=['HELLO', 'JELLY', 'BELLS'],
+                             evil_hangman=True)
+    assert 'Incorrect! - O is *not* in the word!' in output
+    assert 'Incorrect! - Y is *not* in the word!' in output
+    assert 'The secret word was BELLS.' in output
+    assert 'You won!' in output
+
+
+# Idle sessions
+# -----------------------------------------------------------------------------
+
+def test_idle_session_is_closed():
+    async def scenario(server):
+        client = await GameClient(port=server.port).connect()
+        await client.read_until('> ')
+        assert len(server.sessions) == 1
+        output = await client.read_all()
+        await asyncio.sleep(0.05)
+        return output, len(server.sessions)
+    output, sessions = run_with_server(scenario, idle_timeout=0.2)
+    assert 'Closing this idle session.' in output
+    assert sessions == 0
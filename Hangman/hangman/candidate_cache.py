@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# filename: candidate_cache.py
+
+"""
+candidate_cache.py
+~~~~~~~~~~~~~~~~~~
+A bounded LRU cache of the candidate sets of Hangman game states.
+
+Hangman states repeat heavily from game to game (same length, same
+revealed pattern, same wrong letters), so the words that still fit a
+state, and how each letter would split them, are worth keeping.  A
+state's canonical key is its pattern ('_' for a hidden letter) plus the
+26-bit mask of its wrong letters: the correct guesses are already in the
+pattern, and the order of the guesses doesn't matter.
+
+Entries are `CandidateSet`s: the positions of the fitting words in the
+dictionary's length group (an index array) and, once worked out, the
+per-letter partition scores (fill these in before putting an entry:
+its size is taken then).  The cache evicts the least recently used
+entries when it holds more than `max_entries` entries or `max_bytes`
+bytes of arrays, and counts hits, misses and evictions.
+
+    cache = CandidateCache(max_entries=4096)
+    key = state_key('H_LL_', 'HLS')
+    entry = cache.get(key)
+    if entry is None:
+        entry = cache.put(key, CandidateSet(positions))
+"""
+
+import collections
+import sys
+
+
+def state_key(pattern : str, guessed_letters = '') -> tuple:
+    # (pattern, wrong-letter mask) of a game state
+    wrong = 0
+    for letter in set(guessed_letters) - set(pattern):
+        wrong |= 1 << (ord(letter) - ord('A'))
+    return pattern, wrong
+
+
+class CandidateSet:
+
+    def __init__(self, positions, gains = None, counts = None):
+        # `positions`: of the fitting words, in their length group (an
+        # array with `nbytes`, or a sequence); `gains` and `counts`: each
+        # letter's expected information and number of fitting words
+        # containing it (or None)
+        self.positions = positions
+        self.gains = gains
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array_size(item) for item in
+                   (self.positions, self.gains, self.counts)
+                   if item is not None)
+
+
+def array_size(item) -> int:
+    # bytes of a NumPy array (or a CandidateSet), an array.array, or else
+    # of the object itself
+    if hasattr(item, 'nbytes'):
+        return item.nbytes
+    if hasattr(item, 'itemsize'):
+        return len(item) * item.itemsize
+    return sys.getsizeof(item)
+
+
+class CacheStats:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def report(self) -> str:
+        return (f'{self.lookups} lookups, {self.hits} hits '
+                f'({self.hit_rate:.1%}), {self.misses} misses, '
+                f'{self.evictions} evictions')
+
+
+class CandidateCache:
+
+    def __init__(self, max_entries : int = 4096,
+                 max_bytes : int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (entry, its size when put), least recently used first
+        self.entries = collections.OrderedDict()
+        self.nbytes = 0
+        self.stats = CacheStats()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        # The entry for `key` (now the most recently used), or None.
+        item = self.entries.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats.hits += 1
+        return item[0]
+
+    def put(self, key, entry):
+        # Add (or replace) the entry for `key`, evict as needed, and
+        # return the entry.  An entry bigger than `max_bytes` by itself
+        # is returned without being cached.
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        size = array_size(entry)
+        if size > self.max_bytes:
+            return entry
+        self.entries[key] = (entry, size)
+        self.nbytes += size
+        while len(self.entries) > self.max_entries or \
+              self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.stats.evictions += 1
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# filename: dawg.py
+
+"""
+dawg.py
+~~~~~~~
+A compact word store: the word list as a minimal directed acyclic word
+graph (DAWG), i.e. a trie whose identical subtrees (shared suffixes such
+as -ING or -NESSES) are stored once.  The graph lives in a few flat
+arrays rather than in one Python `str` per word, so the SOWPODS list
+takes a couple of MB instead of tens of MB per process.
+
+Every node records how many words it leads to, so the store is also a
+sequence: the words are numbered in alphabetical order, and the word
+with any number (hence a uniformly random word) is found by walking down
+from the root, in O(length) steps.  Every node also records the lengths
+of the words it leads to, so enumerating the words that fit a Hangman
+state (e.g. 'H_LL_' with E, H, L and Z guessed) skips the branches of
+the wrong length.
+
+    words = open_word_dawg()     # compiled next to the word list
+    'HELLO' in words             # True
+    words.random_word()
+    list(words.matching('H_LL_', 'EHLZ'))  # ['HILLO', 'HOLLA', ...]
+
+Arrays (little-endian in the file, after a header recording the size and
+modification time of the source, as in word_index.py):
+
+    first:   per node, the index of its first edge (uint32, nodes + 1)
+    counts:  per node, the number of words below it (uint32)
+    lengths: per node, bit n set if a word has n more letters (uint32)
+    final:   per node, 1 if a word ends there (uint8)
+    letters: per edge, its letter (ASCII, uint8), alphabetical per node
+    targets: per edge, the node it leads to (uint32)
+
+To (re)build the DAWG of the default word list, execute the following in
+a shell terminal (in the directory above this package):
+python3 -m hangman.dawg
+"""
+
+import argparse
+import operator
+import os
+import random
+import struct
+import sys
+from array import array
+
+try:
+    from .word_index import WORD_LIST_PATH, read_words, source_signature
+except ImportError:  # imported by hangman.py run as a script
+    from word_index import WORD_LIST_PATH, read_words, source_signature
+
+
+MAGIC = b'HMDG'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQqIII')  # + nodes, edges, words
+MAX_LENGTH = 31  # (the lengths masks are 32-bit)
+
+
+def dawg_path_for(source : str) -> str:
+    # The DAWG of `words/sowpods.txt` is `words/sowpods.dawg`.
+    return os.path.splitext(source)[0] + '.dawg'
+
+
+class WordDawg:
+    # A read-only, alphabetically ordered sequence of words, stored as a
+    # minimal DAWG in flat arrays.  Node 0 is the root.
+
+    def __init__(self, first : array, counts : array, lengths : array,
+                 final : array, letters : array, targets : array):
+        self.first = first
+        self.counts = counts
+        self.lengths = lengths
+        self.final = final
+        self.letters = letters
+        self.targets = targets
+
+    @property
+    def node_count(self) -> int:
+        return len(self.counts)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in self.arrays())
+
+    def arrays(self):
+        return (self.first, self.counts, self.lengths, self.final,
+                self.letters, self.targets)
+
+    # Sequence
+    # -------------------------------------------------------------------------
+
+    def __len__(self):
+        return self.counts[0]
+
+    def child(self, node : int, letter : int) -> int:
+        # The node reached from `node` by the letter with ASCII code
+        # `letter`, or -1.
+        for edge in range(self.first[node], self.first[node + 1]):
+            if self.letters[edge] == letter:
+                return self.targets[edge]
+        return -1
+
+    def __contains__(self, word) -> bool:
+        if not isinstance(word, str) or not word.isascii():
+            return False
+        node = 0
+        for letter in word.encode('ascii'):
+            node = self.child(node, letter)
+            if node < 0:
+                return False
+        return bool(self.final[node])
+
+    def __getitem__(self, i : int) -> str:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('word index out of range')
+        first, counts, final = self.first, self.counts, self.final
+        letters, targets = self.letters, self.targets
+        word = bytearray()
+        node = 0
+        while True:
+            if final[node]:
+                if i == 0:
+                    return word.decode('ascii')
+                i -= 1
+            for edge in range(first[node], first[node + 1]):
+                count = counts[targets[edge]]
+                if i < count:
+                    word.append(letters[edge])
+                    node = targets[edge]
+                    break
+                i -= count
+
+    def index(self, word : str) -> int:
+        # The (alphabetical) number of `word`; ValueError if absent.
+        i = node = 0
+        for letter in word.encode('ascii', 'replace'):
+            if self.final[node]:
+                i += 1
+            for edge in range(self.first[node], self.first[node + 1]):
+                if self.letters[edge] == letter:
+                    node = self.targets[edge]
+                    break
+                i += self.counts[self.targets[edge]]
+            else:
+                raise ValueError(f'{word!r} is not in the word store.')
+        if not self.final[node]:
+            raise ValueError(f'{word!r} is not in the word store.')
+        return i
+
+    def __iter__(self):
+        return self.matching_nodes(0, None, '', None)
+
+    def random_word(self, rng = random) -> str:
+        return self[rng.randrange(len(self))]
+
+    # Patterns
+    # -------------------------------------------------------------------------
+
+    def matching(self, pattern : str, guessed : str = '', hidden : str = '_'):
+        # Yield (alphabetically) the words that fit a Hangman state: the
+        # revealed `pattern`, e.g. 'H_LL_', where `hidden` marks the hidden
+        # positions, which can't hold any of the `guessed` letters.
+        if len(pattern) > MAX_LENGTH:
+            return iter(())
+        allowed = self.allowed_codes(guessed)
+        steps = [allowed if char == hidden else (ord(char),)
+                 for char in pattern]
+        return self.matching_nodes(0, steps, '', len(pattern))
+
+    def count_matching(self, pattern : str, guessed : str = '',
+                       hidden : str = '_') -> int:
+        # The number of words `matching` would yield, counted without
+        # building them (through the shared nodes, once per depth).
+        if len(pattern) > MAX_LENGTH:
+            return 0
+        allowed = self.allowed_codes(guessed)
+        steps = [allowed if char == hidden else (ord(char),)
+                 for char in pattern]
+        length = len(steps)
+        first, lengths, final = self.first, self.lengths, self.final
+        letters, targets = self.letters, self.targets
+        memo = {}
+
+        def count(node, depth):
+            # words below `node` fitting steps[depth:]
+            if depth == length:
+                return final[node]
+            key = node * 32 + depth
+            if key in memo:
+                return memo[key]
+            codes = steps[depth]
+            bit = 1 << (length - depth - 1)
+            total = 0
+            for edge in range(first[node], first[node + 1]):
+                target = targets[edge]
+                if letters[edge] in codes and lengths[target] & bit:
+                    total += count(target, depth + 1)
+            memo[key] = total
+            return total
+
+        return count(0, 0) if self.lengths[0] >> length & 1 else 0
+
+    def letter_counts(self, pattern : str, guessed : str = '',
+                      hidden : str = '_') -> list:
+        # [for each letter A to Z, the number of words fitting the state
+        # that have it in a hidden position], counted like count_matching:
+        # per (node, depth), the counts of the rest of the word, and (last)
+        # the number of ways to finish it.
+        if len(pattern) > MAX_LENGTH:
+            return [0] * 26
+        allowed = self.allowed_codes(guessed)
+        steps = [allowed if char == hidden else (ord(char),)
+                 for char in pattern]
+        length = len(steps)
+        first, lengths = self.first, self.lengths
+        letters, targets = self.letters, self.targets
+        end = [0] * 26 + [1]
+        memo = {}
+
+        def count(node, depth):
+            if depth == length:
+                return end
+            key = node * 32 + depth
+            if key in memo:
+                return memo[key]
+            codes = steps[depth]
+            is_hidden = codes is allowed
+            bit = 1 << (length - depth - 1)
+            total = None
+            for edge in range(first[node], first[node + 1]):
+                target = targets[edge]
+                letter = letters[edge]
+                if letter in codes and lengths[target] & bit:
+                    rest = count(target, depth + 1)
+                    if is_hidden:
+                        # every way through this edge has the letter
+                        rest = list(rest)
+                        rest[letter - ord('A')] = rest[26]
+                    total = rest if total is None else \
+                            list(map(operator.add, total, rest))
+            memo[key] = total = [0] * 27 if total is None else total
+            return total
+
+        if not self.lengths[0] >> length & 1:
+            return [0] * 26
+        return count(0, 0)[:26]
+
+    @staticmethod
+    def allowed_codes(guessed : str) -> frozenset:
+        return frozenset(code for code in range(ord('A'), ord('Z') + 1)
+                         if chr(code) not in guessed)
+
+    def matching_nodes(self, node : int, steps, prefix : str, length):
+        # Yield the words below `node` (with `prefix` before them); with
+        # `steps` (per position, the allowed ASCII codes) and `length`,
+        # only those that fit them.
+        first, lengths, final = self.first, self.lengths, self.final
+        letters, targets = self.letters, self.targets
+        if length is not None and not lengths[node] >> length & 1:
+            return
+        stack = [(node, prefix)]
+        while stack:
+            node, prefix = stack.pop()
+            depth = len(prefix)
+            if length is None:
+                if final[node]:
+                    yield prefix
+            elif depth == length:
+                yield prefix
+                continue
+            if length is None:
+                codes, bit = None, -1
+            else:
+                codes, bit = steps[depth], 1 << (length - depth - 1)
+            # (pushed in reverse, so they come out alphabetically)
+            for edge in range(first[node + 1] - 1, first[node] - 1, -1):
+                letter = letters[edge]
+                target = targets[edge]
+                if codes is None or (letter in codes and
+                                     lengths[target] & bit):
+                    stack.append((target, prefix + chr(letter)))
+
+    # Files
+    # -------------------------------------------------------------------------
+
+    def save(self, path : str, signature = (0, 0)):
+        # Write the store to `path` (under a temporary name, then moved
+        # into place).  `signature` is the (size, mtime_ns) of the source.
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, signature[0],
+                                    signature[1], self.node_count,
+                                    self.edge_count, len(self)))
+                for a in self.arrays():
+                    if sys.byteorder == 'big':
+                        a = array(a.typecode, a)
+                        a.byteswap()
+                    a.tofile(f)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @classmethod
+    def load(cls, path : str):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f'{path} is not a word DAWG.')
+        magic, version, _, _, nodes, edges, _ = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a word DAWG.')
+        arrays = []
+        offset = HEADER.size
+        for typecode, size in (('I', nodes + 1), ('I', nodes), ('I', nodes),
+                               ('B', nodes), ('B', edges), ('I', edges)):
+            a = array(typecode)
+            end = offset + size * a.itemsize
+            a.frombytes(data[offset:end])
+            if len(a) != size:
+                raise ValueError(f'{path} is truncated or corrupted.')
+            if sys.byteorder == 'big':
+                a.byteswap()
+            arrays.append(a)
+            offset = end
+        if offset != len(data):
+            raise ValueError(f'{path} is truncated or corrupted.')
+        return cls(*arrays)
+
+
+# Building
+# -----------------------------------------------------------------------------
+
+def build_dawg(words) -> WordDawg:
+    # Build the minimal DAWG of `words` (an iterable of upper-case str),
+    # by incremental minimization over the sorted, unique words: once a
+    # word is added, the nodes past its common prefix with the next word
+    # are final, and each is replaced by an equivalent node already in
+    # the register (same finality, same edges), or registered itself.
+    final = [False]      # per (build) node
+    edges = [{}]         # per (build) node, letter -> node
+    register = {}        # (final, edges) -> node, children first
+    unchecked = []       # [(parent, letter, child)] along the last word
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, letter, child = unchecked.pop()
+            key = (final[child], tuple(sorted(edges[child].items())))
+            node = register.get(key)
+            if node is None:
+                register[key] = child
+            else:
+                edges[parent][letter] = node
+                edges[child] = None  # (dropped)
+
+    previous = ''
+    for word in sorted(set(words)):
+        if len(word) > MAX_LENGTH:
+            raise ValueError(f'Words of more than {MAX_LENGTH} letters ' + \
+                             f'can\'t be stored: {word!r}')
+        if not word.isascii():
+            raise ValueError(f'Not an ASCII word: {word!r}')
+        common = 0
+        for a, b in zip(word, previous):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else 0
+        for letter in word[common:]:
+            final.append(False)
+            edges.append({})
+            edges[node][letter] = len(final) - 1
+            unchecked.append((node, letter, len(final) - 1))
+            node = len(final) - 1
+        final[node] = True
+        previous = word
+    minimize(0)
+    return compile_dawg([0] + list(reversed(register.values())),
+                        final, edges)
+
+def compile_dawg(order : list, final : list, edges : list) -> WordDawg:
+    # Lay out the (build) nodes `order` (the root first, every node
+    # before its children) in flat arrays.
+    number = {node: i for i, node in enumerate(order)}
+    first = array('I', [0])
+    flags = array('B')
+    letters = array('B')
+    targets = array('I')
+    for node in order:
+        for letter, child in sorted(edges[node].items()):
+            letters.append(ord(letter))
+            targets.append(number[child])
+        first.append(len(targets))
+        flags.append(final[node])
+    counts = array('I', bytes(4 * len(order)))
+    lengths = array('I', bytes(4 * len(order)))
+    for i in range(len(order) - 1, -1, -1):  # children first
+        count, mask = flags[i], flags[i]
+        for edge in range(first[i], first[i + 1]):
+            count += counts[targets[edge]]
+            mask |= lengths[targets[edge]] << 1
+        counts[i] = count
+        lengths[i] = mask
+    return WordDawg(first, counts, lengths, flags, letters, targets)
+
+
+def dawg_is_current(path : str, source : str) -> bool:
+    # True if `path` is a DAWG of the current version of `source`.
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) != HEADER.size:
+        return False
+    magic, version, size, mtime_ns, _, _, _ = HEADER.unpack(header)
+    return magic == MAGIC and version == VERSION and \
+           (size, mtime_ns) == source_signature(source)
+
+def build_word_dawg(source : str = WORD_LIST_PATH, path : str = None) -> int:
+    # Compile the word list `source` into a DAWG at `path` (by default
+    # next to the source); returns the number of words.
+    if path is None:
+        path = dawg_path_for(source)
+    signature = source_signature(source)
+    dawg = build_dawg(word.upper() for word in read_words(source))
+    dawg.save(path, signature)
+    return len(dawg)
+
+def open_word_dawg(source : str = WORD_LIST_PATH, path : str = None):
+    # Load the DAWG of the word list `source`, (re)building it first if
+    # it is missing or out of date.
+    if path is None:
+        path = dawg_path_for(source)
+    if not dawg_is_current(path, source):
+        build_word_dawg(source, path)
+    return WordDawg.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile a word list ' + \
+                                     'into a compact word DAWG.')
+    parser.add_argument('source', nargs='?', default=WORD_LIST_PATH,
+                        help='the word list, one word per line')
+    parser.add_argument('--output', default=None,
+                        help='the DAWG file (default: next to the source)')
+    args = parser.parse_args()
+    path = args.output or dawg_path_for(args.source)
+    build_word_dawg(args.source, path)
+    dawg = WordDawg.load(path)
+    print(f'Wrote {len(dawg)} words to {path}: {dawg.node_count} nodes, ' + \
+          f'{dawg.edge_count} edges, {dawg.nbytes / 2**20:.1f} MB.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# filename: difficulty.py
+
+"""
+difficulty.py
+~~~~~~~~~~~~~
+Difficulty-aware secret-word selection for Hangman.
+
+A `DifficultyIndex` is built once per word list.  It buckets the words
+by length and stores, for every word, a 26-bit mask of its letters (bit
+0 for A ... bit 25 for Z) and its cached difficulty scores:
+
+- distinct: the number of distinct letters (the correct guesses needed)
+- rarity: the mean surprisal, -log2(fraction of the words that contain
+  the letter), of the word's distinct letters
+- strikes: the wrong guesses a player guessing letters in frequency
+  order (the letters ranked by how many words *of the same length*
+  contain them) would make before revealing the word, the estimate of
+  the expected number of strikes.  This player knows nothing of the
+  revealed positions, so the estimate is pessimistic: it ranks words
+  well, but often goes past `Hangman.max_strikes`.
+
+`Criteria` describe a difficulty (length range, distinct-letter range,
+minimum rarity, strikes range).  The word ids matching a criteria are
+filtered from the length buckets in range the first time it is asked
+for and then cached, so every later draw is a single random index.
+
+    index = DifficultyIndex.for_words(Hangman.get_word_index())
+    word = index.select('hard')
+"""
+
+import functools
+import itertools
+import math
+import random
+from array import array
+from typing import NamedTuple
+
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LETTER_BITS = {letter: 1 << i for i, letter in enumerate(LETTERS)}
+
+
+def letter_mask(word : str) -> int:
+    # (the bits of distinct letters add up to their OR)
+    return sum(map(LETTER_BITS.get, set(word), itertools.repeat(0)))
+
+def _half_mask_bits(shift : int):
+    return [tuple(i + shift for i in range(13) if half >> i & 1)
+            for half in range(1 << 13)]
+
+_LOW_BITS = _half_mask_bits(0)
+_HIGH_BITS = _half_mask_bits(13)
+
+def mask_bits(mask : int) -> tuple:
+    # the letter numbers (0 for A) of the set bits of `mask`, looked up
+    # 13 bits at a time
+    return _LOW_BITS[mask & 0x1fff] + _HIGH_BITS[mask >> 13]
+
+def mask_letters(mask : int) -> str:
+    return ''.join(letter for i, letter in enumerate(LETTERS)
+                   if mask >> i & 1)
+
+
+class Criteria(NamedTuple):
+    # Immutable, since it is the key of `DifficultyIndex.matching_ids`'s
+    # cache: changing a field would change its hash under the cache.
+    # `max_length` None means no limit.
+    min_length : int = 1
+    max_length : int = None
+    min_distinct : int = 1
+    max_distinct : int = 26
+    min_rarity : float = 0.0
+    min_strikes : int = 0
+    max_strikes : int = 26
+
+
+DIFFICULTIES = {
+    'easy': Criteria(min_length=6, max_length=12, max_strikes=6),
+    'medium': Criteria(min_length=5, max_length=10, min_strikes=7,
+                       max_strikes=12),
+    'hard': Criteria(min_length=4, max_length=8, min_strikes=15),
+}
+
+
+def get_criteria(difficulty) -> Criteria:
+    # `difficulty`: a Criteria, or the name of one of DIFFICULTIES
+    if isinstance(difficulty, Criteria):
+        return difficulty
+    try:
+        return DIFFICULTIES[str(difficulty).lower()]
+    except KeyError:
+        raise ValueError(f'Unknown difficulty: {difficulty!r} ' + \
+                         f'(choose from {", ".join(DIFFICULTIES)}).')
+
+
+class LengthBucket:
+    # The words of one length: parallel arrays, by position in the bucket.
+
+    def __init__(self, ids, masks):
+        self.ids = array('I', ids)      # word ids (positions in the list)
+        self.masks = array('I', masks)  # 26-bit letter masks
+        self.distinct = array('B')      # distinct letters
+        self.strikes = array('B')       # strikes of the frequency player
+        self.rarity = array('f')        # mean letter surprisal (bits)
+        # words of this length containing each letter, and the frequency-
+        # order player's guesses (most common letter first)
+        self.letter_counts = [0] * 26
+        self.guess_order = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def count_letters(self):
+        # Count the words containing each letter, and rank the letters.
+        self.mask_counts = DifficultyIndex.count_masks(self.masks)
+        self.letter_counts = [0] * 26
+        for mask, count in self.mask_counts.items():
+            for i in mask_bits(mask):
+                self.letter_counts[i] += count
+        self.guess_order = sorted(range(26),
+                                  key=lambda i: -self.letter_counts[i])
+
+    def score(self, surprisal : list):
+        # Fill in the cached scores (`surprisal` of each letter, over the
+        # whole word list).
+        rank = [0] * 26
+        for position, i in enumerate(self.guess_order):
+            rank[i] = position
+        scores = {}  # mask -> (distinct, strikes, rarity)
+        for mask in self.mask_counts:
+            bits = mask_bits(mask)
+            distinct = len(bits)
+            # guesses up to (and including) the word's last letter in
+            # guess order, less the correct ones
+            strikes = max((rank[i] for i in bits), default=-1) + 1 - distinct
+            rarity = sum(surprisal[i] for i in bits) / max(distinct, 1)
+            scores[mask] = (distinct, strikes, rarity)
+        distinct, strikes, rarity = zip(*map(scores.__getitem__, self.masks))
+        self.distinct = array('B', distinct)
+        self.strikes = array('B', strikes)
+        self.rarity = array('f', rarity)
+        del self.mask_counts
+
+
+class DifficultyIndex:
+
+    def __init__(self, words, cache_size : int = 128):
+        # `words`: a list of (upper-case) words, or a word_index.WordIndex
+        self.words = words
+        by_length = {}  # length -> ([word ids], [masks])
+        for word_id, word in enumerate(words):
+            entry = by_length.get(len(word))
+            if entry is None:
+                entry = by_length[len(word)] = ([], [])
+            entry[0].append(word_id)
+            entry[1].append(letter_mask(word))
+        self.buckets = {length: LengthBucket(ids, masks)
+                        for length, (ids, masks) in sorted(by_length.items())}
+        self.letter_counts = [0] * 26  # words containing each letter
+        for bucket in self.buckets.values():
+            bucket.count_letters()
+            for i in range(26):
+                self.letter_counts[i] += bucket.letter_counts[i]
+        total = max(len(words), 1)
+        surprisal = [-math.log2(count / total) if count else 0.0
+                     for count in self.letter_counts]
+        for bucket in self.buckets.values():
+            bucket.score(surprisal)
+        self.matching_ids = functools.lru_cache(maxsize=cache_size)(
+                                self.filter_ids)
+
+    @staticmethod
+    def count_masks(masks) -> dict:
+        counts = {}
+        for mask in masks:
+            counts[mask] = counts.get(mask, 0) + 1
+        return counts
+
+    # [(words, DifficultyIndex)] for the last few word lists, the most
+    # recently used last.  Lists can't be weakly referenced, so the cache
+    # is bounded instead, and matched by identity (not by `id`, which a
+    # new list can reuse once the old one is gone).
+    _instances = []
+    max_instances = 4
+
+    @classmethod
+    def for_words(cls, words):
+        # The (cached) index of `words`, built on first use.
+        instances = cls._instances
+        for i, (cached_words, index) in enumerate(instances):
+            if cached_words is words:
+                instances.append(instances.pop(i))
+                return index
+        index = cls(words)
+        instances.append((words, index))
+        del instances[:-cls.max_instances]
+        return index
+
+    def __len__(self):
+        return len(self.words)
+
+    def filter_ids(self, criteria : Criteria) -> array:
+        # The ids of the words matching `criteria` (a linear pass over the
+        # buckets in the length range; see `matching_ids` for the cached
+        # version).
+        ids = array('I')
+        max_length = criteria.max_length
+        for length in sorted(self.buckets):
+            if length < criteria.min_length or \
+               (max_length is not None and length > max_length):
+                continue
+            bucket = self.buckets[length]
+            for position in range(len(bucket)):
+                if criteria.min_distinct <= bucket.distinct[position] <= \
+                   criteria.max_distinct and \
+                   criteria.min_strikes <= bucket.strikes[position] <= \
+                   criteria.max_strikes and \
+                   bucket.rarity[position] >= criteria.min_rarity:
+                    ids.append(bucket.ids[position])
+        return ids
+
+    def count(self, difficulty) -> int:
+        return len(self.matching_ids(get_criteria(difficulty)))
+
+    def select(self, difficulty, rng = random) -> str:
+        # A random word matching `difficulty` (a Criteria, or a name in
+        # DIFFICULTIES).
+        ids = self.matching_ids(get_criteria(difficulty))
+        if len(ids) == 0:
+            raise ValueError(f'No word matches the difficulty {difficulty!r}.')
+        return self.words[ids[rng.randrange(len(ids))]]
+
+    def warm_up(self, difficulties = tuple(DIFFICULTIES)):
+        # Filter the named difficulties ahead of the first game.
+        for difficulty in difficulties:
+            self.matching_ids(get_criteria(difficulty))
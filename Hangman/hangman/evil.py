@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# filename: evil.py
+
+"""
+evil.py
+~~~~~~~
+Adversarial ("evil") Hangman: the game never commits to a secret word.
+It keeps every word of the secret word's length that fits what has been
+revealed so far, and at each guess it splits those words by the
+positions the guessed letter would reveal (none, for a strike), and
+keeps the biggest group.  A word is only fixed when the game is over:
+the last word left, or a random one of the words left if the player
+lost.
+
+The words left are the words that fit the game's state, so they are
+taken from the guesser's candidate cache (see guesser.py and
+candidate_cache.py), and each guess's choice is put back into it for the
+next game that gets there.  The split is one whole-array pass over the
+words' letter matrix, so even the first guesses, over every word of a
+length, take milliseconds.
+
+`self.word` always holds one of the words left (of the group chosen for
+the last guess, once `print_letter_result` or `update_state_letter` has
+been called for it), so that `revealed_positions`, `strikes`, the game
+screen and `show_game_conclusion` work as in a plain game.
+
+    game = EvilHangman(HangmanGuesser(Hangman.get_word_index()))
+    game.session()
+
+To play, execute the following in a shell terminal (in the directory
+above this package):
+python3 -m hangman.evil
+
+This module needs NumPy (`pip install numpy`), as guesser.py does.
+"""
+
+import random
+
+import numpy as np
+
+from .candidate_cache import CandidateSet, state_key
+from .guesser import HangmanGuesser
+from .hangman import Hangman
+
+
+class EvilHangman(Hangman):
+
+    def __init__(self, guesser : HangmanGuesser, difficulty = None,
+                 seed : int = None):
+        # `guesser` has the dictionary (and the candidate cache); only
+        # the length of the secret words drawn by `game_loop` is used.
+        super().__init__('', difficulty)
+        self.guesser = guesser
+        self.rng = random.Random(seed)
+        self.positions = np.zeros(0, dtype=np.int32)  # the words left
+        self.choice = None  # (letter, positions) chosen for a guess
+
+    @property
+    def group(self):
+        return self.guesser.groups.get(len(self.word))
+
+    def words_left(self) -> list:
+        group = self.group
+        return [] if group is None else [group.words[i]
+                                         for i in self.positions]
+
+    def pattern(self) -> str:
+        return self.state.pattern()
+
+    def update_state_word(self, word : str):
+        # Only the length of `word` counts: every word of that length is
+        # still possible.  (`word` itself stands in until the first guess,
+        # and for good if the dictionary has no word of its length.)
+        super().update_state_word(word)
+        self.choice = None
+        if self.group is None:
+            self.positions = np.zeros(0, dtype=np.int32)
+        else:
+            self.positions = self.guesser.candidate_set(
+                                 self.pattern(), '', scores=False).positions
+
+    def partition(self, letter : str):
+        # Split the words left by the positions `letter` would reveal.
+        # Returns (keys, sizes): each word's positions as bits, and the
+        # number of words for each key.
+        code = ord(letter) - ord('A')
+        codes = self.group.codes[self.positions]
+        keys = np.zeros(len(self.positions), dtype=np.int64)
+        for i in range(codes.shape[1]):
+            keys |= (codes[:, i] == code).astype(np.int64) << i
+        return keys, np.bincount(keys, minlength=1)
+
+    @staticmethod
+    def biggest_class(sizes) -> int:
+        # The key of the biggest group (ties go to the group revealing the
+        # fewest letters, a strike first, then the lowest key).
+        keys = np.flatnonzero(sizes == sizes.max())
+        revealed = [bin(key).count('1') for key in keys]
+        return int(keys[int(np.argmin(revealed))])
+
+    def choose(self, letter : str):
+        # Decide the answer to `letter` (once per guess), and make
+        # `self.word` one of the words that fit it.
+        if self.choice is not None and self.choice[0] == letter:
+            return
+        if self.group is None or len(self.positions) == 0:
+            self.choice = (letter, self.positions)  # a plain game
+            return
+        keys, sizes = self.partition(letter)
+        positions = self.positions[keys == self.biggest_class(sizes)]
+        self.choice = (letter, positions)
+        self.word = self.group.words[positions[0]]
+
+    def print_letter_result(self, letter : str):
+        self.choose(letter)
+        super().print_letter_result(letter)
+
+    def update_state_letter(self, letter : str):
+        self.choose(letter)
+        super().update_state_letter(letter)
+        _, self.positions = self.choice
+        self.choice = None
+        if self.group is not None:
+            # the next game to reach this state won't have to filter
+            key = state_key(self.pattern(), self.state.guesses)
+            if key not in self.guesser.cache:
+                self.guesser.cache.put(key, CandidateSet(self.positions))
+
+    def show_game_conclusion(self):
+        # Forced to pick a word at last: the one left if the player won,
+        # or any of the words left if not.
+        if not self.state.is_won and len(self.positions) > 1:
+            self.word = self.group.words[self.rng.choice(self.positions)]
+        super().show_game_conclusion()
+
+
+def main():
+    game = EvilHangman(HangmanGuesser(Hangman.get_word_index()))
+    game.session()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# filename: guesser.py
+
+"""
+guesser.py
+~~~~~~~~~~
+A computer guesser for Hangman: given the revealed pattern of the secret
+word (e.g. 'H_LL_') and the guessed letters, it picks the letter with
+the greatest expected information, i.e. the letter whose answer (the
+positions it would reveal, or a strike) splits the words that are
+still possible into the most even groups.
+
+The dictionary is held in NumPy arrays, one group per word length: a
+fixed-width uint8 matrix of the words' letters (0 for A ... 25 for Z),
+and a uint32 array of the words' 26-bit letter masks.  The possible
+words are filtered with whole-array operations (the masks first, to
+drop the words with a wrong letter, then the revealed positions), and
+the expected information of all 26 letters is worked out at once from
+one count of (letter, revealed positions) pairs.  The candidates and
+scores of every state are kept in a CandidateCache (see
+candidate_cache.py), since states repeat from game to game.
+
+    guesser = HangmanGuesser(Hangman.get_word_index())
+    letter = guesser.best_letter('H_LL_', 'EL')
+    guesser.play(Hangman('HELLO'))  # guesses until the game is over
+
+To see how the guesser does on random words, execute the following in a
+shell terminal (in the directory above this package):
+python3 -m hangman.guesser --games 1000
+
+This module needs NumPy (`pip install numpy`); the rest of the package
+does not.
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+import numpy as np
+
+from .candidate_cache import CandidateCache, CandidateSet, state_key
+
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# letter order for words of lengths the dictionary doesn't have
+FALLBACK_ORDER = 'ESIARNTOLCUDPMGHBYFVKWZXQJ'
+
+
+def letters_mask(letters) -> int:
+    mask = 0
+    for letter in letters:
+        mask |= 1 << (ord(letter) - ord('A'))
+    return mask
+
+
+class CodeWords:
+    # The words of a length group, decoded from its letter codes on
+    # demand, so that the group doesn't hold a `str` per word.
+
+    def __init__(self, codes):
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i : int) -> str:
+        return (self.codes[i] + ord('A')).tobytes().decode('ascii')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class LengthGroup:
+    # The words of one length, as arrays.
+
+    def __init__(self, words : list):
+        length = len(words[0])
+        # (column-major, so that each position's letters are contiguous)
+        self.codes = np.asfortranarray(
+                         np.frombuffer(''.join(words).encode('ascii'),
+                                       dtype=np.uint8).reshape(-1, length) -
+                         ord('A'))
+        self.words = CodeWords(self.codes)
+        self.masks = np.bitwise_or.reduce(
+                         np.left_shift(np.uint32(1),
+                                       self.codes.astype(np.uint32)),
+                         axis=1)
+        self.first_gains = None  # (gains, counts) with nothing guessed
+
+    def __len__(self):
+        return len(self.words)
+
+
+class HangmanGuesser:
+
+    def __init__(self, words, cache : CandidateCache = None):
+        # `words`: a list of (upper-case, A-Z) words, a
+        # word_index.WordIndex or a dawg.WordDawg.  `cache` keeps the
+        # candidate sets of the states seen (a CandidateCache of the
+        # default size if None).
+        self.cache = CandidateCache() if cache is None else cache
+        by_length = {}
+        for word in words:
+            if word.isalpha() and word.isascii():
+                by_length.setdefault(len(word), []).append(word.upper())
+        self.groups = {length: LengthGroup(group)
+                       for length, group in sorted(by_length.items())}
+
+    # Filtering
+    # -------------------------------------------------------------------------
+
+    def candidate_positions(self, pattern : str, guessed_letters = ''):
+        # Positions (in the length group of `pattern`) of the words that
+        # match `pattern` ('_' for a hidden letter) and `guessed_letters`:
+        # a guessed letter is at every revealed position it is in the
+        # word, so it can't be at any hidden position; and no other letter
+        # can be at a revealed position.
+        group = self.groups.get(len(pattern))
+        if group is None:
+            return np.zeros(0, dtype=np.intp)
+        guessed = letters_mask(guessed_letters)
+        revealed = letters_mask(set(pattern) - {'_'})
+        wrong = guessed & ~revealed
+        selected = (group.masks & np.uint32(wrong)) == 0
+        hidden = []
+        for i, char in enumerate(pattern):
+            if char == '_':
+                hidden.append(i)
+            else:
+                selected &= group.codes[:, i] == ord(char) - ord('A')
+        keep = np.flatnonzero(selected)
+        if hidden and revealed:
+            # the revealed letters are not at the hidden positions
+            shifted = np.right_shift(np.uint32(revealed),
+                                     group.codes[np.ix_(keep, hidden)]
+                                     .astype(np.uint32))
+            keep = keep[~(shifted & np.uint32(1)).any(axis=1)]
+        return keep
+
+    def candidate_set(self, pattern : str, guessed_letters = '',
+                      scores : bool = True):
+        # The CandidateSet of a state, from the cache if it was seen
+        # before; with `scores`, its letter scores are worked out too.
+        key = state_key(pattern, guessed_letters)
+        entry = self.cache.get(key)
+        if entry is None:
+            group = self.groups.get(len(pattern))
+            if group is None:
+                positions = np.zeros(0, dtype=np.int32)
+            else:
+                positions = self.candidate_positions(
+                                pattern, guessed_letters).astype(np.int32)
+            entry = CandidateSet(positions)
+        elif not scores or entry.gains is not None:
+            return entry
+        if scores:
+            entry.gains, entry.counts = self.candidate_scores(
+                                            len(pattern), entry.positions)
+        return self.cache.put(key, entry)
+
+    def candidate_scores(self, length : int, positions):
+        # (gains, counts) of the words at `positions` of a length group
+        group = self.groups.get(length)
+        if group is None:
+            return self.letter_gains(np.zeros((0, 1), dtype=np.uint8))
+        return self.letter_gains(group.codes[positions])
+
+    def candidates(self, pattern : str, guessed_letters = '') -> list:
+        group = self.groups.get(len(pattern))
+        if group is None:
+            return []
+        return [group.words[i]
+                for i in self.candidate_set(pattern, guessed_letters,
+                                            scores=False).positions]
+
+    # Scoring
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def letter_gains(codes):
+        # For the candidate words `codes` (an (n, length) array), return
+        # (gains, counts): each letter's expected information (bits) and
+        # the number of words it is in.  A letter's answer is the set of
+        # positions it reveals (none for a strike), so its expected
+        # information is the entropy of the words' grouping by it.
+        n, length = codes.shape
+        if n == 0:
+            return np.zeros(26), np.zeros(26, dtype=np.int64)
+        # revealed[w, letter] = the positions of `letter` in word w, as bits
+        revealed = np.zeros((n, 26), dtype=np.int64)
+        rows = np.arange(n)
+        for i in range(length):
+            revealed[rows, codes[:, i]] |= 1 << i
+        counts = np.count_nonzero(revealed, axis=0)
+        keys = (revealed + (np.arange(26, dtype=np.int64) << length)).ravel()
+        if (26 << length) <= 4 * keys.size:
+            # few possible keys: count them all
+            sizes = np.bincount(keys, minlength=26 << length)
+            letters = np.repeat(np.arange(26), 1 << length)
+            present = sizes > 0
+            letters, sizes = letters[present], sizes[present]
+        else:
+            unique, sizes = np.unique(keys, return_counts=True)
+            letters = unique >> length
+        weighted = np.bincount(letters, weights=sizes * np.log2(sizes),
+                               minlength=26)
+        return np.log2(n) - weighted / n, counts
+
+    def letter_scores(self, pattern : str, guessed_letters = ''):
+        # (gains, counts) for the position, as in `letter_gains`
+        group = self.groups.get(len(pattern))
+        if group is None:
+            return np.zeros(26), np.zeros(26, dtype=np.int64)
+        if not guessed_letters and set(pattern) <= {'_'}:
+            # the opening guess of each length is the same every game
+            if group.first_gains is None:
+                group.first_gains = self.letter_gains(group.codes)
+            return group.first_gains
+        entry = self.candidate_set(pattern, guessed_letters)
+        return entry.gains, entry.counts
+
+    def best_letter(self, pattern : str, guessed_letters = '') -> str:
+        # The unguessed letter with the most expected information (ties go
+        # to the letter in the most words, then alphabetical order).
+        pattern = pattern.upper()
+        guessed = {letter.upper() for letter in guessed_letters}
+        gains, counts = self.letter_scores(pattern, guessed)
+        best = None
+        for i in np.lexsort((np.arange(26), -counts, -np.round(gains, 9))):
+            letter = LETTERS[i]
+            if letter not in guessed:
+                best = letter
+                break
+        if best is None or counts[ord(best) - ord('A')] == 0:
+            # no word fits: fall back to a fixed order
+            for letter in FALLBACK_ORDER:
+                if letter not in guessed:
+                    return letter
+        return best
+
+    # Playing
+    # -------------------------------------------------------------------------
+
+    def hint(self, game) -> str:
+        # `game`: a Hangman, or a state.HangmanState
+        state = getattr(game, 'state', game)
+        return self.best_letter(state.pattern(), state.guesses)
+
+    def play(self, game, quiet : bool = True) -> bool:
+        # Guess letters for `game` (a Hangman with its secret word set)
+        # through `query_new_letter` and `update_state_letter` until it is
+        # over; returns True for a win.  `quiet` hides the prompts.
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else \
+             contextlib.nullcontext():
+            while not game.state.is_over:
+                letter = game.query_new_letter(self.hint(game))
+                game.update_state_letter(letter)
+        return sum(game.revealed_positions) == len(game.word)
+
+
+def main():
+    from .hangman import Hangman
+    from renderer.renderer import NullRenderer
+
+    parser = argparse.ArgumentParser(description='Let the guesser play ' + \
+                                     'Hangman on random words.')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    words = Hangman.get_word_index()
+    guesser = HangmanGuesser(words)
+    rng = random.Random(args.seed)
+    wins = guesses = 0
+    start = time.perf_counter()
+    for _ in range(args.games):
+        game = Hangman(words[rng.randrange(len(words))])
+        game.renderer = NullRenderer()
+        wins += guesser.play(game)
+        guesses += len(game.guessed_letters)
+    elapsed = time.perf_counter() - start
+    print(f'Won {wins} of {args.games} games ' + \
+          f'({1000 * elapsed / max(guesses, 1):.3f} ms per guess).')
+    print(f'Candidate cache: {guesser.cache.stats.report()}')
+
+
+if __name__ == '__main__':
+    main()
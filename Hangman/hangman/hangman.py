@@ -7,24 +7,71 @@ hangman.py
 A program to play the game of Hangman, using random words from
 norvig.com/ngrams/sowpods.txt.
 
+It draws with the shared `renderer` package, so install that first
+(once, from the top of the repository):
+pip install -e Renderer
+
 To start, execute the following in a shell terminal:
 python3 hangman.py
 """
 
-import os
+import argparse
 import random
 import time
 
+from renderer import renderer
+
+try:
+    from . import dawg, word_index
+    from .difficulty import DIFFICULTIES, DifficultyIndex
+    from .state import HangmanState
+except ImportError:  # run as a script, from this directory
+    import dawg, word_index
+    from difficulty import DIFFICULTIES, DifficultyIndex
+    from state import HangmanState
+
 
 class Hangman:
 
-    def __init__(self, forced_word : str = ''):
+    def __init__(self, forced_word : str = '', difficulty = None):
+        # The game's state (the secret word, guesses, revealed positions
+        # and strikes) is a state.HangmanState; this class adds the
+        # terminal I/O.  (If max_strikes is changed, must change pictures
+        # too.)
+        self.state = HangmanState(Hangman.clean_input_word(forced_word),
+                                  max_strikes=6)
+        # secret words are drawn at this difficulty (a difficulty.Criteria
+        # or the name of one, e.g. 'hard'); None for any word
+        self.difficulty = difficulty
+        # draws the screen; a renderer.NullRenderer for headless runs
+        self.renderer = renderer.DiffRenderer()
+
+    # The state, as attributes
+    @property
+    def word(self) -> str:
         # `word` = the secret word
-        self.word = Hangman.clean_input_word(forced_word)
-        self.guessed_letters = list()
-        self.revealed_positions = [0] * len(self.word)
-        self.strikes = 0      # a strike for each incorrect guess
-        self.max_strikes = 6  # if changed, must change pictures too
+        return self.state.word
+
+    @word.setter
+    def word(self, word : str):
+        # (keeps the guesses: see `update_state_word` for a new game)
+        self.state.set_word(word)
+
+    @property
+    def guessed_letters(self) -> list:
+        return list(self.state.guesses)
+
+    @property
+    def revealed_positions(self) -> list:
+        return self.state.revealed_list()
+
+    @property
+    def strikes(self) -> int:
+        return self.state.strikes  # a strike for each incorrect guess
+
+    @property
+    def max_strikes(self) -> int:
+        return self.state.max_strikes
 
     def show_state(self):
         print(f'(secret) word:      {self.word}')
@@ -35,23 +82,22 @@ class Hangman:
 
     def session(self):
         Hangman.announce_game()
-        word_list = Hangman.get_word_list()
-        self.game_loop(word_list)
+        words = Hangman.get_word_index()
+        self.game_loop(words)
         Hangman.announce_exit()
 
-    def game_loop(self, words : list):
+    def game_loop(self, words):
+        # `words`: a list of words, or a word_index.WordIndex
         play_again = Hangman.query_new_game()
         while play_again:
-            word = Hangman.select_secret_word(words)
-            self.word = Hangman.clean_input_word(word)
-            self.update_state_word(self.word)
+            word = Hangman.select_secret_word(words, self.difficulty)
+            self.update_state_word(Hangman.clean_input_word(word))
             self.guess_letters_loop()
             self.show_game_conclusion()
             play_again = Hangman.query_new_game()
 
     def guess_letters_loop(self):
-        while self.strikes < self.max_strikes and \
-              sum(self.revealed_positions) < len(self.word):
+        while not self.state.is_over:
             self.redraw_game_screen()
             letter = self.query_new_letter()  # user guesses a letter (or quits)
             self.show_letter_result(letter)
@@ -60,90 +106,82 @@ class Hangman:
 
     def update_state_word(self, word : str):
         # update after choosing to play a new game, with a new (secret) word
-        self.word = word
-        self.guessed_letters = list()
-        self.revealed_positions = [0] * len(self.word)
-        self.strikes = 0
+        self.state.reset(word)
+        self.renderer.invalidate()
 
     def redraw_game_screen(self):
-        # Clear screen
-        os.system('cls' if os.name == 'nt' else 'clear')
-        # Draw
+        self.renderer.draw(self.draw_game_screen)
+
+    def draw_game_screen(self):
         print('\n   HANGMAN')
         print(Hangman.hangman_pictures[self.strikes])
         self.show_revealed_letters_graphic()
         print(f'\n  Strikes: {self.strikes}/{self.max_strikes}')
         print(f'  Guesses: ', end='')
-        if len(self.guessed_letters) == 0:
+        if self.state.guesses == '':
             print('(none so far)', end='')
-        for i, item in enumerate(self.guessed_letters):
-            if i == (len(self.guessed_letters) - 1):
-                print(item, end='')
-            else:
-                print(item + ', ', end='')
-        print('')
+        print(', '.join(self.state.guesses))
         #self.show_state()  # for testing
 
     def show_revealed_letters_graphic(self):
         print('  Secret Word:  ', end='')
-        for i, char in enumerate(self.word):
-            if self.revealed_positions[i] == 1:
-                print(char + ' ', end='')
-            else:
-                print('_ ', end='')
-        print('')
+        print(''.join(char + ' ' for char in self.state.pattern()))
 
     def query_new_letter(self, forced_letter : str = ''):
         # Query user to enter a new guessed-letter (or user quits)
         valid = False  # assume invalid input (`letter`)
-        # To be valid, `letter` must be
-        # 1) a single character
-        # 2) alpha (alphabetic, not a number or other symbol)
-        # 3) new (not an already-guessed letter).
-        # An input of `quit` is an exception to these rules,
-        # allowing the user to quit and exit the game early.
+        # An input of `quit` is an exception to the rules in
+        # `validate_letter`, allowing the user to quit and exit the game early.
         while valid == False:
             print('\nEnter a letter or "quit" to exit.')
             if forced_letter != '':
                 letter = forced_letter
             else:
-                letter = input('  What\'s your guess? ')
+                letter = input(Hangman.letter_prompt)
             if letter == 'quit' or letter == 'QUIT':
                 Hangman.announce_exit()
                 quit()
-            if len(letter) == 1 and letter.isalpha() == True:
-                letter = str.upper(letter)
-                if letter not in self.guessed_letters:
-                    valid = True
-                else:
-                    print('You already guessed that letter. ' + \
-                          'Please enter a different letter...')
-            else:
-                print('Invalid input. ' + \
-                      'You must enter a single letter. Please try again...')
+            letter = self.validate_letter(letter)
+            valid = letter is not None
         return letter
 
+    letter_prompt = '  What\'s your guess? '
+
+    def validate_letter(self, letter : str):
+        # To be valid, `letter` must be
+        # 1) a single character
+        # 2) alpha (alphabetic, not a number or other symbol)
+        # 3) new (not an already-guessed letter).
+        # Returns the (capitalized) letter, or None if invalid.
+        if len(letter) == 1 and letter.isalpha() and letter.isascii():
+            letter = str.upper(letter)
+            if not self.state.has_guessed(letter):
+                return letter
+            print('You already guessed that letter. ' + \
+                  'Please enter a different letter...')
+        else:
+            print('Invalid input. ' + \
+                  'You must enter a single letter. Please try again...')
+        return None
+
     def show_letter_result(self, letter : str):
-        if letter in self.word:
+        self.print_letter_result(letter)
+        time.sleep(2) # Delay for 2 seconds
+
+    def print_letter_result(self, letter : str):
+        if self.state.in_word(letter):
             print(f'\n  Correct! --- {letter} is in the word!')
         else:
             print(f'\n  Incorrect! - {letter} is *not* in the word!')
-        time.sleep(2) # Delay for 2 seconds
 
     def update_state_letter(self, letter : str):
         # update after guessing another letter of the (secret) word
-        self.guessed_letters.append(letter)
-        if letter not in self.word:
-            self.strikes += 1
-        else:
-            # record new revealed positions
-            for i, char in enumerate(self.word):
-                if char == letter:
-                    self.revealed_positions[i] = 1  # newly revealed
+        # (raises ValueError for a letter already guessed)
+        self.state.guess(letter)
 
     def show_game_conclusion(self):
         print(f'\n  The secret word was {self.word}.')
-        if sum(self.revealed_positions) == len(self.word):
+        if self.state.is_won:
             print('\n\nYou won! The man is saved, for now. You could try his luck again...')
         else:
             print('\n\nYou lost! The man was hung. But you\'re in luck because we have another man to hang...')
@@ -171,17 +209,47 @@ class Hangman:
               'of the secret word, or else the man gets hung!')
 
     @staticmethod
-    def get_word_list():
+    def get_word_list(path : str = word_index.WORD_LIST_PATH):
         # Could add other functions later that download word list if necessary
         # and let the user know if there's an error in downloading the list.
-        with open('./words/sowpods.txt', 'r') as f:
+        with open(path, 'r') as f:
             word_list = f.read().splitlines()
         return word_list
 
+    @staticmethod
+    def get_word_index(path : str = word_index.WORD_LIST_PATH):
+        # The words of the list at `path`, through its memory-mapped index
+        # (compiled first if missing or out of date), so a session doesn't
+        # have to load the whole list.  Falls back to the plain list if
+        # the index can't be written (e.g. a read-only install).
+        try:
+            return word_index.open_word_index(path)
+        except OSError:
+            return Hangman.get_word_list(path)
+
+    @staticmethod
+    def get_word_dawg(path : str = word_index.WORD_LIST_PATH):
+        # The words of the list at `path` as a compact dawg.WordDawg (a
+        # couple of MB rather than a `str` per word), loaded from its
+        # compiled file (built first if missing or out of date), or built
+        # in memory if the file can't be written.
+        try:
+            return dawg.open_word_dawg(path)
+        except OSError:
+            return dawg.build_dawg(word.upper()
+                                   for word in Hangman.get_word_list(path)
+                                   if word.isalpha() and word.isascii())
+
     @staticmethod
     def query_new_game():
-        again = input('\nWould you like to play a new game?  ' + \
-                      '(Enter y for yes, or n for no.)  ')
+        again = input(Hangman.new_game_prompt)
+        return Hangman.parse_new_game_answer(again)
+
+    new_game_prompt = ('\nWould you like to play a new game?  ' + \
+                       '(Enter y for yes, or n for no.)  ')
+
+    @staticmethod
+    def parse_new_game_answer(again : str) -> bool:
         again = str.upper(again)
         if again in {'Y', 'YE', 'YES'}:
             return True
@@ -192,7 +260,15 @@ class Hangman:
             return False
 
     @staticmethod
-    def select_secret_word(word_list : list):
+    def select_secret_word(word_list, difficulty = None):
+        # `word_list`: a list of words, a word_index.WordIndex or a
+        # dawg.WordDawg (all support the `len` and indexing random.choice
+        # needs).
+        # With a `difficulty`, the word is drawn from the words matching
+        # it, through the word list's (cached) difficulty.DifficultyIndex.
+        if difficulty is not None:
+            index = DifficultyIndex.for_words(word_list)
+            return index.select(difficulty)
         word = random.choice(word_list)
         # Could verify word type here, if necessary.
         # Could clean/capitalize word here, if taking from an unclean list.
@@ -202,6 +278,10 @@ class Hangman:
     def announce_exit():
         print('\nExiting the game.\n')
 
+    @staticmethod
+    def clear_screen():
+        renderer.clear_screen()
+
     # Hangman pictures
     pic0 = ("   _______ \n"
             "   |    |  \n"
@@ -250,7 +330,12 @@ class Hangman:
 
 
 def main():
-    hm = Hangman()
+    parser = argparse.ArgumentParser(description='Play Hangman.')
+    parser.add_argument('--difficulty', default=None,
+                        choices=tuple(DIFFICULTIES),
+                        help='draw secret words of this difficulty')
+    args = parser.parse_args()
+    hm = Hangman(difficulty=args.difficulty)
     hm.session()
 
 
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# filename: ingest.py
+
+"""
+ingest.py
+~~~~~~~~~
+A streaming pipeline that merges any number of word lists (plaintext,
+or compressed with gzip, bzip2 or xz) into a single compiled word store
+(a word index, see word_index.py), with bounded memory.
+
+The pipeline is a chain of generators:
+
+1. read: the lines of each source, decompressed on the fly
+2. normalize: upper-cased and stripped, and only kept if made of the
+   letters A-Z (the rules of `Hangman.clean_input_word`, without its
+   fallback to a default word)
+3. filter: words shorter than `min_length` or longer than `max_length`
+   are dropped
+4. deduplicate: an external sort.  The words are cut into runs of at
+   most `run_size` words, each sorted (without duplicates) in memory and
+   spilled to a temporary file; the runs are then merged with
+   `heapq.merge`, dropping the duplicates across runs (at most `fan_in`
+   runs at a time, in several passes if need be).
+5. write: the sorted, unique words are streamed into the word index.
+
+Only one run is ever held in memory, so merging lists of many millions
+of words takes about `run_size` words' worth of memory.
+
+To merge word lists, execute the following in a shell terminal (in the
+directory above this package):
+python3 -m hangman.ingest words.idx list-1.txt list-2.txt.gz list-3.xz
+"""
+
+import argparse
+import bz2
+import gzip
+import heapq
+import itertools
+import lzma
+import os
+import tempfile
+
+from .word_index import write_word_index
+
+
+OPENERS = { '.gz' : gzip.open,
+            '.bz2' : bz2.open,
+            '.xz' : lzma.open,
+            '.lzma' : lzma.open }
+
+
+class IngestStats:
+
+    def __init__(self):
+        self.lines = 0       # lines read from the sources
+        self.invalid = 0     # not made of letters A-Z
+        self.too_short = 0
+        self.too_long = 0
+        self.duplicates = 0
+        self.words = 0       # written to the store
+        self.runs = 0        # sorted runs spilled to disk
+
+    def report(self) -> str:
+        return (f'{self.lines} lines read: {self.words} words written, '
+                f'{self.duplicates} duplicates, {self.invalid} invalid, '
+                f'{self.too_short} too short, {self.too_long} too long '
+                f'({self.runs} sorted runs)')
+
+
+# Reading, normalizing and filtering
+# -----------------------------------------------------------------------------
+
+def open_source(path : str):
+    # Open a word list for reading text, decompressing it by its extension.
+    opener = OPENERS.get(os.path.splitext(path)[1].lower(), open)
+    return opener(path, 'rt', encoding='utf-8', errors='replace')
+
+def read_lines(paths, stats : IngestStats = None):
+    for path in paths:
+        with open_source(path) as f:
+            for line in f:
+                if stats is not None:
+                    stats.lines += 1
+                yield line
+
+def normalize_words(lines, stats : IngestStats = None):
+    # Upper-case the words; drop blank lines, and words that are not made
+    # of the letters A-Z.
+    for line in lines:
+        word = line.strip().upper()
+        if not word:
+            continue
+        if word.isalpha() and word.isascii():
+            yield word
+        elif stats is not None:
+            stats.invalid += 1
+
+def filter_lengths(words, min_length : int = 2, max_length : int = 15,
+                   stats : IngestStats = None):
+    for word in words:
+        if len(word) < min_length:
+            if stats is not None:
+                stats.too_short += 1
+        elif len(word) > max_length:
+            if stats is not None:
+                stats.too_long += 1
+        else:
+            yield word
+
+
+# Deduplicating (external sort)
+# -----------------------------------------------------------------------------
+
+def write_run(directory : str, words) -> str:
+    # Spill sorted `words` to a temporary run file; returns its path.
+    fd, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        for word in words:
+            f.write(word + '\n')
+    return path
+
+def read_run(path : str):
+    with open(path, 'r', encoding='ascii') as f:
+        for line in f:
+            yield line[:-1]
+
+def sorted_runs(words, directory : str, run_size : int = 1000000,
+                stats : IngestStats = None) -> list:
+    # Cut `words` into runs of at most `run_size` words, each sorted and
+    # without duplicates, spilled to files in `directory`.
+    runs = []
+    words = iter(words)
+    while True:
+        chunk = list(itertools.islice(words, run_size))
+        if not chunk:
+            return runs
+        unique = sorted(set(chunk))
+        if stats is not None:
+            stats.duplicates += len(chunk) - len(unique)
+            stats.runs += 1
+        runs.append(write_run(directory, unique))
+
+def merge_unique(iterables, stats : IngestStats = None):
+    # Merge sorted iterables, dropping the duplicates.
+    previous = None
+    for word in heapq.merge(*iterables):
+        if word == previous:
+            if stats is not None:
+                stats.duplicates += 1
+            continue
+        previous = word
+        yield word
+
+def merge_runs(runs : list, directory : str, fan_in : int = 64,
+               stats : IngestStats = None):
+    # Yield the sorted, unique words of the run files, merging at most
+    # `fan_in` files at a time (the earlier passes write merged runs).
+    runs = list(runs)
+    while len(runs) > fan_in:
+        merged = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            merged.append(write_run(directory, merge_unique(
+                              [read_run(path) for path in group], stats)))
+            for path in group:
+                os.remove(path)
+        runs = merged
+    yield from merge_unique([read_run(path) for path in runs], stats)
+
+
+# The pipeline
+# -----------------------------------------------------------------------------
+
+def ingest(sources, output : str, min_length : int = 2,
+           max_length : int = 15, run_size : int = 1000000,
+           fan_in : int = 64, temp_dir : str = None) -> IngestStats:
+    # Merge the word lists `sources` (paths) into the word index `output`.
+    stats = IngestStats()
+    words = filter_lengths(normalize_words(read_lines(sources, stats), stats),
+                           min_length, max_length, stats)
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        runs = sorted_runs(words, directory, run_size, stats)
+        stats.words = write_word_index(
+                          output, merge_runs(runs, directory, fan_in, stats))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge word lists into ' + \
+                                     'one compiled word store.')
+    parser.add_argument('output', help='the word index to write')
+    parser.add_argument('sources', nargs='+',
+                        help='word lists, one word per line ' + \
+                             '(.gz, .bz2 and .xz are decompressed)')
+    parser.add_argument('--min-length', type=int, default=2)
+    parser.add_argument('--max-length', type=int, default=15)
+    parser.add_argument('--run-size', type=int, default=1000000,
+                        help='words sorted in memory at a time')
+    parser.add_argument('--temp-dir', default=None,
+                        help='where to spill the sorted runs')
+    args = parser.parse_args()
+    stats = ingest(args.sources, args.output, args.min_length,
+                   args.max_length, args.run_size, temp_dir=args.temp_dir)
+    print(stats.report())
+
+
+if __name__ == '__main__':
+    main()
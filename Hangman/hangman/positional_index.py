@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# filename: positional_index.py
+
+"""
+positional_index.py
+~~~~~~~~~~~~~~~~~~~
+A positional inverted index of the word list, for the query behind
+hints, guessers and evil Hangman: "the words of length L with letter X
+at positions P, and none of the letters S anywhere".
+
+For each word length, the words are numbered 0, 1, 2, ... and, for each
+(position, letter), the words with that letter at that position are a
+bitset: a Python int whose bit i is set for word i.  A query is then a
+handful of bitwise ANDs over whole bitsets (CPython runs them 30 bits
+at a time in C), instead of a `str` comparison per word in a Python
+loop; its matches are counted with `int.bit_count`, or decoded lazily.
+
+Queries can be put in batches: the terms of each query are put in a
+canonical order and the partial results of the batch are shared, so the
+queries of one game state (or of states with the same revealed letters)
+don't redo the common ANDs.
+
+    index = PositionalIndex(Hangman.get_word_index())
+    query = Query.from_state('H_LL_', 'EHLZ')
+    index.count(query)               # 11
+    list(index.matches([query])[0])  # ['HALLO', 'HALLS', ...]
+    index.counts([Query(5, {0: 'Q'}), Query(5, {0: 'Q'}, excluded='U')])
+    index.letter_counts(query)       # words with each letter, A to Z
+"""
+
+from array import array
+
+
+A = ord('A')
+
+# per byte value, the positions of its set bits
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1)
+                  for byte in range(256))
+
+# term kinds, in the order a query applies them (the most selective first)
+AT, NOT_AT, NONE = 0, 1, 2
+
+
+def bit_positions(bits : int):
+    # Yield the positions of the set bits of `bits`, lowest first.
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for i, byte in enumerate(data):
+        if byte:
+            base = i * 8
+            for bit in BYTE_BITS[byte]:
+                yield base + bit
+
+
+class Query:
+    # The words of `length` with the letters `fixed` ({position: letter})
+    # at those positions, none of the letters `excluded` anywhere, and
+    # none of the letters `absent` ({position: letters}) at those
+    # positions.
+
+    def __init__(self, length : int, fixed = None, excluded : str = '',
+                 absent = None):
+        self.length = length
+        self.fixed = dict(fixed or {})
+        self.excluded = excluded
+        self.absent = dict(absent or {})
+        for position in list(self.fixed) + list(self.absent):
+            if not 0 <= position < length:
+                raise ValueError(f'Position {position} is not in a word ' + \
+                                 f'of {length} letters.')
+
+    @classmethod
+    def from_state(cls, pattern : str, guessed : str = '',
+                   hidden : str = '_'):
+        # The words that fit a Hangman state: the revealed `pattern`
+        # (e.g. 'H_LL_'), where a guessed letter is at every position it
+        # is in the word, so the wrong guesses are nowhere and the right
+        # ones are not at the hidden positions.
+        fixed = {i: char for i, char in enumerate(pattern) if char != hidden}
+        right = ''.join(sorted(set(fixed.values())))
+        wrong = ''.join(sorted(set(guessed) - set(right)))
+        absent = {i: right for i, char in enumerate(pattern)
+                  if char == hidden} if right else None
+        return cls(len(pattern), fixed, wrong, absent)
+
+    def terms(self) -> tuple:
+        # ((kind, position, letter code), ...) in the canonical order
+        terms = [(AT, position, ord(letter) - A)
+                 for position, letter in self.fixed.items()]
+        terms += [(NOT_AT, position, ord(letter) - A)
+                  for position, letters in self.absent.items()
+                  for letter in set(letters)]
+        terms += [(NONE, -1, ord(letter) - A) for letter in set(self.excluded)]
+        for _, _, code in terms:
+            if not 0 <= code < 26:
+                raise ValueError('Queries take the letters A to Z.')
+        return tuple(sorted(terms))
+
+    def __repr__(self):
+        return f'Query({self.length}, {self.fixed}, {self.excluded!r}, ' + \
+               f'{self.absent})'
+
+
+class LengthBits:
+    # The bitsets of the words of one length.
+
+    def __init__(self, length : int, words, at : list):
+        # `words`: a sequence of the (upper-case, A-Z) words of `length`;
+        # `at`: their bitsets per [position][letter code] (see
+        # `PositionalIndex.__init__`).
+        self.length = length
+        self.words = words
+        self.size = len(words)
+        self.all = (1 << self.size) - 1
+        self.at = at
+        self.contains = [0] * 26  # per letter, the words with it anywhere
+        for by_letter in at:
+            for code, bits in enumerate(by_letter):
+                self.contains[code] |= bits
+
+    def term_bits(self, result : int, term : tuple) -> int:
+        kind, position, code = term
+        if kind == AT:
+            return result & self.at[position][code]
+        elif kind == NOT_AT:
+            return result & ~self.at[position][code]
+        else:
+            return result & ~self.contains[code]
+
+    def words_of(self, bits : int):
+        words = self.words
+        return (words[i] for i in bit_positions(bits))
+
+
+class PositionalIndex:
+
+    def __init__(self, words = None):
+        # `words`: a sequence (a list, word_index.WordIndex or
+        # dawg.WordDawg) of the words to index; the words that aren't
+        # made of the letters A-Z are left out.
+        self.lengths = {}  # length -> LengthBits
+        if words is None:
+            return
+        # (two passes over `words`, so that a WordDawg is walked in order
+        # rather than indexed word by word; the bits are set in one
+        # bytearray per (length, position, letter), rather than growing
+        # ints bit by bit, which is quadratic)
+        ids = {}  # length -> the ids of its words in `words`
+        for i, word in enumerate(words):
+            if word.isalpha() and word.isascii():
+                ids.setdefault(len(word), array('I')).append(i)
+        maps = {length: [[bytearray((len(length_ids) + 7) // 8)
+                          for _ in range(26)] for _ in range(length)]
+                for length, length_ids in ids.items()}
+        numbers = dict.fromkeys(ids, 0)  # length -> words seen so far
+        for word in words:
+            if word.isalpha() and word.isascii():
+                length = len(word)
+                n = numbers[length]
+                numbers[length] = n + 1
+                byte, bit = n >> 3, 1 << (n & 7)
+                length_maps = maps[length]
+                for position, letter in enumerate(word.upper().encode()):
+                    length_maps[position][letter - A][byte] |= bit
+        for length in sorted(ids):
+            at = [[int.from_bytes(bitmap, 'little') for bitmap in by_letter]
+                  for by_letter in maps.pop(length)]
+            self.lengths[length] = LengthBits(length,
+                                              IdWords(words, ids[length]), at)
+
+    def __len__(self):
+        return sum(bits.size for bits in self.lengths.values())
+
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def bitset(self, query : Query, memo : dict = None) -> int:
+        # The bitset of the words matching `query`, in its length's
+        # numbering.  `memo` shares the partial results of a batch.
+        bits = self.lengths.get(query.length)
+        if bits is None:
+            return 0
+        terms = query.terms()
+        result = bits.all
+        if memo is None:
+            for term in terms:
+                result = bits.term_bits(result, term)
+            return result
+        for k in range(1, len(terms) + 1):
+            key = (query.length, terms[:k])
+            cached = memo.get(key)
+            if cached is None:
+                cached = memo[key] = bits.term_bits(result, terms[k - 1])
+            result = cached
+        return result
+
+    def bitsets(self, queries) -> list:
+        memo = {}
+        return [self.bitset(query, memo) for query in queries]
+
+    def count(self, query : Query) -> int:
+        return self.bitset(query).bit_count()
+
+    def counts(self, queries) -> list:
+        # The number of matching words, per query of the batch.
+        return [bits.bit_count() for bits in self.bitsets(queries)]
+
+    def matches(self, queries) -> list:
+        # Per query of the batch, a lazy iterator over the matching words
+        # (the bitsets are worked out now, the words as they are drawn).
+        return [self.words_of(query.length, bits)
+                for query, bits in zip(queries, self.bitsets(queries))]
+
+    def words_of(self, length : int, bits : int):
+        if length not in self.lengths:
+            return iter(())
+        return self.lengths[length].words_of(bits)
+
+    def letter_counts(self, query : Query, bits : int = None) -> list:
+        # [for each letter A to Z, the number of words matching `query`
+        # (or the words of the `bits` of its length) that have it]
+        length_bits = self.lengths.get(query.length)
+        if length_bits is None:
+            return [0] * 26
+        if bits is None:
+            bits = self.bitset(query)
+        return [(bits & contains).bit_count()
+                for contains in length_bits.contains]
+
+
+class IdWords:
+    # The words of a sequence with the given ids, as a sequence.
+
+    def __init__(self, words, ids):
+        self.words = words
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i : int) -> str:
+        return self.words[self.ids[i]].upper()
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
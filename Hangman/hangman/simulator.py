@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# filename: simulator.py
+
+"""
+simulator.py
+~~~~~~~~~~~~
+A headless harness that plays Hangman against every word of the word
+list (or a random sample of it) with a pluggable guessing policy (an
+object with a `choose_letter(game)` method that returns an unguessed
+letter), spread over a `concurrent.futures.ProcessPoolExecutor`.
+
+Games go through `update_state_word` and the game's headless state
+engine (see state.py) only, so nothing is drawn, printed or slept on.
+Each worker opens the word index (see word_index.py) and builds its
+policy once, and then plays chunks of word ids.  Per-word results
+stream back as each chunk finishes, and can be written to a compact
+binary results file:
+
+    magic b'HMSR', version
+    per word: word id, word length, letters guessed, strikes (bits 0-6)
+        and won (bit 7) (little-endian: 4, 1, 1 and 1 bytes)
+
+The run ends with aggregate stats per word length.
+
+To evaluate a policy, execute the following in a shell terminal (in the
+directory above this package):
+python3 -m hangman.simulator --policy frequency --output results.hmsr
+python3 -m hangman.simulator --policy information --sample 10000
+"""
+
+import argparse
+import concurrent.futures
+import random
+import struct
+import time
+
+from .hangman import Hangman
+from .positional_index import PositionalIndex, Query
+from .word_index import WORD_LIST_PATH, open_word_index
+from renderer.renderer import NullRenderer
+
+
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+MAGIC = b'HMSR'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sB')
+RESULT = struct.Struct('<IBBB')  # word id, length, guesses, strikes | won
+WON = 0x80
+
+
+# Policies
+# -----------------------------------------------------------------------------
+
+class RandomPolicy:
+    # Guess a uniformly random unguessed letter.
+
+    def __init__(self, words = None, seed : int = None):
+        self.rng = random.Random(seed)
+
+    def choose_letter(self, game) -> str:
+        return self.rng.choice([letter for letter in LETTERS
+                                if not game.state.has_guessed(letter)])
+
+
+class FrequencyPolicy:
+    # Guess letters in a fixed order: by how many words of the secret
+    # word's length contain them (worked out once per length).
+
+    def __init__(self, words = None, seed : int = None):
+        self.orders = {}  # length -> letters, most common first
+        if words is not None:
+            counts = {}
+            for word in words:
+                length_counts = counts.setdefault(len(word), [0] * 26)
+                for letter in set(word):
+                    if 'A' <= letter <= 'Z':
+                        length_counts[ord(letter) - ord('A')] += 1
+            for length, length_counts in counts.items():
+                self.orders[length] = ''.join(
+                    sorted(LETTERS,
+                           key=lambda l: -length_counts[ord(l) - ord('A')]))
+
+    default_order = 'ESIARNTOLCUDPMGHBYFVKWZXQJ'
+
+    def choose_letter(self, game) -> str:
+        for letter in self.orders.get(len(game.word), self.default_order):
+            if not game.state.has_guessed(letter):
+                return letter
+
+
+class InformationPolicy:
+    # The NumPy information-gain guesser (see guesser.py).
+
+    def __init__(self, words, seed : int = None):
+        from .guesser import HangmanGuesser
+        self.guesser = HangmanGuesser(words)
+
+    def choose_letter(self, game) -> str:
+        return self.guesser.hint(game)
+
+
+class CoveragePolicy:
+    # Guess the letter in the most words that still fit the game, counted
+    # with the bitsets of the positional index (see positional_index.py),
+    # so no NumPy is needed.
+
+    def __init__(self, words, seed : int = None):
+        if not isinstance(words, PositionalIndex):
+            words = PositionalIndex(words)
+        self.index = words
+
+    def choose_letter(self, game) -> str:
+        state = game.state
+        counts = self.index.letter_counts(
+                     Query.from_state(state.pattern(), state.guesses))
+        # (ties, and words the index doesn't have, go by the default order)
+        return max((letter for letter in FrequencyPolicy.default_order
+                    if not state.has_guessed(letter)),
+                   key=lambda letter: counts[ord(letter) - ord('A')])
+
+
+POLICIES = { 'random' : RandomPolicy,
+             'frequency' : FrequencyPolicy,
+             'coverage' : CoveragePolicy,
+             'information' : InformationPolicy }
+
+
+# Playing games
+# -----------------------------------------------------------------------------
+
+def play_word(game : Hangman, policy, word : str):
+    # Play one game for the secret `word` on `game`, with no output.
+    # Returns (letters guessed, strikes, won).
+    game.update_state_word(Hangman.clean_input_word(word))
+    state = game.state
+    while not state.is_over:
+        state.guess(policy.choose_letter(game))
+    return len(state.guesses), state.strikes, state.is_won
+
+
+class LengthStats:
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.strikes = 0
+        self.guesses = 0
+
+    def add(self, guesses : int, strikes : int, won : bool):
+        self.games += 1
+        self.wins += won
+        self.strikes += strikes
+        self.guesses += guesses
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+
+class SimulationSummary:
+
+    def __init__(self):
+        self.lengths = {}  # word length -> LengthStats
+        self.total = LengthStats()
+        self.elapsed = 0.0  # seconds
+
+    def add(self, length : int, guesses : int, strikes : int, won : bool):
+        if length not in self.lengths:
+            self.lengths[length] = LengthStats()
+        self.lengths[length].add(guesses, strikes, won)
+        self.total.add(guesses, strikes, won)
+
+    @property
+    def games(self) -> int:
+        return self.total.games
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    def report(self) -> str:
+        lines = [f'{"length":>6} {"games":>8} {"wins":>7} {"strikes":>8} ' + \
+                 f'{"guesses":>8}']
+        rows = sorted(self.lengths.items()) + [('all', self.total)]
+        for length, stats in rows:
+            games = max(stats.games, 1)
+            lines.append(f'{length:>6} {stats.games:>8} ' + \
+                         f'{stats.win_rate:>7.1%} ' + \
+                         f'{stats.strikes / games:>8.2f} ' + \
+                         f'{stats.guesses / games:>8.2f}')
+        lines.append(f'{self.games} games in {self.elapsed:.2f} s ' + \
+                     f'({self.games_per_sec:,.0f} games/sec)')
+        return '\n'.join(lines)
+
+
+# Each worker process opens the word index and builds its policy once, in
+# the pool initializer, and then plays chunks of word ids with them.
+_worker = {}
+
+def _init_worker(policy_name : str, word_list_path : str, seed : int):
+    words = open_word_index(word_list_path)
+    game = Hangman()
+    game.renderer = NullRenderer()
+    _worker['words'] = words
+    _worker['game'] = game
+    _worker['policy'] = POLICIES[policy_name](words, seed)
+
+def _play_chunk(word_ids):
+    words, game, policy = _worker['words'], _worker['game'], _worker['policy']
+    results = []
+    for word_id in word_ids:
+        word = words[word_id]
+        guesses, strikes, won = play_word(game, policy, word)
+        results.append((word_id, len(word), guesses, strikes, won))
+    return results
+
+
+def iter_results(word_ids, policy_name : str = 'frequency',
+                 word_list_path : str = WORD_LIST_PATH,
+                 processes : int = None, chunk_size : int = 2000,
+                 seed : int = 0):
+    # Yield (word id, length, guesses, strikes, won) for each of
+    # `word_ids`, in the order the chunks finish.  With `processes=1` all
+    # games are played in this process.
+    word_ids = list(word_ids)
+    chunks = [word_ids[i:i + chunk_size]
+              for i in range(0, len(word_ids), chunk_size)]
+    initargs = (policy_name, word_list_path, seed)
+    if processes == 1:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            yield from _play_chunk(chunk)
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+             processes, initializer=_init_worker, initargs=initargs) as pool:
+        futures = [pool.submit(_play_chunk, chunk) for chunk in chunks]
+        for future in concurrent.futures.as_completed(futures):
+            yield from future.result()
+
+
+def simulate(word_ids, policy_name : str = 'frequency',
+             word_list_path : str = WORD_LIST_PATH, processes : int = None,
+             chunk_size : int = 2000, seed : int = 0, output : str = None):
+    # Play a game for each of `word_ids` and return a SimulationSummary;
+    # with `output`, the results are also written to that results file.
+    summary = SimulationSummary()
+    start = time.perf_counter()
+    f = None if output is None else open(output, 'wb')
+    try:
+        if f is not None:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION))
+        for word_id, length, guesses, strikes, won in iter_results(
+                word_ids, policy_name, word_list_path, processes,
+                chunk_size, seed):
+            summary.add(length, guesses, strikes, won)
+            if f is not None:
+                f.write(RESULT.pack(word_id, length, guesses,
+                                    strikes | (WON if won else 0)))
+    finally:
+        if f is not None:
+            f.close()
+    summary.elapsed = time.perf_counter() - start
+    return summary
+
+def read_results(path : str):
+    # Yield (word id, length, guesses, strikes, won) from a results file.
+    with open(path, 'rb') as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a Hangman results file.')
+        while True:
+            data = f.read(RESULT.size * 4096)
+            if not data:
+                return
+            for word_id, length, guesses, flags in RESULT.iter_unpack(data):
+                yield word_id, length, guesses, flags & ~WON, \
+                      bool(flags & WON)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play Hangman against ' + \
+                                     'every word of the word list.')
+    parser.add_argument('--policy', choices=POLICIES, default='frequency')
+    parser.add_argument('--words', default=WORD_LIST_PATH,
+                        help='the word list')
+    parser.add_argument('--sample', type=int, default=None,
+                        help='play only this many random words')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', metavar='PATH',
+                        help='write the per-word results to this file')
+    args = parser.parse_args()
+    with open_word_index(args.words) as words:
+        count = len(words)
+    word_ids = range(count)
+    if args.sample is not None and args.sample < count:
+        word_ids = sorted(random.Random(args.seed).sample(word_ids,
+                                                          args.sample))
+    summary = simulate(word_ids, args.policy, args.words, args.processes,
+                       args.chunk_size, args.seed, args.output)
+    print(summary.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# filename: state.py
+
+"""
+state.py
+~~~~~~~~
+A headless, compact Hangman state engine: no prints, sleeps, input or
+exits, just the rules, so that simulations, servers and tests can drive
+it as fast as Python allows.  `Hangman` is a shell around it.
+
+The guessed letters are a 26-bit mask (bit 0 for A), the revealed
+positions are a bitmask of the word's positions, and a counter of the
+positions still hidden makes the win check O(1).  On a new word, the
+positions of each letter are worked out once, so a guess is a few
+integer operations.  `snapshot()` returns a small tuple that `restore()`
+puts back, for search and what-if analysis.
+
+    state = HangmanState('HELLO')
+    state.guess('L')  # 2 (positions revealed; 0 for a strike)
+    state.pattern()   # '__LL_'
+    saved = state.snapshot()
+    state.guess('Q')
+    state.restore(saved)
+"""
+
+
+A = ord('A')
+
+
+class HangmanState:
+
+    __slots__ = ('word', 'max_strikes', 'strikes', 'guessed', 'revealed',
+                 'hidden', 'guesses', 'letter_positions', 'letter_counts')
+
+    def __init__(self, word : str = '', max_strikes : int = 6):
+        self.max_strikes = max_strikes
+        self.reset(word)
+
+    def reset(self, word : str):
+        # Start a new game with the (upper-case) secret `word`.
+        self.strikes = 0
+        self.guessed = 0   # mask of the guessed letters
+        self.revealed = 0  # mask of the revealed positions
+        self.guesses = ''  # the guessed letters, in order
+        self.set_word(word)
+
+    def set_word(self, word : str):
+        # Change the secret word, keeping the guesses and the revealed
+        # positions (for evil Hangman, where `word` fits them).  Anything
+        # but the letters A-Z (e.g. the apostrophe of CAN'T) can't be
+        # guessed, so it is revealed from the start.
+        self.word = word
+        positions = [0] * 26  # per letter, the mask of its positions
+        others = 0            # the mask of the positions of the rest
+        for i, char in enumerate(word):
+            code = ord(char) - A
+            if 0 <= code < 26:
+                positions[code] |= 1 << i
+            else:
+                others |= 1 << i
+        self.letter_positions = positions
+        self.letter_counts = [mask.bit_count() for mask in positions]
+        self.revealed = (self.revealed | others) & ((1 << len(word)) - 1)
+        self.hidden = len(word) - self.revealed.bit_count()
+
+    def guess(self, letter : str) -> int:
+        # Guess the (upper-case) `letter`; returns the number of positions
+        # it reveals (0 for a strike).
+        code = ord(letter) - A if len(letter) == 1 else -1
+        if not 0 <= code < 26:
+            raise ValueError(f'Not a letter from A to Z: {letter!r}')
+        bit = 1 << code
+        if self.guessed & bit:
+            raise ValueError(f'{letter} was already guessed.')
+        self.guessed |= bit
+        self.guesses += letter
+        count = self.letter_counts[code]
+        if count:
+            self.revealed |= self.letter_positions[code]
+            self.hidden -= count
+        else:
+            self.strikes += 1
+        return count
+
+    def has_guessed(self, letter : str) -> bool:
+        return bool(self.guessed >> (ord(letter) - A) & 1)
+
+    def in_word(self, letter : str) -> bool:
+        code = ord(letter) - A
+        return 0 <= code < 26 and self.letter_counts[code] > 0
+
+    @property
+    def is_won(self) -> bool:
+        return self.hidden == 0
+
+    @property
+    def is_lost(self) -> bool:
+        return self.strikes >= self.max_strikes and self.hidden > 0
+
+    @property
+    def is_over(self) -> bool:
+        return self.hidden == 0 or self.strikes >= self.max_strikes
+
+    def is_revealed(self, position : int) -> bool:
+        return bool(self.revealed >> position & 1)
+
+    def revealed_list(self) -> list:
+        # [1 or 0 for each position], as in Hangman.revealed_positions
+        return [self.revealed >> i & 1 for i in range(len(self.word))]
+
+    def pattern(self, hidden : str = '_') -> str:
+        return ''.join(char if self.revealed >> i & 1 else hidden
+                       for i, char in enumerate(self.word))
+
+    def snapshot(self) -> tuple:
+        return (self.word, self.strikes, self.guessed, self.revealed,
+                self.hidden, self.guesses)
+
+    def restore(self, snapshot : tuple):
+        word, strikes, guessed, revealed, hidden, guesses = snapshot
+        if word != self.word:
+            self.set_word(word)
+        self.strikes, self.guessed, self.revealed, self.hidden, \
+            self.guesses = strikes, guessed, revealed, hidden, guesses
+
+    def copy(self):
+        state = HangmanState.__new__(HangmanState)
+        state.max_strikes = self.max_strikes
+        state.word = self.word
+        state.letter_positions = self.letter_positions  # never mutated
+        state.letter_counts = self.letter_counts
+        state.strikes, state.guessed, state.revealed, state.hidden, \
+            state.guesses = self.snapshot()[1:]
+        return state
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# filename: test_candidate_cache.py
+
+"""
+test_candidate_cache.py
+~~~~~~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file
+candidate_cache.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+from array import array
+
+from .candidate_cache import CandidateCache, CandidateSet, state_key
+
+
+def entry(*positions):
+    return CandidateSet(array('i', positions))
+
+
+def test_state_key_is_canonical():
+    # the order of the guesses and the correct ones don't matter
+    assert state_key('H_LL_', 'HLSX') == state_key('H_LL_', 'XSLH')
+    assert state_key('H_LL_', 'HLS') == ('H_LL_', 1 << (ord('S') - ord('A')))
+    assert state_key('_____') == ('_____', 0)
+
+def test_hits_and_misses():
+    cache = CandidateCache()
+    key = state_key('C_T', 'CTO')
+    assert cache.get(key) is None
+    stored = cache.put(key, entry(0, 2))
+    assert cache.get(key) is stored
+    assert len(cache.get(key)) == 2
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+    assert cache.stats.hit_rate == 2 / 3
+    assert 'hits' in cache.stats.report()
+
+def test_least_recently_used_is_evicted():
+    cache = CandidateCache(max_entries=2)
+    cache.put('a', entry(1))
+    cache.put('b', entry(2))
+    cache.get('a')  # 'b' is now the least recently used
+    cache.put('c', entry(3))
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.stats.evictions == 1
+
+def test_size_bound():
+    cache = CandidateCache(max_bytes=9 * 4)
+    cache.put('a', entry(*range(6)))
+    cache.put('b', entry(*range(4)))  # 40 bytes in all: 'a' has to go
+    assert list(cache.entries) == ['b']
+    assert cache.nbytes == 16
+    cache.put('huge', entry(*range(100)))  # too big to keep at all
+    assert 'huge' not in cache
+    cache.put('b', entry(1))  # replaced
+    assert cache.nbytes == 4
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
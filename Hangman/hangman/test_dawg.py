@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# filename: test_dawg.py
+
+"""
+test_dawg.py
+~~~~~~~~~~~~
+A script to test the functionality of the code in the file dawg.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import os
+import random
+import re
+
+import pytest
+
+from .dawg import (WordDawg, build_dawg, dawg_is_current, dawg_path_for,
+                   open_word_dawg)
+from .hangman import Hangman
+
+
+WORDS = ['BELLS', 'CAT', 'CATS', 'DOG', 'DOGS', 'HALLO', 'HELLO', 'HILLS',
+         'HULLO', 'JAZZ']
+
+
+def write_words(tmp_path, words):
+    source = tmp_path / 'words.txt'
+    source.write_text(''.join(word + '\n' for word in words))
+    return str(source)
+
+def fits(word, pattern, guessed):
+    hidden = f'[^{guessed}]' if guessed else '.'
+    return re.fullmatch(pattern.replace('_', hidden), word) is not None
+
+
+def test_sequence():
+    words = build_dawg(reversed(WORDS + ['CAT']))
+    assert len(words) == len(WORDS)
+    assert list(words) == WORDS
+    assert [words[i] for i in range(len(WORDS))] == WORDS
+    assert words[-1] == 'JAZZ'
+    assert [words.index(word) for word in WORDS] == list(range(len(WORDS)))
+    with pytest.raises(IndexError):
+        words[len(WORDS)]
+    with pytest.raises(ValueError):
+        words.index('CA')
+
+def test_membership():
+    words = build_dawg(WORDS)
+    assert all(word in words for word in WORDS)
+    for word in ('CA', 'CATSS', 'HELL', '', 'ÇAT', 3):
+        assert word not in words
+
+def test_shared_suffixes_are_stored_once():
+    words = build_dawg(WORDS)
+    trie_nodes = 1 + len({word[:i] for word in WORDS
+                          for i in range(1, len(word) + 1)})
+    assert words.node_count < trie_nodes
+    # HALLO, HELLO and HULLO go on from the same node after HA, HE, HU
+    h = words.child(0, ord('H'))
+    assert words.child(h, ord('A')) == words.child(h, ord('E')) == \
+           words.child(h, ord('U')) != words.child(h, ord('I'))
+
+def test_uniform_sampling():
+    words = build_dawg(WORDS)
+    rng = random.Random(0)
+    draws = [words.random_word(rng) for _ in range(5000)]
+    assert set(draws) == set(WORDS)
+    assert max(draws.count(word) for word in WORDS) < 650  # ~500 each
+    assert Hangman.select_secret_word(words) in WORDS
+
+@pytest.mark.parametrize('pattern, guessed', [
+    ('H_LL_', 'HL'), ('H_LL_', 'EHL'), ('H_LL_', 'HLOZ'), ('___', ''),
+    ('____', 'S'), ('___S', 'S'), ('_____', 'AEIOU'), ('______', ''),
+    ('', '')])
+def test_matching(pattern, guessed):
+    words = build_dawg(WORDS)
+    expected = [word for word in WORDS if len(word) == len(pattern) and
+                fits(word, pattern, guessed)]
+    assert list(words.matching(pattern, guessed)) == expected
+    assert words.count_matching(pattern, guessed) == len(expected)
+    hidden = [i for i, char in enumerate(pattern) if char == '_']
+    counts = [sum(letter in {word[i] for i in hidden} for word in expected)
+              for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ']
+    assert words.letter_counts(pattern, guessed) == counts
+
+def test_matching_is_lazy():
+    words = build_dawg(WORDS)
+    matches = words.matching('_____')
+    assert next(matches) == 'BELLS'
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'words.dawg')
+    build_dawg(WORDS).save(path)
+    words = WordDawg.load(path)
+    assert list(words) == WORDS
+    assert list(words.matching('H_LL_', 'HLS')) == \
+           ['HALLO', 'HELLO', 'HULLO']
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(ValueError):
+        WordDawg.load(path)
+
+def test_empty_store(tmp_path):
+    words = build_dawg([])
+    assert len(words) == 0
+    assert list(words) == [] and list(words.matching('___')) == []
+    path = str(tmp_path / 'empty.dawg')
+    words.save(path)
+    assert len(WordDawg.load(path)) == 0
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'bad.dawg'
+    path.write_bytes(b'not a DAWG at all, just some bytes, ' + \
+                     b'quite a few of them')
+    with pytest.raises(ValueError):
+        WordDawg.load(str(path))
+
+def test_rebuilt_when_source_changes(tmp_path):
+    source = write_words(tmp_path, ['CAT'])
+    path = dawg_path_for(source)
+    assert list(open_word_dawg(source)) == ['CAT']
+    assert dawg_is_current(path, source)
+    write_words(tmp_path, ['cat', 'dog'])
+    os.utime(source, ns=(0, 12345))  # in case the mtime didn't tick
+    assert not dawg_is_current(path, source)
+    assert list(Hangman.get_word_dawg(source)) == ['CAT', 'DOG']
+    assert dawg_is_current(path, source)
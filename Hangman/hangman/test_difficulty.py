@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# filename: test_difficulty.py
+
+"""
+test_difficulty.py
+~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file difficulty.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import random
+
+import pytest
+
+from .difficulty import (Criteria, DifficultyIndex, get_criteria, letter_mask,
+                         mask_bits, mask_letters)
+from .hangman import Hangman
+
+
+WORDS = ['SEE', 'SEES', 'SEAS', 'EASE', 'JAZZ', 'FIZZ', 'QUIZ', 'TEASE',
+         'SEATS', 'ZYXT']
+
+
+def test_letter_masks():
+    assert letter_mask('ABBA') == 0b11
+    assert letter_mask('Z') == 1 << 25
+    assert mask_letters(letter_mask('QUIZ')) == 'IQUZ'
+    assert mask_bits(letter_mask('JAZZ')) == (0, 9, 25)
+
+def test_buckets_and_scores():
+    index = DifficultyIndex(WORDS)
+    assert sorted(index.buckets) == [3, 4, 5]
+    bucket = index.buckets[4]
+    assert [WORDS[i] for i in bucket.ids] == ['SEES', 'SEAS', 'EASE', 'JAZZ',
+                                              'FIZZ', 'QUIZ', 'ZYXT']
+    position = [WORDS[i] for i in bucket.ids].index('SEES')
+    assert bucket.distinct[position] == 2
+    # 4-letter words are guessed Z, A, E, S, ... here (Z and A are wrong)
+    assert [chr(65 + i) for i in bucket.guess_order[:4]] == ['Z', 'A', 'E',
+                                                             'S']
+    assert bucket.strikes[position] == 2
+    assert bucket.rarity[position] < \
+           bucket.rarity[[WORDS[i] for i in bucket.ids].index('JAZZ')]
+
+def test_select_filters():
+    index = DifficultyIndex(WORDS)
+    rng = random.Random(0)
+    easy = Criteria(min_length=4, max_length=5, max_strikes=1)
+    assert set(index.select(easy, rng) for _ in range(50)) == \
+           {'SEAS', 'EASE', 'TEASE', 'SEATS'}
+    hard = Criteria(min_length=4, max_length=4, min_strikes=3)
+    assert set(index.select(hard, rng) for _ in range(50)) <= \
+           {'JAZZ', 'FIZZ', 'QUIZ', 'ZYXT'}
+    assert index.count(Criteria(min_distinct=4, max_length=4)) == 2
+    with pytest.raises(ValueError):
+        index.select(Criteria(min_length=20))
+
+def test_filtered_ids_are_cached():
+    index = DifficultyIndex(WORDS)
+    criteria = Criteria(max_length=4)
+    assert index.matching_ids(criteria) is \
+           index.matching_ids(Criteria(max_length=4))
+
+def test_criteria_are_immutable():
+    criteria = get_criteria('easy')
+    with pytest.raises(AttributeError):
+        criteria.max_strikes = 3
+    assert criteria._replace(max_strikes=3) != criteria
+    assert repr(Criteria(max_length=4)) == \
+           'Criteria(min_length=1, max_length=4, min_distinct=1, ' + \
+           'max_distinct=26, min_rarity=0.0, min_strikes=0, max_strikes=26)'
+
+def test_named_difficulties():
+    assert get_criteria('HARD') is get_criteria('hard')
+    with pytest.raises(ValueError):
+        get_criteria('impossible')
+
+def test_hangman_selects_by_difficulty():
+    criteria = Criteria(min_length=5)
+    assert Hangman.select_secret_word(WORDS, criteria) in {'TEASE', 'SEATS'}
+    assert DifficultyIndex.for_words(WORDS) is \
+           DifficultyIndex.for_words(WORDS)
+
+def test_index_cache_is_bounded():
+    lists = [list(WORDS) for _ in range(DifficultyIndex.max_instances + 2)]
+    indexes = [DifficultyIndex.for_words(words) for words in lists]
+    assert len(DifficultyIndex._instances) == DifficultyIndex.max_instances
+    assert DifficultyIndex.for_words(lists[-1]) is indexes[-1]
+    assert DifficultyIndex.for_words(lists[0]) is not indexes[0]
+    words = list(WORDS)  # equal to the cached lists, but a new one
+    assert DifficultyIndex.for_words(words).words is words
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# filename: test_evil.py
+
+"""
+test_evil.py
+~~~~~~~~~~~~
+A script to test the functionality of the code in the file evil.py.
+(Skipped if NumPy is not installed.)
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from .candidate_cache import state_key
+from .evil import EvilHangman
+from .guesser import HangmanGuesser
+from renderer.renderer import NullRenderer
+
+
+WORDS = ['BEAR', 'BOAR', 'DEER', 'DUCK', 'HARE', 'LAMB', 'MOLE', 'NEWT',
+         'MOUSE']
+
+
+def new_game(word = 'XXXX'):
+    game = EvilHangman(HangmanGuesser(WORDS), seed=1)
+    game.renderer = NullRenderer()
+    game.update_state_word(word)
+    return game
+
+
+def test_all_words_of_the_length_are_possible():
+    game = new_game()
+    assert game.words_left() == WORDS[:-1]
+
+def test_keeps_the_biggest_class():
+    game = new_game()
+    # E splits the words into BEAR, NEWT (_E__); DEER (_EE_); HARE, MOLE
+    # (___E); and BOAR, DUCK, LAMB (no E), the biggest class
+    game.update_state_letter('E')
+    assert game.strikes == 1
+    assert game.words_left() == ['BOAR', 'DUCK', 'LAMB']
+    # O: BOAR (_O__) or DUCK, LAMB (no O)
+    game.update_state_letter('O')
+    assert game.words_left() == ['DUCK', 'LAMB']
+    assert game.strikes == 2
+    # A: LAMB (_A__) or DUCK (no A), a tie: the strike wins it
+    game.update_state_letter('A')
+    assert game.words_left() == ['DUCK']
+    assert game.strikes == 3
+    # forced: the only word left
+    game.update_state_letter('D')
+    assert game.word == 'DUCK'
+    assert game.revealed_positions == [1, 0, 0, 0]
+
+def test_result_matches_update(capsys):
+    game = new_game()
+    game.print_letter_result('E')
+    assert 'Incorrect' in capsys.readouterr().out
+    game.update_state_letter('E')
+    game.print_letter_result('B')
+    game.update_state_letter('B')
+    out = capsys.readouterr().out
+    assert ('Correct' in out) == (game.strikes == 1)
+    assert 'E' not in game.word
+
+def test_revealed_positions_fit_the_words_left():
+    game = new_game()
+    for letter in 'EAOU':
+        game.update_state_letter(letter)
+        for word in game.words_left():
+            for i, shown in enumerate(game.revealed_positions):
+                assert (word[i] == game.word[i]) if shown else \
+                       (word[i] not in game.guessed_letters)
+
+def test_word_is_fixed_when_forced(capsys):
+    game = new_game()
+    for letter in 'ETRSIPGF':  # more strikes than allowed: a loss
+        game.update_state_letter(letter)
+    game.show_game_conclusion()
+    out = capsys.readouterr().out
+    assert game.word in game.words_left()
+    assert f'The secret word was {game.word}.' in out
+    assert 'You lost!' in out
+
+def test_choices_are_cached():
+    game = new_game()
+    game.update_state_letter('E')
+    key = state_key(game.pattern(), game.guessed_letters)
+    assert list(game.guesser.cache.get(key).positions) == \
+           list(game.positions)
+
+def test_first_guesses_are_fast_on_a_big_dictionary():
+    import random
+    import string
+    import time
+    rng = random.Random(0)
+    words = [''.join(rng.choice(string.ascii_uppercase) for _ in range(8))
+             for _ in range(100000)]
+    game = EvilHangman(HangmanGuesser(words))
+    game.renderer = NullRenderer()
+    game.update_state_word('X' * 8)
+    start = time.perf_counter()
+    for letter in 'ESIA':
+        game.update_state_letter(letter)
+    assert time.perf_counter() - start < 1.0
+    assert len(game.positions) > 0
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# filename: test_guesser.py
+
+"""
+test_guesser.py
+~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file guesser.py.
+(Skipped if NumPy is not installed.)
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from .guesser import HangmanGuesser
+from .hangman import Hangman
+from renderer.renderer import NullRenderer
+
+
+WORDS = ['HALLO', 'HALLS', 'HELLO', 'HELLS', 'HILLS', 'HOLLY', 'JELLY',
+         'BELLY', 'CAT', 'COT', 'CUT', 'DOG', 'AB1']
+
+
+def test_candidates():
+    guesser = HangmanGuesser(WORDS)
+    assert guesser.candidates('H_LL_', 'HL') == ['HALLO', 'HALLS', 'HELLO',
+                                                 'HELLS', 'HILLS', 'HOLLY']
+    # O is a strike: no word with an O
+    assert guesser.candidates('H_LL_', 'HLO') == ['HALLS', 'HELLS', 'HILLS']
+    # E is revealed at position 1 only
+    assert guesser.candidates('_E___', 'E') == ['HELLO', 'HELLS', 'JELLY',
+                                                'BELLY']
+    assert guesser.candidates('C_T', 'CTO') == ['CAT', 'CUT']
+    assert guesser.candidates('______') == []
+
+def test_letter_gains():
+    codes = np.array([[0, 1], [0, 2], [3, 1], [3, 2]], dtype=np.uint8)
+    gains, counts = HangmanGuesser.letter_gains(codes)
+    # A, B, C and D each split the four words in half: one bit each
+    assert gains[:4] == pytest.approx([1.0, 1.0, 1.0, 1.0])
+    assert list(counts[:4]) == [2, 2, 2, 2]
+    assert gains[4] == 0.0
+
+def test_best_letter():
+    guesser = HangmanGuesser(WORDS)
+    # O (HALLO, HELLO vs HOLLY vs the rest) beats S and E
+    assert guesser.best_letter('H_LL_', 'HL') == 'O'
+    # one word left: guess one of its letters
+    assert guesser.best_letter('C_T', 'CTOU') == 'A'
+    # nothing fits: fixed order
+    assert guesser.best_letter('______', 'E') == 'S'
+
+def test_opening_gains_are_cached():
+    guesser = HangmanGuesser(WORDS)
+    first = guesser.letter_scores('_____')
+    assert guesser.letter_scores('_____') is first
+    gains, _ = first
+    assert gains[ord('L') - ord('A')] == 0.0  # every 5-letter word has LL
+    assert math.isclose(gains.max(),
+                        HangmanGuesser.letter_gains(
+                            guesser.groups[5].codes)[0].max())
+
+def test_plays_a_game():
+    guesser = HangmanGuesser(WORDS)
+    hm = Hangman('HELLS')
+    hm.renderer = NullRenderer()
+    assert guesser.play(hm)
+    assert hm.strikes <= 2
+    assert guesser.hint(Hangman('JELLY')) == guesser.best_letter('_____')
+
+def test_states_are_cached():
+    guesser = HangmanGuesser(WORDS)
+    first = guesser.candidate_set('H_LL_', 'HLS')
+    assert guesser.candidate_set('H_LL_', 'SLH') is first
+    assert guesser.cache.stats.hits == 1
+    assert guesser.candidates('H_LL_', 'HLS') == ['HALLO', 'HELLO', 'HOLLY']
+    assert list(first.counts[:1]) == [1]  # A: HALLO
@@ -12,7 +12,10 @@ pytest
 *And be sure there is an __init__.py file in the same directory.
 """
 
+import io
+
 from .hangman import Hangman
+from renderer.renderer import DiffRenderer
 
 
 # Initialization
@@ -100,3 +103,20 @@ def test_same_letter_guess_no_strike():
     assert hm.strikes == 1
 """
 
+
+# screen
+# -----------------------------------------------------------------------------
+
+def test_redraw_updates_only_changed_lines():
+    hm = Hangman('ABBA')
+    stream = io.StringIO()
+    hm.renderer = DiffRenderer(stream, ansi=True)
+    hm.redraw_game_screen()
+    assert 'HANGMAN' in stream.getvalue()
+    stream.truncate(0)
+    stream.seek(0)
+    hm.update_state_letter('B')
+    hm.redraw_game_screen()
+    update = stream.getvalue()
+    assert 'HANGMAN' not in update and 'Strikes' not in update
+    assert 'B _ ' not in update and 'B' in update
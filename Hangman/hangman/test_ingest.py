@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# filename: test_ingest.py
+
+"""
+test_ingest.py
+~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file ingest.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import bz2
+import gzip
+import lzma
+
+from .ingest import (ingest, merge_unique, normalize_words, filter_lengths,
+                     IngestStats)
+from .word_index import WordIndex
+
+
+def write_list(path, words, opener=open):
+    with opener(path, 'wt', encoding='utf-8') as f:
+        f.write('\n'.join(words) + '\n')
+    return str(path)
+
+
+def test_normalize_and_filter():
+    stats = IngestStats()
+    lines = [' apple\n', 'Zoo\n', '\n', "can't\n", 'café\n', 'a\n',
+             'abcdefghijklmnop\n']
+    words = list(filter_lengths(normalize_words(lines, stats), 2, 15, stats))
+    assert words == ['APPLE', 'ZOO']
+    assert (stats.invalid, stats.too_short, stats.too_long) == (2, 1, 1)
+
+def test_merge_unique():
+    stats = IngestStats()
+    merged = list(merge_unique([['A', 'C', 'D'], ['B', 'C'], ['D']], stats))
+    assert merged == ['A', 'B', 'C', 'D']
+    assert stats.duplicates == 2
+
+def test_ingest_compressed_sources(tmp_path):
+    sources = [write_list(tmp_path / 'plain.txt', ['dog', 'Cat', 'cat']),
+               write_list(tmp_path / 'one.txt.gz', ['emu', 'dog'], gzip.open),
+               write_list(tmp_path / 'two.txt.bz2', ['ant', 'x'], bz2.open),
+               write_list(tmp_path / 'three.txt.xz', ['bee', 'e-mu'],
+                          lzma.open)]
+    output = str(tmp_path / 'words.idx')
+    stats = ingest(sources, output)
+    with WordIndex(output) as words:
+        assert list(words) == ['ANT', 'BEE', 'CAT', 'DOG', 'EMU']
+    assert (stats.lines, stats.words, stats.duplicates) == (9, 5, 2)
+    assert (stats.invalid, stats.too_short) == (1, 1)
+
+def test_ingest_in_many_runs(tmp_path):
+    # Tiny runs and fan-in force the merge to take several passes.
+    words = [f'{a}{b}{c}' for a in 'ABCD' for b in 'EFG' for c in 'HIJ']
+    first = write_list(tmp_path / 'first.txt', reversed(words))
+    second = write_list(tmp_path / 'second.txt', words[::2])
+    output = str(tmp_path / 'words.idx')
+    stats = ingest([first, second], output, run_size=5, fan_in=3)
+    with WordIndex(output) as index:
+        assert list(index) == sorted(words)
+    assert stats.runs == 11
+    assert stats.duplicates == len(words[::2])
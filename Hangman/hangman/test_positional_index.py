@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# filename: test_positional_index.py
+
+"""
+test_positional_index.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file
+positional_index.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import re
+
+import pytest
+
+from .dawg import build_dawg
+from .positional_index import (LengthBits, PositionalIndex, Query,
+                               bit_positions)
+
+
+WORDS = ['BELLS', 'CAT', 'CATS', 'DOG', 'DOGS', 'HALLO', 'HELLO', 'HILLS',
+         'HULLO', 'JAZZ', 'cot', 'e-mu']
+
+
+def fits(word, pattern, guessed):
+    hidden = f'[^{guessed}]' if guessed else '.'
+    return re.fullmatch(pattern.replace('_', hidden), word) is not None
+
+
+def test_bit_positions():
+    assert list(bit_positions(0)) == []
+    assert list(bit_positions(0b1011)) == [0, 1, 3]
+    assert list(bit_positions(1 << 100 | 1 << 7)) == [7, 100]
+
+def test_index_layout():
+    index = PositionalIndex(WORDS)
+    assert len(index) == 11  # not E-MU
+    assert sorted(index.lengths) == [3, 4, 5]
+    three = index.lengths[3]
+    assert list(three.words) == ['CAT', 'DOG', 'COT']
+    assert three.at[0][ord('C') - ord('A')] == 0b101
+    assert three.contains[ord('O') - ord('A')] == 0b110
+
+def test_query():
+    index = PositionalIndex(WORDS)
+    query = Query(5, {2: 'L', 3: 'L'}, excluded='E')
+    assert list(index.matches([query])[0]) == ['HALLO', 'HILLS', 'HULLO']
+    assert index.count(Query(5, absent={1: 'AEU'})) == 1  # HILLS
+    assert index.count(Query(6)) == 0
+    assert list(index.matches([Query(6)])[0]) == []
+    with pytest.raises(ValueError):
+        Query(3, {3: 'A'})
+    with pytest.raises(ValueError):
+        index.count(Query(3, {0: 'c'}))
+
+@pytest.mark.parametrize('pattern, guessed', [
+    ('H_LL_', 'HL'), ('H_LL_', 'EHL'), ('H_LL_', 'HLOZ'), ('___', ''),
+    ('____', 'S'), ('___S', 'S'), ('_____', 'AEIOU'), ('C_T', 'CT'),
+    ('C_T', 'ACT')])
+def test_states(pattern, guessed):
+    index = PositionalIndex(WORDS)
+    words = [word.upper() for word in WORDS if word.isalpha()]
+    expected = [word for word in words if len(word) == len(pattern) and
+                fits(word, pattern, guessed)]
+    query = Query.from_state(pattern, guessed)
+    assert sorted(index.matches([query])[0]) == sorted(expected)
+    assert index.count(query) == len(expected)
+    assert index.letter_counts(query) == \
+           [sum(letter in word for word in expected)
+            for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ']
+
+def test_batches_share_partial_results():
+    index = PositionalIndex(WORDS)
+    queries = [Query.from_state('_____', 'E'),
+               Query.from_state('_____', 'EA'),
+               Query(5, excluded='AE'),
+               Query(4, {3: 'S'}),
+               Query(4, {3: 'S'}, excluded='O')]
+    assert index.counts(queries) == [3, 2, 2, 2, 1]
+    memo = {}
+    index.bitset(queries[1], memo)
+    assert len(memo) == 2  # the A term, then the E term
+    index.bitset(queries[0], memo)
+    assert len(memo) == 3  # the E term alone
+    index.bitset(queries[2], memo)
+    assert len(memo) == 3  # the same terms as queries[1]
+
+def test_matches_are_lazy():
+    index = PositionalIndex(WORDS)
+    matches = index.matches([Query(5, {2: 'L'})])[0]
+    assert next(matches) == 'BELLS'
+    assert len(list(matches)) == 4
+
+def test_words_from_a_dawg():
+    index = PositionalIndex(build_dawg(word.upper() for word in WORDS
+                                       if word.isalpha()))
+    assert list(index.matches([Query.from_state('H_LL_', 'HLS')])[0]) == \
+           ['HALLO', 'HELLO', 'HULLO']
+
+def test_length_bits_of_one_length():
+    bits = PositionalIndex(['CAT', 'COT', 'COTS']).lengths[3]
+    assert isinstance(bits, LengthBits)
+    assert bits.all == 0b11
+    assert bits.at[1][ord('O') - ord('A')] == 0b10
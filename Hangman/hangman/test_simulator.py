@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# filename: test_simulator.py
+
+"""
+test_simulator.py
+~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file simulator.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import pytest
+
+from .hangman import Hangman
+from .simulator import (CoveragePolicy, FrequencyPolicy, RandomPolicy,
+                        play_word, read_results, simulate)
+from renderer.renderer import NullRenderer
+
+
+WORDS = ['CAT', 'DOG', 'EMU', 'HELLO', 'JAZZY', 'QUIZ', 'SEES']
+
+
+def write_words(tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_text(''.join(word + '\n' for word in WORDS))
+    return str(path)
+
+def test_play_word_is_silent(capsys):
+    game = Hangman()
+    game.renderer = NullRenderer()
+    policy = FrequencyPolicy(WORDS)
+    guesses, strikes, won = play_word(game, policy, 'sees')
+    assert capsys.readouterr().out == ''
+    assert game.word == 'SEES'
+    # every letter of QUIZ and SEES is in one 4-letter word, so the order
+    # is alphabetical: E, I (strike), Q (strike), S
+    assert (guesses, strikes, won) == (4, 2, True)
+    assert game.guessed_letters == ['E', 'I', 'Q', 'S']
+
+def test_random_policy_loses_or_wins_cleanly():
+    game = Hangman()
+    game.renderer = NullRenderer()
+    guesses, strikes, won = play_word(game, RandomPolicy(seed=1), 'QUIZ')
+    assert len(set(game.guessed_letters)) == guesses
+    assert won == (strikes < game.max_strikes)
+
+def test_coverage_policy():
+    game = Hangman()
+    game.renderer = NullRenderer()
+    policy = CoveragePolicy(WORDS)
+    # the 5-letter words are HELLO and JAZZY: E (first in the default
+    # order of the letters in one word each) leaves only HELLO, whose
+    # letters then follow in the default order
+    assert play_word(game, policy, 'HELLO') == (4, 0, True)
+    assert game.guessed_letters == ['E', 'O', 'L', 'H']
+    # no 6-letter words: the default order, which finds E, S, A and R
+    # but runs out of strikes before the B and Z
+    assert play_word(game, policy, 'ZEBRAS') == (10, 6, False)
+    assert game.guessed_letters == ['E', 'S', 'I', 'A', 'R', 'N', 'T', 'O',
+                                    'L', 'C']
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_simulate_writes_results(tmp_path, processes):
+    source = write_words(tmp_path)
+    output = str(tmp_path / 'results.hmsr')
+    summary = simulate(range(len(WORDS)), 'frequency', source, processes,
+                       chunk_size=3, output=output)
+    assert summary.games == len(WORDS)
+    assert sorted(summary.lengths) == [3, 4, 5]
+    assert summary.lengths[3].games == 3
+    results = sorted(read_results(output))
+    assert [result[0] for result in results] == list(range(len(WORDS)))
+    assert [result[1] for result in results] == [len(word) for word in WORDS]
+    for _, _, guesses, strikes, won in results:
+        assert guesses >= strikes
+        assert won == (strikes < 6)
+    assert 'all' in summary.report()
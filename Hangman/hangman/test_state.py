@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# filename: test_state.py
+
+"""
+test_state.py
+~~~~~~~~~~~~~
+A script to test the functionality of the code in the file state.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import pytest
+
+from .hangman import Hangman
+from .state import HangmanState
+
+
+def test_new_state():
+    state = HangmanState('HELLO')
+    assert state.pattern() == '_____'
+    assert state.revealed_list() == [0, 0, 0, 0, 0]
+    assert (state.strikes, state.guesses, state.hidden) == (0, '', 5)
+    assert not state.is_over
+
+def test_guesses():
+    state = HangmanState('HELLO')
+    assert state.guess('L') == 2
+    assert state.guess('Z') == 0
+    assert state.pattern() == '__LL_'
+    assert state.revealed_list() == [0, 0, 1, 1, 0]
+    assert (state.strikes, state.guesses, state.hidden) == (1, 'LZ', 3)
+    assert state.has_guessed('Z') and not state.has_guessed('H')
+    assert state.in_word('H') and not state.in_word('Z')
+    for letter in 'HEO':
+        state.guess(letter)
+    assert state.is_won and state.is_over and not state.is_lost
+
+def test_invalid_guesses():
+    state = HangmanState('HELLO')
+    state.guess('E')
+    with pytest.raises(ValueError):
+        state.guess('E')  # already guessed
+    for letter in ('e', '1', 'AB', ''):
+        with pytest.raises(ValueError):
+            state.guess(letter)
+    assert state.guesses == 'E'
+
+def test_other_characters_are_revealed_up_front():
+    state = HangmanState("CAN'T")
+    assert state.pattern() == "___'_"
+    assert state.hidden == 4
+    for letter in 'CANT':
+        state.guess(letter)
+    assert state.pattern() == "CAN'T"
+    assert state.is_won and state.is_over
+    state.reset('E-MU')
+    assert (state.pattern(), state.hidden) == ('_-__', 3)
+
+def test_strike_out():
+    state = HangmanState('Z', max_strikes=6)
+    for letter in 'ABCDEF':
+        state.guess(letter)
+    assert state.is_lost and state.is_over and not state.is_won
+
+def test_snapshot_and_restore():
+    state = HangmanState('HELLO')
+    state.guess('L')
+    saved = state.snapshot()
+    state.guess('Q')
+    state.guess('H')
+    state.restore(saved)
+    assert (state.pattern(), state.strikes, state.guesses) == \
+           ('__LL_', 0, 'L')
+    other = HangmanState('WORLD')
+    other.restore(saved)
+    assert other.word == 'HELLO' and other.pattern() == '__LL_'
+    copy = state.copy()
+    copy.guess('O')
+    assert state.pattern() == '__LL_' and copy.pattern() == '__LLO'
+
+def test_set_word_keeps_the_guesses():
+    state = HangmanState('BELLS')
+    state.guess('L')
+    state.guess('Q')
+    state.set_word('HELLO')  # fits the guesses so far
+    assert (state.pattern(), state.strikes, state.hidden) == ('__LL_', 1, 3)
+    assert state.guess('O') == 1
+
+def test_hangman_is_a_shell_over_the_state():
+    hm = Hangman('hello')
+    hm.update_state_letter('L')
+    hm.update_state_letter('X')
+    assert hm.state.guesses == 'LX'
+    assert hm.guessed_letters == ['L', 'X']
+    assert hm.revealed_positions == [0, 0, 1, 1, 0]
+    assert hm.strikes == 1
+    hm.update_state_word('WORLD')
+    assert (hm.word, hm.strikes, hm.guessed_letters) == ('WORLD', 0, [])
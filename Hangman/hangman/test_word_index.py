@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# filename: test_word_index.py
+
+"""
+test_word_index.py
+~~~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file word_index.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import os
+import random
+
+import pytest
+
+from .hangman import Hangman
+from .word_index import (WORD_LIST_PATH, WordIndex, build_word_index,
+                         index_is_current, index_path_for, open_word_index,
+                         write_word_index)
+
+
+def write_words(tmp_path, words):
+    source = tmp_path / 'words.txt'
+    source.write_text(''.join(word + '\n' for word in words))
+    return str(source)
+
+
+def test_round_trip(tmp_path):
+    words = ['AA', 'AAH', 'HELLO', 'ZYZZYVA']
+    source = write_words(tmp_path, words)
+    assert build_word_index(source) == 4
+    with WordIndex(index_path_for(source)) as index:
+        assert len(index) == 4
+        assert list(index) == words
+        assert index[2] == 'HELLO'
+        assert index[-1] == 'ZYZZYVA'
+        with pytest.raises(IndexError):
+            index[4]
+
+def test_random_word(tmp_path):
+    words = ['CAT', 'DOG', 'EMU']
+    source = write_words(tmp_path, words)
+    with open_word_index(source) as index:
+        assert index.random_word(random.Random(1)) in words
+        assert Hangman.select_secret_word(index) in words
+
+def test_rebuilt_when_source_changes(tmp_path):
+    source = write_words(tmp_path, ['CAT'])
+    path = index_path_for(source)
+    open_word_index(source).close()
+    assert index_is_current(path, source)
+    write_words(tmp_path, ['CAT', 'DOG'])
+    os.utime(source, ns=(0, 12345))  # in case the mtime didn't tick
+    assert not index_is_current(path, source)
+    with open_word_index(source) as index:
+        assert list(index) == ['CAT', 'DOG']
+    assert index_is_current(path, source)
+
+def test_empty_word_list(tmp_path):
+    path = str(tmp_path / 'empty.idx')
+    write_word_index(path, [])
+    with WordIndex(path) as index:
+        assert len(index) == 0
+        assert list(index) == []
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'bad.idx'
+    path.write_bytes(b'not an index at all, just some bytes')
+    with pytest.raises(ValueError):
+        WordIndex(str(path))
+
+def test_default_list_resolves_from_package():
+    assert os.path.isabs(WORD_LIST_PATH)
+    assert os.path.exists(WORD_LIST_PATH)
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# filename: word_index.py
+
+"""
+word_index.py
+~~~~~~~~~~~~~
+A precompiled, memory-mapped index of a word list, so that a game can
+pick a random secret word without reading (and splitting) the whole
+list into a Python list first.
+
+The index is compiled from the plaintext word list (one word per line)
+into a binary file next to it: a header, a table of word offsets, and
+the words themselves packed end to end.  The header records the size
+and modification time of the source file, so an index is rebuilt
+automatically when the word list changes.  Opening an index maps the
+file with `mmap`; the word at any position is found from two offsets,
+so `len`, indexing and `random.choice` all cost O(1), and only the
+pages actually touched are ever read.
+
+File layout (little-endian):
+
+    magic b'HMWI', version, source size, source mtime (ns), count
+    (count + 1) x uint32 offsets (relative to the start of the words)
+    the words (ASCII), packed end to end
+
+To (re)build the index of the default word list, execute the following
+in a shell terminal (in the directory above this package):
+python3 -m hangman.word_index
+"""
+
+import argparse
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+from array import array
+
+
+WORDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'words')
+WORD_LIST_PATH = os.path.join(WORDS_DIR, 'sowpods.txt')
+
+MAGIC = b'HMWI'
+VERSION = 1
+HEADER = struct.Struct('<4sB3xQqQ')
+OFFSET = struct.Struct('<I')
+OFFSET_PAIR = struct.Struct('<II')
+
+
+def index_path_for(source : str) -> str:
+    # The index of `words/sowpods.txt` is `words/sowpods.idx`.
+    return os.path.splitext(source)[0] + '.idx'
+
+def source_signature(source : str):
+    # (size, mtime in ns) of the word list, as recorded in the header
+    stat = os.stat(source)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Building
+# -----------------------------------------------------------------------------
+
+def read_words(source : str):
+    # Yield the (non-empty) words of a plaintext word list.
+    with open(source, 'r') as f:
+        for line in f:
+            word = line.strip()
+            if word:
+                yield word
+
+def write_word_index(path : str, words, signature = (0, 0)) -> int:
+    # Write the index of `words` (an iterable of str) to `path`, and
+    # return the number of words.  `signature` is the (size, mtime_ns) of
+    # the source to record in the header.  The words are streamed: the
+    # offsets go into the file as they are worked out and the packed words
+    # into a spill file appended at the end, so memory use stays bounded
+    # however many words there are.  The file is written under a temporary
+    # name and then moved into place, so concurrent readers never see a
+    # half-written index.
+    temporary = f'{path}.{os.getpid()}.tmp'
+    spill = f'{path}.{os.getpid()}.words.tmp'
+    try:
+        with open(temporary, 'wb') as f, open(spill, 'w+b') as words_file:
+            f.write(bytes(HEADER.size))  # (filled in at the end)
+            offsets = array('I', [0])
+            offset = count = 0
+            for word in words:
+                data = word.encode('ascii')
+                words_file.write(data)
+                offset += len(data)
+                if offset >= 1 << 32:
+                    raise ValueError('Too many letters for a word index.')
+                offsets.append(offset)
+                count += 1
+                if len(offsets) >= 65536:
+                    write_offsets(f, offsets)
+                    offsets = array('I')
+            write_offsets(f, offsets)
+            words_file.seek(0)
+            shutil.copyfileobj(words_file, f)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, signature[0], signature[1],
+                                count))
+        os.replace(temporary, path)
+    finally:
+        for leftover in (temporary, spill):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return count
+
+def write_offsets(f, offsets : array):
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    f.write(offsets.tobytes())
+
+def build_word_index(source : str = WORD_LIST_PATH, path : str = None) -> int:
+    # Compile the word list `source` into an index at `path` (by default
+    # next to the source); returns the number of words.
+    if path is None:
+        path = index_path_for(source)
+    signature = source_signature(source)
+    return write_word_index(path, read_words(source), signature)
+
+def index_is_current(path : str, source : str) -> bool:
+    # True if `path` is an index of the current version of `source`.
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return False
+    if len(header) != HEADER.size:
+        return False
+    magic, version, size, mtime_ns, _ = HEADER.unpack(header)
+    return magic == MAGIC and version == VERSION and \
+           (size, mtime_ns) == source_signature(source)
+
+
+# Lookups
+# -----------------------------------------------------------------------------
+
+class WordIndex:
+    # A read-only sequence of the words of an index file.
+
+    def __init__(self, path : str):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file can't be mapped
+            self.file.close()
+            raise ValueError(f'{path} is not a word index.')
+        if len(self.mm) < HEADER.size:
+            self.close()
+            raise ValueError(f'{path} is not a word index.')
+        magic, version, self.source_size, self.source_mtime_ns, \
+            self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a word index.')
+        self.words_start = HEADER.size + (self.count + 1) * OFFSET.size
+        if len(self.mm) < self.words_start or \
+           len(self.mm) != self.words_start + self.offset(self.count):
+            self.close()
+            raise ValueError(f'{path} is truncated or corrupted.')
+
+    def offset(self, i : int) -> int:
+        return OFFSET.unpack_from(self.mm, HEADER.size + i * OFFSET.size)[0]
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i : int) -> str:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError('word index out of range')
+        start, end = OFFSET_PAIR.unpack_from(self.mm,
+                                             HEADER.size + i * OFFSET.size)
+        return self.mm[self.words_start + start:
+                       self.words_start + end].decode('ascii')
+
+    def __iter__(self):
+        return (self[i] for i in range(self.count))
+
+    def random_word(self, rng = random) -> str:
+        return self[rng.randrange(self.count)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+        self.file.close()
+
+
+def open_word_index(source : str = WORD_LIST_PATH, path : str = None):
+    # Open the index of the word list `source`, (re)building it first if
+    # it is missing or out of date.
+    if path is None:
+        path = index_path_for(source)
+    if not index_is_current(path, source):
+        build_word_index(source, path)
+    return WordIndex(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile a word list ' + \
+                                     'into a memory-mapped word index.')
+    parser.add_argument('source', nargs='?', default=WORD_LIST_PATH,
+                        help='the word list, one word per line')
+    parser.add_argument('--output', default=None,
+                        help='the index file (default: next to the source)')
+    args = parser.parse_args()
+    count = build_word_index(args.source, args.output)
+    path = args.output or index_path_for(args.source)
+    print(f'Wrote {count} words to {path}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# filename: renderer.py
+
+"""
+renderer.py
+~~~~~~~~~~~
+A terminal renderer shared by the games.  A game screen is drawn as a
+"frame" (the text a game's `draw_*` method prints).  `DiffRenderer`
+keeps the previously drawn frame and, for each new one, sends only the
+changed part of each changed line, using ANSI cursor positioning, in a
+single buffered write.  This replaces clearing the screen with a
+`clear`/`cls` subprocess and reprinting everything on every turn.
+
+The first frame (and the first after `invalidate`) clears the screen and
+is drawn in full.  After each frame the cursor is left on the line below
+it, and everything below is erased, so the game's prompts and messages
+stay below the frame and are cleared on the next redraw.
+
+`NullRenderer` draws nothing, for headless runs.  On a stream that is
+not a terminal, `DiffRenderer` writes each frame in full, without escape
+codes.
+"""
+
+import contextlib
+import io
+import sys
+
+
+ESC = '\x1b['
+CLEAR_SCREEN = ESC + '2J' + ESC + 'H'  # erase the screen, cursor to top left
+ERASE_LINE_END = ESC + 'K'             # erase from the cursor to line end
+ERASE_BELOW = ESC + 'J'                # erase from the cursor to screen end
+
+
+def move_to(row : int, col : int) -> str:
+    # cursor to the 0-based (row, col) of the screen
+    return f'{ESC}{row + 1};{col + 1}H'
+
+def capture(method, *args) -> str:
+    # Run `method(*args)` and return what it printed.
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        method(*args)
+    return buffer.getvalue()
+
+def clear_screen(stream = None):
+    stream = sys.stdout if stream is None else stream
+    stream.write(CLEAR_SCREEN)
+    stream.flush()
+
+
+class DiffRenderer:
+
+    def __init__(self, stream = None, ansi : bool = None):
+        # `stream` defaults to sys.stdout (looked up at each write, so that
+        # redirected output is followed); `ansi` defaults to whether the
+        # stream is a terminal.
+        self.stream = stream
+        self.ansi = ansi
+        self.lines = None  # the frame on the screen, as a list of lines
+
+    def invalidate(self):
+        # Forget the frame on the screen: the next one is drawn in full.
+        self.lines = None
+
+    def update(self, frame : str) -> str:
+        # Return the text that turns the screen from the previous frame into
+        # `frame` (and remember `frame` as being on the screen).
+        lines = frame.split('\n')
+        if frame.endswith('\n'):
+            lines.pop()
+        old_lines, self.lines = self.lines, lines
+        if old_lines is None:
+            return CLEAR_SCREEN + '\n'.join(lines) + '\n' + ERASE_BELOW
+        out = []
+        for row, line in enumerate(lines):
+            old = old_lines[row] if row < len(old_lines) else ''
+            if line == old:
+                continue
+            start = 0
+            while start < min(len(line), len(old)) and \
+                  line[start] == old[start]:
+                start += 1
+            if len(line) == len(old):
+                end = len(line)
+                while line[end - 1] == old[end - 1]:
+                    end -= 1
+                out.append(move_to(row, start) + line[start:end])
+            elif len(line) > len(old):
+                out.append(move_to(row, start) + line[start:])
+            else:
+                out.append(move_to(row, start) + line[start:] +
+                           ERASE_LINE_END)
+        out.append(move_to(len(lines), 0) + ERASE_BELOW)
+        return ''.join(out)
+
+    def render(self, frame : str):
+        stream = sys.stdout if self.stream is None else self.stream
+        ansi = self.ansi
+        if ansi is None:
+            ansi = hasattr(stream, 'isatty') and stream.isatty()
+        stream.write(self.update(frame) if ansi else frame)
+        stream.flush()
+
+    def draw(self, method, *args):
+        # Render what `method(*args)` prints (e.g. a game's `draw_screen`).
+        self.render(capture(method, *args))
+
+
+class NullRenderer:
+    # Draws nothing (for headless runs).
+
+    def invalidate(self):
+        pass
+
+    def update(self, frame : str) -> str:
+        return ''
+
+    def render(self, frame : str):
+        pass
+
+    def draw(self, method, *args):
+        pass
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# filename: test_renderer.py
+
+"""
+test_renderer.py
+~~~~~~~~~~~~~~~~
+A script to test the functionality of the code in the file renderer.py.
+
+To run the tests herein, execute the following in a shell terminal*:
+pytest
+
+*And be sure there is an __init__.py file in the same directory.
+"""
+
+import io
+
+from .renderer import (CLEAR_SCREEN, ERASE_BELOW, ERASE_LINE_END,
+                       DiffRenderer, NullRenderer, move_to)
+
+
+def test_first_frame_is_drawn_in_full():
+    renderer = DiffRenderer(ansi=True)
+    assert renderer.update('ab\ncd\n') == CLEAR_SCREEN + 'ab\ncd\n' + \
+                                          ERASE_BELOW
+
+def test_only_changed_cells_are_sent():
+    renderer = DiffRenderer(ansi=True)
+    renderer.update('  [0, 0, 0]\n  [0, 0, 0]\n')
+    update = renderer.update('  [0, 0, 0]\n  [0, 1, 0]\n')
+    assert update == move_to(1, 6) + '1' + move_to(2, 0) + ERASE_BELOW
+
+def test_shorter_and_fewer_lines():
+    renderer = DiffRenderer(ansi=True)
+    renderer.update('Guesses: (none so far)\nextra\n')
+    update = renderer.update('Guesses: A\n')
+    assert update == move_to(0, 9) + 'A' + ERASE_LINE_END + \
+                     move_to(1, 0) + ERASE_BELOW
+
+def test_invalidate_redraws_everything():
+    renderer = DiffRenderer(ansi=True)
+    renderer.update('x\n')
+    renderer.invalidate()
+    assert renderer.update('x\n').startswith(CLEAR_SCREEN)
+
+def test_single_write_per_frame():
+    class Stream(io.StringIO):
+        writes = 0
+        def write(self, text):
+            Stream.writes += 1
+            return super().write(text)
+    stream = Stream()
+    renderer = DiffRenderer(stream, ansi=True)
+    renderer.draw(lambda: [print(f'line {i}', end='\n') for i in range(20)])
+    assert Stream.writes == 1
+
+def test_plain_stream_gets_plain_frames():
+    stream = io.StringIO()
+    renderer = DiffRenderer(stream)  # not a terminal
+    renderer.render('a\n')
+    renderer.render('b\n')
+    assert stream.getvalue() == 'a\nb\n'
+
+def test_null_renderer(capsys):
+    NullRenderer().draw(print, 'hidden')
+    assert capsys.readouterr().out == ''
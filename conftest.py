@@ -0,0 +1,20 @@
+# filename: conftest.py
+
+"""
+conftest.py
+~~~~~~~~~~~
+Makes the packages of this repository (the games in ConnectFour/ and
+Hangman/, and the shared renderer in Renderer/) importable in every test,
+without installing them, so no test depends on some other module having
+set up `sys.path` first.
+"""
+
+import os
+import sys
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+for package_dir in ('ConnectFour', 'Hangman', 'Renderer'):
+    path = os.path.join(REPO_DIR, package_dir)
+    if path not in sys.path:
+        sys.path.insert(0, path)